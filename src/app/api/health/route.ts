@@ -65,8 +65,16 @@ export async function GET() {
   const statusCode = health.status === 'healthy' ? 200 : 503;
   const totalLatency = Date.now() - startTime;
 
-  return NextResponse.json(
+  const response = NextResponse.json(
     { ...health, totalLatency },
     { status: statusCode }
   );
+
+  // Process uptime reveals restart times, so it is only sent when a local
+  // health sampler run opts in; deployments never set this flag.
+  if (process.env.HEALTH_EXPOSE_UPTIME === 'true') {
+    response.headers.set('X-Uptime', process.uptime().toFixed(3));
+  }
+
+  return response;
 }
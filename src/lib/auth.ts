@@ -43,6 +43,20 @@ import { prisma } from "@/lib/prisma";
 import bcrypt from "bcryptjs";
 import type { Adapter } from "next-auth/adapters";
 
+/**
+ * 로컬 OAuth 스탠드인 주소 (testsprite_tests/runner/oauth.py)
+ *
+ * 설정하면 GitHub/Google 대신 이 서버로 OAuth 로그인을 진행합니다 (오프라인 테스트, 부하 테스트용).
+ * Google id_token은 목 서버가 client secret으로 HS256 서명합니다.
+ * 운영 환경(NODE_ENV=production)에서는 무시되며, HS256 id_token도 허용하지 않습니다.
+ */
+const OAUTH_MOCK_URL =
+  process.env.NODE_ENV !== "production" ? process.env.OAUTH_MOCK_URL?.replace(/\/$/, "") : undefined;
+
+if (process.env.NODE_ENV === "production" && process.env.OAUTH_MOCK_URL) {
+  console.warn("[Auth] OAUTH_MOCK_URL is ignored in production");
+}
+
 /**
  * NextAuth.js 인증 옵션
  *
@@ -71,11 +85,27 @@ export const authOptions: NextAuthOptions = {
     GithubProvider({
       clientId: process.env.GITHUB_ID as string,
       clientSecret: process.env.GITHUB_SECRET as string,
+      ...(OAUTH_MOCK_URL
+        ? {
+            authorization: {
+              url: `${OAUTH_MOCK_URL}/github/login/oauth/authorize`,
+              params: { scope: "read:user user:email" },
+            },
+            token: `${OAUTH_MOCK_URL}/github/login/oauth/access_token`,
+            userinfo: `${OAUTH_MOCK_URL}/github/user`,
+          }
+        : {}),
     }),
     // Google OAuth Provider
     GoogleProvider({
       clientId: process.env.GOOGLE_CLIENT_ID as string,
       clientSecret: process.env.GOOGLE_CLIENT_SECRET as string,
+      ...(OAUTH_MOCK_URL
+        ? {
+            wellKnown: `${OAUTH_MOCK_URL}/google/.well-known/openid-configuration`,
+            client: { id_token_signed_response_alg: "HS256" },
+          }
+        : {}),
     }),
     // Credentials Provider for email/password login
     CredentialsProvider({
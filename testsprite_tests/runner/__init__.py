@@ -0,0 +1,21 @@
+"""Shared-browser runner for the generated TestSprite scripts.
+
+The scripts in ``testsprite_tests_list`` each start their own Playwright
+driver and Chromium.  This package loads them into one process instead and
+hands every test a fresh context on a pooled browser::
+
+    cd testsprite_tests
+    python -m runner run --concurrency 4 --browsers 2
+"""
+
+from .loader import TestCase, discover
+from .pool import BrowserPool
+from .suite import SuiteRunner, TestOutcome
+
+__all__ = [
+    "BrowserPool",
+    "SuiteRunner",
+    "TestCase",
+    "TestOutcome",
+    "discover",
+]
@@ -0,0 +1,214 @@
+"""Per-role NextAuth sessions cached as Playwright ``storage_state`` files.
+
+Instead of every authenticated script clicking through ``/auth/login``, the
+cache signs each role in once through the NextAuth credentials endpoint,
+writes the resulting ``storage_state`` to ``tmp/auth/<role>.json`` and hands
+that file to new contexts.  A state is reused until its session cookie is
+about to expire; concurrent tests asking for the same role share one login.
+
+Credentials default to the ones the generated scripts type in and can be
+overridden with ``TESTSPRITE_<ROLE>_EMAIL`` / ``TESTSPRITE_<ROLE>_PASSWORD``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable
+from urllib.parse import urlsplit
+
+from .paths import TMP_DIR, base_url
+
+if TYPE_CHECKING:
+    from playwright.async_api import Playwright
+
+logger = logging.getLogger(__name__)
+
+AUTH_DIR = TMP_DIR / "auth"
+SESSION_COOKIES = ("next-auth.session-token", "__Secure-next-auth.session-token")
+
+
+@dataclass(frozen=True)
+class Role:
+    name: str
+    email: str
+    password: str
+
+    @classmethod
+    def from_env(cls, name: str, email: str, password: str) -> "Role":
+        prefix = f"TESTSPRITE_{name.upper()}_"
+        return cls(
+            name=name,
+            email=os.environ.get(prefix + "EMAIL", email),
+            password=os.environ.get(prefix + "PASSWORD", password),
+        )
+
+
+ROLES = {
+    role.name: role
+    for role in (
+        Role.from_env("buyer", "testuser@example.com", "ValidPassword123"),
+        Role.from_env("seller", "seller@example.com", "sellerpassword"),
+        Role.from_env("admin", "admin@example.com", "AdminPassword123"),
+    )
+}
+
+# Scripts that log in through the UI before reaching what they test; with a
+# session injected, that scripted login is skipped (see :class:`LoginSteps`).
+# TC001 tests the login itself and must never start signed in.
+CASE_ROLES = {
+    "TC008": "buyer",
+    "TC015": "admin",
+    "TC020": "seller",
+}
+
+# The scripted login: the header 로그인 button, which header.tsx renders only
+# without a session, then the fields and buttons of the /auth/login form.
+LOGIN_BUTTON = "xpath=html/body/header/nav/div/div[2]/a/button"
+LOGIN_FORM = "xpath=html/body/main/div/div[2]/div[2]/div/"
+LOGIN_PATH = "/auth/login"
+
+
+class LoginSteps:
+    """Recognises the steps of a scripted UI login, fed in script order.
+
+    Login-form selectors only count once the script has opened the login
+    page, through the header button or by going to ``/auth/login``.
+    """
+
+    def __init__(self) -> None:
+        self.started = False
+
+    def selector(self, selector: str) -> bool:
+        if selector == LOGIN_BUTTON:
+            self.started = True
+            return True
+        return self.started and selector.startswith(LOGIN_FORM)
+
+    def goto(self, url: str) -> bool:
+        if urlsplit(url).path.rstrip("/") == LOGIN_PATH:
+            self.started = True
+            return True
+        return False
+
+
+class SessionError(RuntimeError):
+    """The credentials endpoint did not hand out a session cookie."""
+
+
+class SessionCache:
+    """Log in once per role and serve the saved state to new contexts."""
+
+    def __init__(
+        self,
+        playwright: "Playwright",
+        *,
+        directory: Path = AUTH_DIR,
+        roles: dict[str, Role] = ROLES,
+        refresh_margin: float = 300.0,
+        session_ttl: float = 3600.0,
+    ) -> None:
+        self.playwright = playwright
+        self.directory = directory
+        self.roles = roles
+        self.refresh_margin = refresh_margin
+        self.session_ttl = session_ttl
+        self._locks: dict[str, asyncio.Lock] = {}
+
+    def path(self, role: str) -> Path:
+        return self.directory / f"{role}.json"
+
+    async def storage_state(self, role: str) -> Path:
+        """Return a fresh ``storage_state`` file for ``role``, logging in if needed."""
+        if role not in self.roles:
+            raise KeyError(f"unknown role {role!r}; expected one of {sorted(self.roles)}")
+        lock = self._locks.setdefault(role, asyncio.Lock())
+        async with lock:
+            path = self.path(role)
+            if not self.is_fresh(path):
+                await self._login(self.roles[role], path)
+            return path
+
+    def is_fresh(self, path: Path) -> bool:
+        """True while the saved session cookie outlives ``refresh_margin``."""
+        try:
+            state = json.loads(path.read_text(encoding="utf-8"))
+            saved_at = path.stat().st_mtime
+        except (OSError, ValueError):
+            return False
+        expires = session_expiry(state)
+        if expires is None:
+            return False
+        if expires < 0:
+            # Browser-session cookie: trust it for ``session_ttl`` after saving.
+            expires = saved_at + self.session_ttl
+        return expires - time.time() > self.refresh_margin
+
+    def invalidate(self, role: str) -> None:
+        self.path(role).unlink(missing_ok=True)
+
+    async def _login(self, role: Role, path: Path) -> None:
+        request = await self.playwright.request.new_context(base_url=base_url())
+        try:
+            csrf = await request.get("/api/auth/csrf")
+            token = (await csrf.json())["csrfToken"]
+            await request.post(
+                "/api/auth/callback/credentials",
+                form={
+                    "csrfToken": token,
+                    "email": role.email,
+                    "password": role.password,
+                    "callbackUrl": base_url(),
+                    "json": "true",
+                },
+            )
+            state = await request.storage_state()
+        finally:
+            await request.dispose()
+        if session_expiry(state) is None:
+            raise SessionError(f"login as {role.name} ({role.email}) returned no session cookie")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        partial = path.with_suffix(".tmp")
+        partial.write_text(json.dumps(state), encoding="utf-8")
+        partial.replace(path)
+        logger.info("saved %s session to %s", role.name, path)
+
+
+async def prewarm(roles: Iterable[str]) -> None:
+    """Make sure ``roles`` have fresh saved sessions before workers start."""
+    from playwright.async_api import async_playwright
+
+    async with async_playwright() as playwright:
+        sessions = SessionCache(playwright)
+        for role in sorted(set(roles)):
+            try:
+                await sessions.storage_state(role)
+            except Exception as exc:  # noqa: BLE001 - workers fall back to UI login
+                logger.warning("could not prewarm %s session: %s", role, exc)
+
+
+def session_expiry(state: dict) -> float | None:
+    """Expiry (epoch seconds, ``-1`` for session cookies) of the NextAuth cookie.
+
+    Large JWTs are split into ``<name>.0``, ``<name>.1``...; the earliest
+    expiry among the chunks wins.  Returns ``None`` when there is no cookie.
+    """
+    expiries = [
+        float(cookie.get("expires", -1))
+        for cookie in state.get("cookies", [])
+        if _is_session_cookie(cookie.get("name", ""))
+    ]
+    if not expiries:
+        return None
+    finite = [expiry for expiry in expiries if expiry >= 0]
+    return min(finite) if finite else -1.0
+
+
+def _is_session_cookie(name: str) -> bool:
+    base, _, chunk = name.rpartition(".")
+    return name in SESSION_COOKIES or (chunk.isdigit() and base in SESSION_COOKIES)
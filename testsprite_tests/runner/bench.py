@@ -0,0 +1,215 @@
+"""Page benchmark from the TC005 and TC016 step lists.
+
+TC005 drives search, category filter, sort and pagination on
+``/marketplace``; TC016 reloads ``/marketplace`` a dozen times.  ``bench
+run`` executes their declarative steps ``N`` times, one at a time, and
+stores every step's duration under a label in ``tmp/bench/<label>.json``.
+Given two builds it alternates between them, each case on one build then on
+the other, in swapped order every iteration, so drift on the machine (other
+load, thermal throttling) hits both alike; a stored baseline can still be
+reused for a single build.  An iteration that fails keeps the durations of
+the steps that passed before the failure, so a case ending in a failing
+assertion (TC016's layout check) is still compared step by step.
+
+``bench compare`` tests each step's distribution against the baseline with
+a two-sided Mann-Whitney U test (Holm-corrected across steps) and a
+bootstrap confidence interval of the relative change in median.  A step is
+a regression only when the adjusted p-value is below ``alpha`` *and* the
+whole interval lies above ``min_effect``, so one slow sample never flags.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import statistics
+import time
+from dataclasses import dataclass, field, replace
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Sequence
+from urllib.parse import urljoin
+
+from .interpreter import run_steps
+from .paths import TMP_DIR
+from .plan import Step, StepCase, load_plan, step_key
+from .pool import BrowserPool
+from .stats import bootstrap_ci, holm, mann_whitney_u, relative_median_change
+from .vitals import git_revision
+from .waits import WaitEngine
+
+logger = logging.getLogger(__name__)
+
+BENCH_DIR = TMP_DIR / "bench"
+BENCH_CASES = ("TC005", "TC016")
+TOTAL = "total"
+
+
+@dataclass
+class BenchResult:
+    """Step durations in seconds per case, for one build."""
+
+    label: str
+    base_url: str
+    revision: str = ""
+    created: str = ""
+    iterations: int = 0
+    failures: dict[str, int] = field(default_factory=dict)
+    samples: dict[str, dict[str, list[float]]] = field(default_factory=dict)
+
+    @classmethod
+    def load(cls, label: str, directory: Path = BENCH_DIR) -> "BenchResult":
+        return cls(**json.loads((directory / f"{label}.json").read_text(encoding="utf-8")))
+
+    def save(self, directory: Path = BENCH_DIR) -> Path:
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f"{self.label}.json"
+        path.write_text(json.dumps(self.__dict__, ensure_ascii=False, indent=1) + "\n", encoding="utf-8")
+        return path
+
+    def add(self, case_id: str, key: str, seconds: float) -> None:
+        self.samples.setdefault(case_id, {}).setdefault(key, []).append(round(seconds, 4))
+
+
+def _absolute(case: StepCase, base_url: str) -> StepCase:
+    """``case`` with every ``goto`` pointed at ``base_url``."""
+    steps = [
+        replace(step, url=urljoin(base_url + "/", step.url or "")) if step.action == "goto" else step
+        for step in case.steps
+    ]
+    return replace(case, steps=steps)
+
+
+async def measure(
+    label: str,
+    base_url: str,
+    *,
+    iterations: int = 20,
+    warmup: int = 2,
+    cases: Sequence[str] = BENCH_CASES,
+    headless: bool = True,
+) -> BenchResult:
+    """Run ``cases`` ``warmup + iterations`` times against ``base_url``; keep the last ``iterations``."""
+    (result,) = await measure_builds(
+        [(label, base_url)], iterations=iterations, warmup=warmup, cases=cases, headless=headless
+    )
+    return result
+
+
+async def measure_builds(
+    builds: Sequence[tuple[str, str]],
+    *,
+    iterations: int = 20,
+    warmup: int = 2,
+    cases: Sequence[str] = BENCH_CASES,
+    headless: bool = True,
+) -> list[BenchResult]:
+    """Like :func:`measure` for several ``(label, base_url)`` builds, interleaved per case and iteration."""
+    plan = load_plan(only=list(cases))
+    created = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    results = [
+        BenchResult(label, base_url, revision=git_revision(), created=created, iterations=iterations)
+        for label, base_url in builds
+    ]
+    async with BrowserPool(1, headless=headless) as pool:
+        for iteration in range(warmup + iterations):
+            measured = iteration >= warmup
+            order = results if iteration % 2 == 0 else results[::-1]
+            for case in plan:
+                for result in order:
+                    await _measure_case(pool, case, result, iteration, measured)
+            done = f"iteration {iteration + 1 - warmup}" if measured else f"warmup {iteration + 1}"
+            print(f"{', '.join(result.label for result in results)}: {done} done", flush=True)
+    return results
+
+
+async def _measure_case(pool: BrowserPool, case: StepCase, result: BenchResult, iteration: int, measured: bool) -> None:
+    timings: dict[str, float] = {}
+
+    def timed(index: int, step: Step, seconds: float) -> None:
+        # Keyed by the relative step, so builds on different URLs line up.
+        timings[step_key(index, case.steps[index])] = seconds
+
+    # Cross-origin requests are ignored by the wait engine, so it must
+    # watch the build under test rather than the runner's base URL.
+    waits = WaitEngine(result.base_url)
+    started = time.perf_counter()
+    try:
+        async with pool.lease(hooks=[waits.attach]) as lease:
+            await run_steps(_absolute(case, result.base_url), lease, waits, timed)
+    except Exception as exc:  # noqa: BLE001 - a failed iteration is counted, not fatal
+        logger.warning("%s: %s iteration %d failed: %s", result.label, case.case_id, iteration + 1, exc)
+        if measured:
+            result.failures[case.case_id] = result.failures.get(case.case_id, 0) + 1
+    else:
+        timings[TOTAL] = time.perf_counter() - started
+    if measured:
+        for key, seconds in timings.items():
+            result.add(case.case_id, key, seconds)
+
+
+@dataclass
+class Comparison:
+    case_id: str
+    step: str
+    baseline_median: float
+    candidate_median: float
+    change: float
+    interval: tuple[float, float]
+    p_value: float
+    adjusted_p: float = 1.0
+    regression: bool = False
+    improvement: bool = False
+
+
+def compare(
+    baseline: BenchResult,
+    candidate: BenchResult,
+    *,
+    alpha: float = 0.05,
+    min_effect: float = 0.05,
+    min_samples: int = 5,
+) -> list[Comparison]:
+    rows: list[Comparison] = []
+    for case_id, steps in candidate.samples.items():
+        for step, values in steps.items():
+            base = baseline.samples.get(case_id, {}).get(step)
+            if not base or len(base) < min_samples or len(values) < min_samples:
+                continue
+            _, p_value = mann_whitney_u(base, values)
+            rows.append(
+                Comparison(
+                    case_id,
+                    step,
+                    statistics.median(base),
+                    statistics.median(values),
+                    relative_median_change(base, values),
+                    bootstrap_ci(base, values),
+                    p_value,
+                )
+            )
+    for row, adjusted in zip(rows, holm([row.p_value for row in rows])):
+        row.adjusted_p = adjusted
+        significant = adjusted < alpha
+        row.regression = significant and row.interval[0] > min_effect
+        row.improvement = significant and row.interval[1] < -min_effect
+    return rows
+
+
+def format_comparison(rows: Sequence[Comparison], baseline: BenchResult, candidate: BenchResult) -> str:
+    lines = [
+        f"baseline {baseline.label} ({baseline.revision or '?'}, n={baseline.iterations}) vs "
+        f"candidate {candidate.label} ({candidate.revision or '?'}, n={candidate.iterations})",
+        f"{'case':6} {'step':44} {'base':>8} {'cand':>8} {'change':>8} {'95% CI':>17} {'p(adj)':>8}",
+    ]
+    for row in rows:
+        mark = "  REGRESSION" if row.regression else "  faster" if row.improvement else ""
+        low, high = row.interval
+        lines.append(
+            f"{row.case_id:6} {row.step[:44]:44} {row.baseline_median * 1000:>6.0f}ms {row.candidate_median * 1000:>6.0f}ms "
+            f"{row.change:>+7.1%} [{low:>+6.1%},{high:>+6.1%}] {row.adjusted_p:>8.3f}{mark}"
+        )
+    for name, result in (("baseline", baseline), ("candidate", candidate)):
+        for case_id, count in result.failures.items():
+            lines.append(f"{name} {case_id}: {count} failed iterations, steps before the failure kept")
+    return "\n".join(lines)
@@ -0,0 +1,401 @@
+"""Local stand-in for the Bootpay REST API with latency and failure injection.
+
+TC007 and TC008 stop at the payment step offline: ``/api/payment/bootpay/verify``
+and ``/cancel`` call Bootpay through ``@bootpay/backend-js``, which knows only
+the real API hosts.  :class:`MockGateway` answers the calls the app makes:
+
+``POST /v2/request/token``       ``Bootpay.getAccessToken()``
+``GET  /v2/receipt/<id>``        ``Bootpay.receiptPayment()`` (verify, webhook)
+``POST /v2/cancel``              ``Bootpay.cancelPayment()`` (refunds)
+``POST /v2/subscribe/payment``   ``Bootpay.requestSubscribePayment()``
+
+The SDK sends its requests with axios, which honours ``https_proxy`` and,
+for an ``http://`` proxy, sends ``https://api.bootpay.co.kr/...`` as an
+absolute-form request over plain HTTP, so starting the app with
+``https_proxy=http://127.0.0.1:9100`` routes Bootpay here without any change
+to the app.  Origin-form targets (``/v2/...``) are served as well.
+
+Receipts are registered with ``POST /_mock/receipts`` (``price``,
+``product_id``, optional ``status`` and ``method``), or are implicit: any id
+of the form ``mock-<price>-<productId>[-<nonce>]`` is a paid receipt, so load
+tests need no setup.  Statuses are Bootpay's receipt codes (``1`` paid,
+``20`` cancelled, ``-30`` cancel in progress); cancelling twice fails with
+``RC_ALREADY_CANCELLED``.
+
+Each operation gets a :class:`Behaviour`: a latency distribution, an error
+rate (``500 RC_SERVER_ERROR``) and a timeout rate (the request is held for
+``hang`` seconds and the connection dropped).  ``cancel_scenario`` picks how
+cancellations end (see :data:`CANCEL_SCENARIOS`).  All of it can be changed
+while the server runs with ``POST /_mock/config``, and ``GET /_mock/stats``
+reports request counts, statuses and service-time percentiles per operation.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import math
+import random
+import secrets
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Mapping
+from urllib.parse import urlsplit
+
+from .histogram import Histogram
+from .httpserver import DropConnection, HttpServer, Reply, Request
+
+OPERATIONS = ("token", "receipt", "cancel", "subscribe")
+# ok: cancelled at once; rejected: the PG refuses; pending: Bootpay answers
+# "cancel in progress"; timeout: the cancel call never answers.
+CANCEL_SCENARIOS = ("ok", "rejected", "pending", "timeout")
+PAID, CANCELLED, CANCELLING = 1, 20, -30
+STATUS_LOCALE = {PAID: "결제완료", CANCELLED: "결제취소완료", CANCELLING: "취소진행중", 0: "결제대기"}
+BOOTPAY_HOST_SUFFIX = "bootpay.co.kr"
+
+
+@dataclass(frozen=True)
+class Latency:
+    """Injected delay in milliseconds: ``fixed:50``, ``uniform:20,200``,
+    ``normal:100,30``, ``lognormal:100,0.5`` (median, sigma) or ``exp:80`` (mean)."""
+
+    kind: str = "fixed"
+    a: float = 0.0
+    b: float = 0.0
+
+    KINDS = ("fixed", "uniform", "normal", "lognormal", "exp")
+
+    @classmethod
+    def parse(cls, spec: str) -> "Latency":
+        kind, _, values = spec.partition(":")
+        if not values:
+            kind, values = "fixed", kind
+        if kind not in cls.KINDS:
+            raise ValueError(f"unknown latency distribution {kind!r}; expected one of {', '.join(cls.KINDS)}")
+        numbers = [float(value) for value in values.split(",")]
+        expected = 2 if kind in ("uniform", "normal", "lognormal") else 1
+        if len(numbers) != expected or any(number < 0 for number in numbers):
+            raise ValueError(f"{kind} latency takes {expected} non-negative number(s), got {values!r}")
+        return cls(kind, *numbers)
+
+    def sample(self, rng: random.Random) -> float:
+        """One delay in seconds."""
+        if self.kind == "uniform":
+            millis = rng.uniform(self.a, self.b)
+        elif self.kind == "normal":
+            millis = rng.gauss(self.a, self.b)
+        elif self.kind == "lognormal":
+            millis = self.a * math.exp(rng.gauss(0.0, self.b)) if self.a else 0.0
+        elif self.kind == "exp":
+            millis = rng.expovariate(1 / self.a) if self.a else 0.0
+        else:
+            millis = self.a
+        return max(0.0, millis) / 1000
+
+    def __str__(self) -> str:
+        values = f"{self.a:g},{self.b:g}" if self.kind in ("uniform", "normal", "lognormal") else f"{self.a:g}"
+        return f"{self.kind}:{values}"
+
+
+@dataclass
+class Behaviour:
+    latency: Latency = field(default_factory=Latency)
+    error_rate: float = 0.0
+    timeout_rate: float = 0.0
+
+
+@dataclass
+class Receipt:
+    receipt_id: str
+    price: int
+    product_id: str = ""
+    order_name: str = "VibeOlympics 상품"
+    method: str = "card"
+    status: int = PAID
+    cancelled_price: int = 0
+    requested_at: str = ""
+    purchased_at: str = ""
+    cancelled_at: str | None = None
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "receipt_id": self.receipt_id,
+            "order_id": f"VO-{self.receipt_id[-12:].upper()}",
+            "price": self.price,
+            "tax_free": 0,
+            "cancelled_price": self.cancelled_price,
+            "order_name": self.order_name,
+            "company_name": "VibeOlympics",
+            "sandbox": True,
+            "pg": "mock",
+            "method": "카드" if self.method == "card" else self.method,
+            "method_symbol": self.method,
+            "currency": "KRW",
+            "status": self.status,
+            "status_locale": STATUS_LOCALE.get(self.status, str(self.status)),
+            "requested_at": self.requested_at,
+            "purchased_at": self.purchased_at,
+            "cancelled_at": self.cancelled_at,
+            "metadata": {"productId": self.product_id} if self.product_id else {},
+        }
+
+
+class GatewayError(Exception):
+    def __init__(self, status: int, code: str, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+        self.code = code
+
+
+class _Timeout(Exception):
+    """The call never answers; the connection is dropped after ``hang`` seconds."""
+
+
+def _now(offset: timedelta = timedelta()) -> str:
+    return (datetime.now(timezone.utc) + offset).isoformat(timespec="seconds")
+
+
+class MockGateway(HttpServer):
+    """The Bootpay endpoints plus the ``/_mock`` control API, on one asyncio server."""
+
+    def __init__(
+        self,
+        behaviours: Mapping[str, Behaviour] | None = None,
+        *,
+        cancel_scenario: str = "ok",
+        hang: float = 30.0,
+        seed: int | None = None,
+    ) -> None:
+        super().__init__()
+        self.behaviours = {operation: Behaviour() for operation in OPERATIONS}
+        self.behaviours.update(behaviours or {})
+        self.cancel_scenario = cancel_scenario
+        self.hang = hang
+        self.rng = random.Random(seed)
+        self.receipts: dict[str, Receipt] = {}
+        self._token_key = secrets.token_bytes(16)
+        self.latency = {operation: Histogram() for operation in OPERATIONS}
+        self.statuses: dict[str, dict[str, int]] = {operation: {} for operation in OPERATIONS}
+        self.started = time.monotonic()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 9100) -> int:
+        return await super().start(host, port)
+
+    async def handle(self, request: Request) -> Reply:
+        try:
+            status, payload = await self.dispatch(request.method, request.target, request.headers, request.body)
+        except _Timeout:
+            raise DropConnection(self.hang) from None
+        return Reply.json(status, payload)
+
+    async def dispatch(
+        self, method: str, target: str, headers: Mapping[str, str], body: bytes
+    ) -> tuple[int, Any]:
+        """Route one request; returns ``(status, JSON payload)``."""
+        parts = urlsplit(target)
+        if parts.scheme and not (parts.hostname or "").endswith(BOOTPAY_HOST_SUFFIX):
+            # Proxied traffic for other services: refuse it rather than guess.
+            return 502, {"error_code": "MOCK_NOT_BOOTPAY", "message": f"{parts.hostname} is not proxied by the mock"}
+        path = parts.path.rstrip("/")
+        try:
+            data = json.loads(body) if body else {}
+        except ValueError:
+            return 400, {"error_code": "RC_INVALID_JSON", "message": "request body is not JSON"}
+        if path.startswith("/_mock/"):
+            return self._control(method, path, data)
+        if method == "POST" and path == "/v2/request/token":
+            operation = "token"
+        elif method == "GET" and path.startswith("/v2/receipt/"):
+            operation = "receipt"
+        elif method == "POST" and path == "/v2/cancel":
+            operation = "cancel"
+        elif method == "POST" and path == "/v2/subscribe/payment":
+            operation = "subscribe"
+        else:
+            return 404, {"error_code": "RC_NOT_FOUND_PATH", "message": f"{method} {path} is not mocked"}
+
+        started = time.perf_counter()
+        behaviour = self.behaviours[operation]
+        try:
+            delay = behaviour.latency.sample(self.rng)
+            if delay:
+                await asyncio.sleep(delay)
+            roll = self.rng.random()
+            if roll < behaviour.timeout_rate:
+                raise _Timeout
+            if roll < behaviour.timeout_rate + behaviour.error_rate:
+                raise GatewayError(500, "RC_SERVER_ERROR", "injected gateway error")
+            if operation != "token":
+                self._authorize(headers)
+            status, payload = 200, getattr(self, f"_{operation}")(path, data)
+        except GatewayError as exc:
+            status, payload = exc.status, {"error_code": exc.code, "message": str(exc)}
+        except _Timeout:
+            self._record(operation, "timeout", started)
+            raise
+        self._record(operation, str(status), started)
+        return status, payload
+
+    def _record(self, operation: str, status: str, started: float) -> None:
+        self.latency[operation].record(int((time.perf_counter() - started) * 1_000_000))
+        counts = self.statuses[operation]
+        counts[status] = counts.get(status, 0) + 1
+
+    def _authorize(self, headers: Mapping[str, str]) -> None:
+        scheme, _, token = headers.get("authorization", "").partition(" ")
+        nonce, _, signature = token.partition(".")
+        if scheme.lower() != "bearer" or not secrets.compare_digest(signature, self._sign(nonce)):
+            raise GatewayError(401, "RC_TOKEN_INVALID", "access token is missing or was not issued by this gateway")
+
+    # -- Bootpay operations -----------------------------------------------
+
+    def _token(self, path: str, data: Mapping[str, Any]) -> dict[str, Any]:
+        if not data.get("application_id") or not data.get("private_key"):
+            raise GatewayError(400, "RC_INVALID_KEY", "application_id and private_key are required")
+        # The app asks for a token before every call; signed tokens need no storage.
+        nonce = secrets.token_hex(8)
+        return {"access_token": f"{nonce}.{self._sign(nonce)}", "expired_at": _now(timedelta(minutes=30))}
+
+    def _sign(self, nonce: str) -> str:
+        return hashlib.blake2b(nonce.encode(), key=self._token_key, digest_size=12).hexdigest()
+
+    def _receipt(self, path: str, data: Mapping[str, Any]) -> dict[str, Any]:
+        return self.lookup(path.rsplit("/", 1)[-1]).to_dict()
+
+    def _cancel(self, path: str, data: Mapping[str, Any]) -> dict[str, Any]:
+        receipt = self.lookup(str(data.get("receipt_id", "")))
+        if receipt.status == CANCELLED:
+            raise GatewayError(400, "RC_ALREADY_CANCELLED", "receipt is already cancelled")
+        if receipt.status != PAID:
+            raise GatewayError(400, "RC_NOT_CANCELABLE", f"receipt status {receipt.status} cannot be cancelled")
+        scenario = self.cancel_scenario
+        if scenario == "timeout":
+            raise _Timeout
+        if scenario == "rejected":
+            raise GatewayError(400, "PG_CANCEL_REJECTED", "the PG refused the cancellation")
+        price = int(data.get("cancel_price") or receipt.price)
+        if price > receipt.price - receipt.cancelled_price:
+            raise GatewayError(400, "RC_CANCEL_PRICE_EXCEEDED", "cancel_price exceeds the remaining amount")
+        receipt.cancelled_price += price
+        receipt.status = CANCELLING if scenario == "pending" else CANCELLED
+        receipt.cancelled_at = _now()
+        self.receipts[receipt.receipt_id] = receipt
+        return receipt.to_dict()
+
+    def _subscribe(self, path: str, data: Mapping[str, Any]) -> dict[str, Any]:
+        price = data.get("price")
+        if not isinstance(price, (int, float)) or price <= 0:
+            raise GatewayError(400, "RC_PRICE_INVALID", "price is required")
+        receipt = self.register(int(price), str((data.get("metadata") or {}).get("productId", "")))
+        receipt.order_name = str(data.get("order_name") or receipt.order_name)
+        return receipt.to_dict()
+
+    def register(self, price: int, product_id: str = "", *, status: int = PAID, method: str = "card") -> Receipt:
+        receipt_id = f"mock-{price}-{product_id or 'none'}-{secrets.token_hex(6)}"
+        now = _now()
+        receipt = Receipt(receipt_id, price, product_id, method=method, status=status, requested_at=now, purchased_at=now)
+        self.receipts[receipt_id] = receipt
+        return receipt
+
+    def lookup(self, receipt_id: str) -> Receipt:
+        """A registered receipt, or the implicit paid one a ``mock-<price>-<productId>`` id describes."""
+        receipt = self.receipts.get(receipt_id)
+        if receipt is not None:
+            return receipt
+        prefix, _, rest = receipt_id.partition("-")
+        price, _, rest = rest.partition("-")
+        product_id = rest.partition("-")[0]
+        if prefix != "mock" or not price.isdigit() or not product_id:
+            raise GatewayError(404, "RC_NOT_FOUND", f"receipt {receipt_id!r} does not exist")
+        now = _now()
+        # Not stored until a cancel changes it, so verify floods keep memory flat.
+        return Receipt(receipt_id, int(price), "" if product_id == "none" else product_id, requested_at=now, purchased_at=now)
+
+    # -- control API ------------------------------------------------------
+
+    def _control(self, method: str, path: str, data: Mapping[str, Any]) -> tuple[int, Any]:
+        try:
+            if method == "POST" and path == "/_mock/receipts":
+                receipt = self.register(
+                    int(data["price"]),
+                    str(data.get("product_id", "")),
+                    status=int(data.get("status", PAID)),
+                    method=str(data.get("method", "card")),
+                )
+                return 201, receipt.to_dict()
+            if method == "POST" and path == "/_mock/config":
+                self.configure(data)
+                return 200, self.config()
+            if method == "GET" and path == "/_mock/config":
+                return 200, self.config()
+            if method == "GET" and path == "/_mock/stats":
+                return 200, self.stats()
+            if method == "POST" and path == "/_mock/reset":
+                self.receipts.clear()
+                self.latency = {operation: Histogram() for operation in OPERATIONS}
+                self.statuses = {operation: {} for operation in OPERATIONS}
+                self.started = time.monotonic()
+                return 200, {"reset": True}
+        except (KeyError, TypeError, ValueError) as exc:
+            return 400, {"error_code": "MOCK_BAD_REQUEST", "message": str(exc)}
+        return 404, {"error_code": "MOCK_NOT_FOUND", "message": f"{method} {path}"}
+
+    def configure(self, data: Mapping[str, Any]) -> None:
+        """Apply ``{"latency": {op: spec}, "error_rate": {op: rate}, "timeout_rate": ..., "cancel": scenario}``."""
+        for operation, spec in (data.get("latency") or {}).items():
+            self._behaviour(operation).latency = Latency.parse(str(spec))
+        for key in ("error_rate", "timeout_rate"):
+            for operation, rate in (data.get(key) or {}).items():
+                if not 0 <= float(rate) <= 1:
+                    raise ValueError(f"{key} must be between 0 and 1")
+                setattr(self._behaviour(operation), key, float(rate))
+        if "cancel" in data:
+            if data["cancel"] not in CANCEL_SCENARIOS:
+                raise ValueError(f"unknown cancel scenario {data['cancel']!r}")
+            self.cancel_scenario = data["cancel"]
+
+    def _behaviour(self, operation: str) -> Behaviour:
+        if operation not in self.behaviours:
+            raise ValueError(f"unknown operation {operation!r}; expected one of {', '.join(OPERATIONS)}")
+        return self.behaviours[operation]
+
+    def config(self) -> dict[str, Any]:
+        return {
+            "latency": {operation: str(behaviour.latency) for operation, behaviour in self.behaviours.items()},
+            "error_rate": {operation: behaviour.error_rate for operation, behaviour in self.behaviours.items()},
+            "timeout_rate": {operation: behaviour.timeout_rate for operation, behaviour in self.behaviours.items()},
+            "cancel": self.cancel_scenario,
+        }
+
+    def stats(self) -> dict[str, Any]:
+        elapsed = time.monotonic() - self.started
+        summary = {}
+        for operation in OPERATIONS:
+            latency = self.latency[operation]
+            if not latency.total:
+                continue
+            p50, p95, p99 = (latency.percentile(p) / 1000 for p in (50, 95, 99))
+            summary[operation] = {
+                "requests": latency.total,
+                "per_second": round(latency.total / elapsed, 1) if elapsed else 0.0,
+                "p50_ms": round(p50, 2),
+                "p95_ms": round(p95, 2),
+                "p99_ms": round(p99, 2),
+                "statuses": dict(sorted(self.statuses[operation].items())),
+            }
+        return summary
+
+
+def format_stats(stats: Mapping[str, Any]) -> str:
+    if not stats:
+        return "no Bootpay calls received"
+    lines = [f"{'operation':10} {'requests':>8} {'per s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}  statuses"]
+    for operation, entry in stats.items():
+        statuses = ", ".join(f"{status}×{count}" for status, count in entry["statuses"].items())
+        lines.append(
+            f"{operation:10} {entry['requests']:>8} {entry['per_second']:>8.1f} {entry['p50_ms']:>8.1f} "
+            f"{entry['p95_ms']:>8.1f} {entry['p99_ms']:>8.1f}  {statuses}"
+        )
+    return "\n".join(lines)
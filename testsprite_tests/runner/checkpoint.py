@@ -0,0 +1,131 @@
+"""Step checkpoints, so a long step case can resume where it last failed.
+
+TC008 walks home -> marketplace -> category -> product -> purchase -> login
+-> product again; a failure near the end used to mean replaying everything
+before it.  After every passed step (or batch of assertions) the interpreter
+saves the context's ``storage_state`` (cookies and localStorage), the page's
+URL and its sessionStorage to ``tmp/checkpoints/<case>.json``.  With
+``run --steps --resume`` a case that has a checkpoint starts in a context
+built from that state, reopens the URL and continues with the next step.
+
+A checkpoint is tied to a fingerprint of the case's steps, so editing the
+case invalidates it, and it is deleted once the case passes.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from .paths import TMP_DIR
+
+if TYPE_CHECKING:
+    from playwright.async_api import BrowserContext, Page
+
+    from .plan import StepCase
+    from .waits import WaitEngine
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_DIR = TMP_DIR / "checkpoints"
+
+SESSION_STORAGE_JS = "() => Object.fromEntries(Object.entries(sessionStorage))"
+RESTORE_JS = """
+(() => {
+  const saved = %s;
+  if (location.origin !== saved.origin || sessionStorage.getItem("__testspriteRestored")) return;
+  for (const [key, value] of Object.entries(saved.items)) sessionStorage.setItem(key, value);
+  sessionStorage.setItem("__testspriteRestored", "1");
+})();
+"""
+
+
+def fingerprint(case: "StepCase") -> str:
+    payload = case.source or json.dumps(case.to_dict(), sort_keys=True)
+    return hashlib.blake2b(payload.encode(), digest_size=8).hexdigest()
+
+
+@dataclass
+class Checkpoint:
+    case_id: str
+    fingerprint: str
+    index: int
+    url: str
+    storage_state: dict[str, Any]
+    session_storage: dict[str, str]
+    saved_at: str = ""
+
+
+class CheckpointStore:
+    """Saves checkpoints; with ``resume``, also hands them back to the interpreter."""
+
+    def __init__(self, directory: Path = CHECKPOINT_DIR, *, resume: bool = False) -> None:
+        self.directory = directory
+        self.resume = resume
+
+    def path(self, case_id: str) -> Path:
+        return self.directory / f"{case_id}.json"
+
+    def load(self, case: "StepCase") -> Checkpoint | None:
+        """The case's checkpoint if resuming and it still matches the case's steps."""
+        if not self.resume:
+            return None
+        try:
+            checkpoint = Checkpoint(**json.loads(self.path(case.case_id).read_text(encoding="utf-8")))
+        except (OSError, ValueError, TypeError):
+            return None
+        if checkpoint.fingerprint != fingerprint(case) or checkpoint.index >= len(case.steps) - 1:
+            logger.info("%s: checkpoint is stale, starting from the first step", case.case_id)
+            return None
+        return checkpoint
+
+    async def save(self, case: "StepCase", index: int, context: "BrowserContext") -> None:
+        page = context.pages[-1]
+        try:
+            session_storage = await page.evaluate(SESSION_STORAGE_JS)
+        except Exception:  # noqa: BLE001 - about:blank and error pages have no storage
+            session_storage = {}
+        checkpoint = Checkpoint(
+            case.case_id,
+            fingerprint(case),
+            index,
+            page.url,
+            await context.storage_state(),
+            session_storage,
+            datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        )
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.path(case.case_id)
+        partial = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        partial.write_text(json.dumps(asdict(checkpoint), ensure_ascii=False) + "\n", encoding="utf-8")
+        partial.replace(path)
+
+    def clear(self, case: "StepCase") -> None:
+        self.path(case.case_id).unlink(missing_ok=True)
+
+    async def restore(
+        self,
+        checkpoint: Checkpoint,
+        context: "BrowserContext",
+        page: "Page",
+        waits: "WaitEngine | None" = None,
+    ) -> None:
+        """Reopen the checkpoint's URL in ``page`` with its sessionStorage."""
+        if checkpoint.session_storage:
+            origin = "/".join(checkpoint.url.split("/")[:3])
+            saved = json.dumps({"origin": origin, "items": checkpoint.session_storage})
+            await context.add_init_script(RESTORE_JS % saved)
+        if not checkpoint.url.startswith("http"):
+            return
+        await page.goto(checkpoint.url, wait_until="commit")
+        if waits is not None:
+            await waits.after_navigation(page, 3)
+        else:
+            await page.wait_for_load_state("domcontentloaded")
+        logger.info("%s: resumed after step %d at %s", checkpoint.case_id, checkpoint.index + 1, checkpoint.url)
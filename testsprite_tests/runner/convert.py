@@ -0,0 +1,227 @@
+"""Convert the generated ``TCxxx_*.py`` scripts into step lists.
+
+The scripts only use a handful of statement shapes, so a small AST walk over
+``run_test`` recovers them:
+
+* ``await page.goto(url, ...)``                    -> ``goto``
+* ``elem = frame.locator(sel).nth(n)`` followed by
+  ``await elem.click(...)`` / ``await elem.fill(v)`` -> ``click`` / ``fill``
+* ``await page.mouse.wheel(x, y)``                  -> ``scroll``
+* ``await expect(frame.locator(sel).first).to_be_visible(timeout=t)``
+  (optionally wrapped in ``try/except AssertionError: raise AssertionError(msg)``)
+                                                    -> ``visible`` assertion
+
+Sleeps, load-state waits and driver setup/teardown are dropped.  Step
+descriptions come from the ``# ...`` comment closest above each statement.
+"""
+
+from __future__ import annotations
+
+import ast
+import io
+import json
+import tokenize
+from pathlib import Path
+
+from .loader import TestCase
+from .paths import TMP_DIR, base_url
+from .plan import ACTION, ASSERTION, Step, StepCase
+
+
+class ConversionError(ValueError):
+    pass
+
+
+def convert_case(case: TestCase, descriptions: dict[str, str] | None = None) -> StepCase:
+    tree = ast.parse(case.source, filename=str(case.path))
+    run_test = next(
+        (node for node in tree.body if isinstance(node, ast.AsyncFunctionDef) and node.name == "run_test"),
+        None,
+    )
+    if run_test is None:
+        raise ConversionError(f"{case.path.name}: no async run_test()")
+    converter = _Converter(_comments(case.source))
+    converter.block(run_test.body)
+    return StepCase(
+        case_id=case.case_id,
+        title=case.title,
+        description=(descriptions or {}).get(case.case_id, ""),
+        steps=converter.steps,
+    )
+
+
+def convert_all(cases: list[TestCase]) -> list[StepCase]:
+    descriptions = _recorded_descriptions()
+    return [convert_case(case, descriptions) for case in cases]
+
+
+def _recorded_descriptions(path: Path = TMP_DIR / "test_results.json") -> dict[str, str]:
+    """Case descriptions from the last TestSprite run, keyed by ``TCxxx``."""
+    try:
+        records = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return {
+        record["title"].split("-", 1)[0]: record.get("description", "")
+        for record in records
+        if record.get("title", "").startswith("TC")
+    }
+
+
+def _comments(source: str) -> dict[int, str]:
+    comments = {}
+    for token in tokenize.generate_tokens(io.StringIO(source).readline):
+        if token.type == tokenize.COMMENT:
+            text = token.string.lstrip("#").strip()
+            comments[token.start[0]] = text.lstrip("->").strip()
+    return comments
+
+
+class _Converter:
+    def __init__(self, comments: dict[int, str]) -> None:
+        self.comments = comments
+        self.steps: list[Step] = []
+        self.locators: dict[str, tuple[str, int | None]] = {}
+        self._last_step_line = 0
+
+    def describe(self, node: ast.stmt) -> str:
+        """The closest comment between the previous step and ``node``."""
+        for line in range(node.lineno - 1, self._last_step_line, -1):
+            if self.comments.get(line):
+                return self.comments[line]
+        return ""
+
+    def emit(self, node: ast.stmt, step: Step) -> None:
+        self.steps.append(step)
+        self._last_step_line = node.end_lineno or node.lineno
+
+    def block(self, statements: list[ast.stmt]) -> None:
+        for statement in statements:
+            if isinstance(statement, ast.Try):
+                if _is_assertion_guard(statement):
+                    self.guarded_assertion(statement)
+                elif not _is_load_state_guard(statement):
+                    self.block(statement.body)
+                continue
+            if isinstance(statement, ast.For):
+                continue  # frame load-state loop
+            self.statement(statement)
+
+    def statement(self, node: ast.stmt) -> None:
+        if isinstance(node, ast.Assign) and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name):
+            located = _locator(node.value)
+            if located is not None:
+                self.locators[node.targets[0].id] = located
+            return
+        call = _awaited_call(node)
+        if call is None:
+            return
+        description = self.describe(node)
+        func = call.func
+        if not isinstance(func, ast.Attribute):
+            return
+        owner = _dotted(func.value)
+        if owner == "page" and func.attr == "goto":
+            self.emit(node, Step(ACTION, description, action="goto", url=_relative(_literal(call.args[0]))))
+        elif owner == "page.mouse" and func.attr == "wheel":
+            x, y = call.args
+            if isinstance(y, ast.Await):
+                y_value: int | str = _literal(_awaited(y).args[0])
+            else:
+                y_value = _literal(y)
+            self.emit(node, Step(ACTION, description, action="scroll", x=_literal(x), y=y_value))
+        elif owner in self.locators and func.attr in ("click", "fill"):
+            selector, nth = self.locators[owner]
+            step = Step(ACTION, description, action=func.attr, selector=selector, nth=nth)
+            if func.attr == "fill":
+                step.value = _literal(call.args[0])
+            self.emit(node, step)
+        elif func.attr == "to_be_visible":
+            self.emit(node, self.assertion(call))
+
+    def assertion(self, call: ast.Call, message: str | None = None) -> Step:
+        expect_call = call.func.value  # type: ignore[attr-defined]
+        located = _locator(expect_call.args[0]) if isinstance(expect_call, ast.Call) else None
+        if located is None:
+            raise ConversionError(f"line {call.lineno}: unsupported expect() target")
+        selector, nth = located
+        return Step(
+            ASSERTION,
+            f"{selector} is visible",
+            assertion="visible",
+            selector=selector,
+            nth=nth,
+            timeout=_keyword(call, "timeout"),
+            message=message,
+        )
+
+    def guarded_assertion(self, node: ast.Try) -> None:
+        message = _literal(node.handlers[0].body[0].exc.args[0])  # type: ignore[attr-defined]
+        call = _awaited_call(node.body[0])
+        assert call is not None
+        self.emit(node, self.assertion(call, message))
+
+
+def _awaited(node: ast.Await) -> ast.Call:
+    if not isinstance(node.value, ast.Call):
+        raise ConversionError(f"line {node.lineno}: expected an awaited call")
+    return node.value
+
+
+def _awaited_call(node: ast.stmt) -> ast.Call | None:
+    if isinstance(node, ast.Expr) and isinstance(node.value, ast.Await) and isinstance(node.value.value, ast.Call):
+        return node.value.value
+    return None
+
+
+def _locator(node: ast.expr) -> tuple[str, int | None] | None:
+    """``frame.locator(sel)``, ``.nth(n)`` or ``.first`` -> ``(sel, nth)``."""
+    nth: int | None = None
+    if isinstance(node, ast.Attribute) and node.attr == "first":
+        node, nth = node.value, 0
+    elif isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute) and node.func.attr == "nth":
+        nth = _literal(node.args[0])
+        node = node.func.value
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute) and node.func.attr == "locator":
+        return _literal(node.args[0]), nth
+    return None
+
+
+def _dotted(node: ast.expr) -> str:
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Attribute):
+        return f"{_dotted(node.value)}.{node.attr}"
+    return ""
+
+
+def _literal(node: ast.expr):  # noqa: ANN202 - str or int
+    return ast.literal_eval(node)
+
+
+def _keyword(call: ast.Call, name: str) -> int | None:
+    return next((_literal(keyword.value) for keyword in call.keywords if keyword.arg == name), None)
+
+
+def _relative(url: str) -> str:
+    for prefix in (base_url(), "http://localhost:3000"):
+        if url.startswith(prefix):
+            return url[len(prefix):] or "/"
+    return url
+
+
+def _is_assertion_guard(node: ast.Try) -> bool:
+    handler = node.handlers[0] if len(node.handlers) == 1 else None
+    return (
+        handler is not None
+        and isinstance(handler.type, ast.Name)
+        and handler.type.id == "AssertionError"
+        and len(node.body) == 1
+        and isinstance(handler.body[0], ast.Raise)
+    )
+
+
+def _is_load_state_guard(node: ast.Try) -> bool:
+    call = _awaited_call(node.body[0]) if node.body else None
+    return call is not None and isinstance(call.func, ast.Attribute) and call.func.attr == "wait_for_load_state"
+
@@ -0,0 +1,209 @@
+"""Bounded capture of browser console and network errors, aggregated per endpoint.
+
+TestSprite's reports dump the browser console verbatim, so the same ``401``
+from ``/api/notifications`` polling appears dozens of times per failure and
+nobody sees the total.  :class:`EventCapture` listens to ``console``
+(errors and warnings), ``pageerror``, ``requestfailed`` and every
+``response`` of one test, and keeps:
+
+* a count per app endpoint of requests, and per error key
+  (kind, normalized endpoint, normalized message) of occurrences, both
+  capped at ``max_keys`` entries so memory stays constant however long a
+  test polls;
+* a ring buffer of the last ``capacity`` error lines, appended to the error
+  of a failed test in place of the full console dump.
+
+Endpoints are ``METHOD /path`` with ids (digits, UUIDs, cuids, long hex)
+replaced by ``:id`` and the query dropped.  Responses count as errors from
+status 400 up; redirects and ``304`` are normal App Router traffic.
+:func:`aggregate` folds the per-test summaries of a whole run into error
+counts and rates per endpoint.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Iterable
+from urllib.parse import urlsplit
+
+from .paths import TMP_DIR
+from .report import CONSOLE_MARKER
+from .store import new_run_id
+
+if TYPE_CHECKING:
+    from playwright.async_api import BrowserContext, ConsoleMessage, Page, Request, Response
+
+EVENTS_DIR = TMP_DIR / "events"
+OTHER = "(other)"
+
+_ID_SEGMENT = re.compile(
+    r"^(?:\d+|[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}|c[a-z0-9]{20,30}|[0-9a-f]{16,})$",
+    re.IGNORECASE,
+)
+_URL = re.compile(r"https?://[^\s\"')]+")
+_LONG_NUMBER = re.compile(r"\b\d{4,}\b")
+
+
+def normalize_path(url: str) -> str:
+    """``/api/products/clx2...?page=2`` -> ``/api/products/:id``; static chunks collapse."""
+    parts = urlsplit(url)
+    path = parts.path or "/"
+    if path.startswith("/_next/static/"):
+        return "/_next/static/*"
+    normalized = "/".join(":id" if _ID_SEGMENT.match(segment) else segment for segment in path.split("/"))
+    return normalized if parts.scheme in ("http", "https", "") else f"{parts.scheme}:"
+
+
+def normalize_message(text: str, limit: int = 160) -> str:
+    text = _URL.sub(lambda match: normalize_path(match.group()), text.strip().splitlines()[0] if text.strip() else "")
+    return _LONG_NUMBER.sub("N", text)[:limit]
+
+
+@dataclass
+class EventCapture:
+    """Per-test listener; register :meth:`attach` as a context hook."""
+
+    origin: str
+    capacity: int = 200
+    max_keys: int = 256
+    recent: deque[str] = field(init=False)
+    requests: Counter[str] = field(default_factory=Counter)
+    errors: Counter[tuple[str, str, str]] = field(default_factory=Counter)
+    total_errors: int = 0
+
+    def __post_init__(self) -> None:
+        self.origin = _origin(self.origin)
+        self.recent = deque(maxlen=self.capacity)
+
+    async def attach(self, context: "BrowserContext") -> None:
+        context.on("page", self._page)
+        context.on("requestfailed", self._request_failed)
+        context.on("response", self._response)
+
+    def _page(self, page: "Page") -> None:
+        page.on("console", self._console)
+        page.on("pageerror", self._page_error)
+
+    def _endpoint(self, request: "Request") -> str:
+        if _origin(request.url) != self.origin:
+            return f"{request.method} {urlsplit(request.url).netloc or request.url[:40]}"
+        return f"{request.method} {normalize_path(request.url)}"
+
+    def _response(self, response: "Response") -> None:
+        endpoint = self._endpoint(response.request)
+        _bounded_add(self.requests, endpoint, self.max_keys)
+        if response.status >= 400:
+            self._record("http", endpoint, str(response.status), f"{response.status} {endpoint}")
+
+    def _request_failed(self, request: "Request") -> None:
+        endpoint = self._endpoint(request)
+        _bounded_add(self.requests, endpoint, self.max_keys)
+        failure = request.failure or "failed"
+        if failure == "net::ERR_ABORTED" or "blockedbyclient" in failure.lower():
+            return  # navigation cancelled it, or routing blocked it on purpose
+        self._record("requestfailed", endpoint, failure, f"{failure} {endpoint}")
+
+    def _console(self, message: "ConsoleMessage") -> None:
+        if message.type not in ("error", "warning"):
+            return
+        location = (message.location or {}).get("url", "")
+        endpoint = normalize_path(location) if location else ""
+        text = normalize_message(message.text)
+        self._record(f"console.{message.type}", endpoint, text, f"[{message.type}] {message.text}")
+
+    def _page_error(self, error: Exception) -> None:
+        text = normalize_message(str(error))
+        self._record("pageerror", "", text, f"[pageerror] {error}")
+
+    def _record(self, kind: str, endpoint: str, detail: str, line: str) -> None:
+        self.total_errors += 1
+        _bounded_add(self.errors, (kind, endpoint, detail), self.max_keys, (kind, OTHER, ""))
+        self.recent.append(line[:500])
+
+    def console_tail(self) -> str:
+        """The buffered error lines, in the report's console-dump format."""
+        if not self.recent:
+            return ""
+        return f"\n{CONSOLE_MARKER}\n" + "\n".join(self.recent)
+
+    def summary(self) -> dict[str, Any]:
+        """Picklable per-test totals for :class:`~runner.suite.TestOutcome`."""
+        return {
+            "requests": dict(self.requests),
+            "errors": [[*key, count] for key, count in self.errors.items()],
+        }
+
+
+def _bounded_add(counter: Counter[Any], key: Any, max_keys: int, overflow: Any = OTHER) -> None:
+    if key in counter or len(counter) < max_keys:
+        counter[key] += 1
+    else:
+        counter[overflow] += 1
+
+
+def _origin(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+@dataclass
+class EndpointErrors:
+    endpoint: str
+    requests: int = 0
+    errors: Counter[str] = field(default_factory=Counter)
+    cases: set[str] = field(default_factory=set)
+
+    @property
+    def error_count(self) -> int:
+        return sum(self.errors.values())
+
+    @property
+    def rate(self) -> float:
+        return self.error_count / self.requests if self.requests else 1.0
+
+
+def aggregate(summaries: Iterable[tuple[str, dict[str, Any]]]) -> tuple[list[EndpointErrors], Counter[tuple[str, str]]]:
+    """Network errors per endpoint (worst first) and console/page errors by message."""
+    endpoints: dict[str, EndpointErrors] = {}
+    messages: Counter[tuple[str, str]] = Counter()
+    for case_id, summary in summaries:
+        for endpoint, count in summary.get("requests", {}).items():
+            entry = endpoints.setdefault(endpoint, EndpointErrors(endpoint))
+            entry.requests += count
+        for kind, endpoint, detail, count in summary.get("errors", []):
+            if kind in ("http", "requestfailed"):
+                entry = endpoints.setdefault(endpoint, EndpointErrors(endpoint))
+                entry.errors[detail] += count
+                entry.cases.add(case_id)
+            else:
+                messages[kind, detail] += count
+    failing = [entry for entry in endpoints.values() if entry.errors]
+    failing.sort(key=lambda entry: (-entry.error_count, entry.endpoint))
+    return failing, messages
+
+
+def format_events(endpoints: list[EndpointErrors], messages: Counter[tuple[str, str]], limit: int = 15) -> str:
+    if not endpoints and not messages:
+        return "no browser errors captured"
+    lines = [f"{'endpoint':44} {'requests':>8} {'errors':>7} {'rate':>6} {'cases':>5}  statuses"]
+    for entry in endpoints[:limit]:
+        statuses = ", ".join(f"{detail}×{count}" for detail, count in entry.errors.most_common(3))
+        lines.append(
+            f"{entry.endpoint[:44]:44} {entry.requests:>8} {entry.error_count:>7} {entry.rate:>6.0%} "
+            f"{len(entry.cases):>5}  {statuses}"
+        )
+    for (kind, detail), count in messages.most_common(limit):
+        lines.append(f"{count:>6}× {kind:15} {detail}")
+    return "\n".join(lines)
+
+
+def write_events(summaries: Iterable[tuple[str, dict[str, Any]]], directory: Path = EVENTS_DIR) -> Path:
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"{new_run_id()}.json"
+    payload = {case_id: summary for case_id, summary in summaries}
+    path.write_text(json.dumps(payload, ensure_ascii=False, separators=(",", ":")) + "\n", encoding="utf-8")
+    return path
@@ -0,0 +1,315 @@
+"""Bulk fixture loading into a template database, cloned per worker.
+
+The cases expect the products, users and categories of ``prisma/seed.ts``
+("Python 웹 스크래퍼", "Figma 디자인 시스템", ...) and TC009/TC010 create and
+delete community posts, so parallel runs against one database step on each
+other and reseeding through Prisma is the slow part of a fresh start.
+
+``fixtures dump``   copies every table of a seeded database (``npm run
+                    db:seed`` once) to ``tmp/fixtures/<table>.csv`` with
+                    ``COPY ... TO STDOUT`` and records the load order.
+``fixtures build``  recreates the template database from
+                    ``prisma/migrations/*.sql`` (or ``prisma db push`` with
+                    ``--prisma-push``, when the migrations lag the schema),
+                    loads the CSVs with ``COPY ... FROM STDIN`` in foreign
+                    key order inside one transaction, and marks it a template.
+``fixtures clone``  drops and recreates ``<prefix>0..N-1`` with ``CREATE
+                    DATABASE ... TEMPLATE``, a file-level copy that takes
+                    milliseconds, and prints each worker's ``DATABASE_URL``.
+
+psycopg 3 is used when installed; otherwise every statement goes through the
+``psql`` client.
+"""
+
+from __future__ import annotations
+
+import csv
+import graphlib
+import importlib.util
+import json
+import logging
+import os
+import shutil
+import subprocess
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterable
+from urllib.parse import urlsplit, urlunsplit
+
+from .paths import REPO_ROOT, TMP_DIR
+
+logger = logging.getLogger(__name__)
+
+FIXTURES_DIR = TMP_DIR / "fixtures"
+MIGRATIONS_DIR = REPO_ROOT / "prisma" / "migrations"
+MANIFEST = "manifest.json"
+TEMPLATE = "vibe_fixtures_template"
+WORKER_PREFIX = "vibe_test_w"
+# Per-run state that must not leak between workers.
+EXCLUDED_TABLES = frozenset({"_prisma_migrations", "Session", "VerificationToken"})
+
+TABLES_SQL = """
+SELECT c.relname FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace
+WHERE n.nspname = 'public' AND c.relkind IN ('r', 'p') ORDER BY c.relname
+"""
+FOREIGN_KEYS_SQL = """
+SELECT src.relname, dst.relname FROM pg_constraint k
+JOIN pg_class src ON src.oid = k.conrelid
+JOIN pg_class dst ON dst.oid = k.confrelid
+JOIN pg_namespace n ON n.oid = src.relnamespace
+WHERE k.contype = 'f' AND n.nspname = 'public'
+"""
+SEQUENCES_SQL = """
+SELECT format('SELECT setval(%L, COALESCE(MAX(%I), 0) + 1, false) FROM %I.%I',
+              s.oid::regclass, a.attname, n.nspname, t.relname)
+FROM pg_class s
+JOIN pg_depend d ON d.objid = s.oid AND d.deptype IN ('a', 'i')
+JOIN pg_class t ON t.oid = d.refobjid
+JOIN pg_namespace n ON n.oid = t.relnamespace
+JOIN pg_attribute a ON a.attrelid = t.oid AND a.attnum = d.refobjsubid
+WHERE s.relkind = 'S' AND n.nspname = 'public'
+"""
+
+
+class FixtureError(RuntimeError):
+    """The database or the fixture files are not in the expected state."""
+
+
+def quote(identifier: str) -> str:
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+def database_url(url: str, name: str) -> str:
+    """``url`` pointing at database ``name`` instead."""
+    parts = urlsplit(url)
+    return urlunsplit(parts._replace(path="/" + name))
+
+
+def default_url() -> str:
+    url = os.environ.get("DIRECT_URL") or os.environ.get("DATABASE_URL")
+    if not url:
+        raise FixtureError("set DATABASE_URL (or pass --database-url)")
+    return url
+
+
+def migration_files(directory: Path = MIGRATIONS_DIR) -> list[Path]:
+    """The SQL migrations, the initial schema first."""
+    return sorted(directory.glob("*.sql"), key=lambda path: (not path.name.startswith("initial"), path.name))
+
+
+def read_sql(path: Path) -> str:
+    """Migration text; ``initial_schema.sql`` is saved as UTF-16."""
+    data = path.read_bytes()
+    if data.startswith((b"\xff\xfe", b"\xfe\xff")):
+        return data.decode("utf-16")
+    return data.decode("utf-8-sig")
+
+
+class _Psycopg:
+    def __init__(self, url: str) -> None:
+        import psycopg
+
+        self.connection = psycopg.connect(url, autocommit=True)
+
+    def execute(self, sql: str) -> None:
+        self.connection.execute(sql)
+
+    def query(self, sql: str) -> list[tuple[Any, ...]]:
+        return self.connection.execute(sql).fetchall()
+
+    def copy_out(self, table: str, path: Path) -> None:
+        with self.connection.cursor() as cursor, path.open("wb") as handle:
+            with cursor.copy(f"COPY {quote(table)} TO STDOUT WITH (FORMAT csv, HEADER)") as copy:
+                for chunk in copy:
+                    handle.write(chunk)
+
+    def load(self, tables: list[tuple[str, list[str], Path]]) -> None:
+        """``COPY`` every CSV in and reset the sequences, in one transaction."""
+        with self.connection.transaction(), self.connection.cursor() as cursor:
+            for table, columns, path in tables:
+                with path.open("rb") as handle, cursor.copy(_copy_in(table, columns, "STDIN")) as copy:
+                    while chunk := handle.read(1 << 20):
+                        copy.write(chunk)
+            for (statement,) in cursor.execute(SEQUENCES_SQL).fetchall():
+                cursor.execute(statement)
+
+    def close(self) -> None:
+        self.connection.close()
+
+
+class _Psql:
+    """The same operations through the ``psql`` client, one process per call."""
+
+    def __init__(self, url: str) -> None:
+        if shutil.which("psql") is None:
+            raise FixtureError("fixtures need psycopg (pip install 'psycopg[binary]') or the psql client")
+        self.url = url
+
+    def _run(self, *args: str, stdin: str | None = None) -> str:
+        result = subprocess.run(
+            ["psql", self.url, "-X", "-q", "-v", "ON_ERROR_STOP=1", *args],
+            input=stdin,
+            capture_output=True,
+            text=True,
+        )
+        if result.returncode:
+            raise FixtureError(result.stderr.strip())
+        return result.stdout
+
+    def execute(self, sql: str) -> None:
+        self._run(stdin=sql)
+
+    def query(self, sql: str) -> list[tuple[Any, ...]]:
+        output = self._run("-A", "-t", "-F", "\x1f", "-c", sql)
+        return [tuple(line.split("\x1f")) for line in output.splitlines() if line]
+
+    def copy_out(self, table: str, path: Path) -> None:
+        self._run("-c", f"\\copy {quote(table)} TO {_literal(path)} WITH (FORMAT csv, HEADER)")
+
+    def load(self, tables: list[tuple[str, list[str], Path]]) -> None:
+        script = ["BEGIN;"]
+        script += ["\\" + _copy_in(table, columns, _literal(path)) for table, columns, path in tables]
+        script += [SEQUENCES_SQL.strip(), "\\gexec", "COMMIT;"]
+        self._run(stdin="\n".join(script) + "\n")
+
+    def close(self) -> None:
+        pass
+
+
+def _literal(path: Path) -> str:
+    return "'" + str(path).replace("'", "''") + "'"
+
+
+def _copy_in(table: str, columns: list[str], source: str) -> str:
+    return f"copy {quote(table)} ({', '.join(map(quote, columns))}) FROM {source} WITH (FORMAT csv, HEADER)"
+
+
+def connect(url: str) -> _Psycopg | _Psql:
+    if importlib.util.find_spec("psycopg") is None:
+        return _Psql(url)
+    return _Psycopg(url)
+
+
+def load_order(database: _Psycopg | _Psql, tables: Iterable[str]) -> list[str]:
+    """``tables`` with every foreign key target before the tables referencing it."""
+    wanted = set(tables)
+    graph: dict[str, set[str]] = {table: set() for table in sorted(wanted)}
+    for source, target in database.query(FOREIGN_KEYS_SQL):
+        if source in wanted and target in wanted and source != target:
+            graph[source].add(target)
+    try:
+        return list(graphlib.TopologicalSorter(graph).static_order())
+    except graphlib.CycleError as exc:
+        raise FixtureError(f"foreign keys form a cycle: {exc.args[1]}") from None
+
+
+@dataclass
+class TableDump:
+    name: str
+    columns: list[str]
+    rows: int
+
+
+def dump(url: str, directory: Path = FIXTURES_DIR) -> list[TableDump]:
+    """Copy every table of the database at ``url`` to ``directory``."""
+    database = connect(url)
+    try:
+        tables = [row[0] for row in database.query(TABLES_SQL) if row[0] not in EXCLUDED_TABLES]
+        directory.mkdir(parents=True, exist_ok=True)
+        dumps = []
+        for table in load_order(database, tables):
+            path = directory / f"{table}.csv"
+            database.copy_out(table, path)
+            with path.open(encoding="utf-8", newline="") as handle:
+                reader = csv.reader(handle)
+                columns = next(reader, [])
+                rows = sum(1 for _ in reader)
+            dumps.append(TableDump(table, columns, rows))
+    finally:
+        database.close()
+    manifest = {"tables": [dump.__dict__ for dump in dumps]}
+    (directory / MANIFEST).write_text(json.dumps(manifest, ensure_ascii=False, indent=1) + "\n", encoding="utf-8")
+    return dumps
+
+
+def build_template(
+    url: str,
+    *,
+    template: str = TEMPLATE,
+    directory: Path = FIXTURES_DIR,
+    migrations: Path = MIGRATIONS_DIR,
+    prisma_push: bool = False,
+) -> float:
+    """Recreate ``template`` with the schema and the dumped rows; returns seconds taken."""
+    manifest_path = directory / MANIFEST
+    if not manifest_path.is_file():
+        raise FixtureError(f"{manifest_path} not found; run 'fixtures dump' against a seeded database first")
+    manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+    started = time.perf_counter()
+    admin = connect(database_url(url, "postgres"))
+    try:
+        _drop(admin, template)
+        admin.execute(f"CREATE DATABASE {quote(template)}")
+    finally:
+        admin.close()
+    template_url = database_url(url, template)
+    if prisma_push:
+        env = {**os.environ, "DATABASE_URL": template_url, "DIRECT_URL": template_url}
+        subprocess.run(
+            ["npx", "prisma", "db", "push", "--skip-generate", "--accept-data-loss"],
+            cwd=REPO_ROOT,
+            env=env,
+            check=True,
+        )
+    database = connect(template_url)
+    try:
+        if not prisma_push:
+            for path in migration_files(migrations):
+                logger.info("applying %s", path.name)
+                database.execute(read_sql(path))
+        tables = [table for table in manifest["tables"] if table["rows"]]
+        database.load([(table["name"], table["columns"], directory / f"{table['name']}.csv") for table in tables])
+        database.execute("ANALYZE")
+        logger.info("loaded %d rows into %d tables", sum(table["rows"] for table in tables), len(tables))
+    finally:
+        database.close()
+    admin = connect(database_url(url, "postgres"))
+    try:
+        admin.execute(f"ALTER DATABASE {quote(template)} WITH IS_TEMPLATE true ALLOW_CONNECTIONS false")
+    finally:
+        admin.close()
+    return time.perf_counter() - started
+
+
+def clone(
+    url: str,
+    workers: int,
+    *,
+    template: str = TEMPLATE,
+    prefix: str = WORKER_PREFIX,
+) -> list[tuple[str, float]]:
+    """Fresh ``prefix0..workers-1`` copies of ``template``: ``(DATABASE_URL, seconds)`` each."""
+    admin = connect(database_url(url, "postgres"))
+    clones = []
+    try:
+        version = int(admin.query("SHOW server_version_num")[0][0])
+        # FILE_COPY skips WAL-logging every page, which is faster for small databases.
+        strategy = " STRATEGY FILE_COPY" if version >= 150000 else ""
+        for worker in range(workers):
+            name = f"{prefix}{worker}"
+            started = time.perf_counter()
+            _drop(admin, name)
+            admin.execute(f"CREATE DATABASE {quote(name)} TEMPLATE {quote(template)}{strategy}")
+            clones.append((database_url(url, name), time.perf_counter() - started))
+    finally:
+        admin.close()
+    return clones
+
+
+def _drop(admin: _Psycopg | _Psql, name: str) -> None:
+    exists = admin.query(f"SELECT 1 FROM pg_database WHERE datname = '{name.replace(chr(39), chr(39) * 2)}'")
+    if not exists:
+        return
+    admin.execute(f"ALTER DATABASE {quote(name)} WITH IS_TEMPLATE false ALLOW_CONNECTIONS true")
+    admin.execute(f"DROP DATABASE {quote(name)} WITH (FORCE)")
@@ -0,0 +1,150 @@
+"""Flakiness scores from pass/fail history, and a run-wide step retry budget.
+
+Several cases fail for timing reasons (TC003's login click that does not
+navigate yet), and the only remedy was rerunning the whole test.  With
+``--steps``, :class:`RetryBudget` lets the interpreter retry just the failing
+step, at most ``per_step`` times per step and ``total`` times per run (across
+all workers with ``--shards``), so a retry costs seconds and a genuinely
+broken build cannot hide behind them.
+
+:class:`FlakeHistory` keeps the last runs of every case, and of every step
+of the step cases, as a string of ``P`` (passed), ``R`` (passed after a step
+retry) and ``F`` (failed) in ``tmp/flakiness.json``.  The score is::
+
+    (retried runs + pass/fail flips) / runs
+
+so a case that always fails scores 0 (broken, not flaky) and one that
+alternates scores close to 1.  Cases scoring at least ``threshold`` over
+``min_runs`` runs are quarantined: ``run --quarantine`` still runs them but
+does not let their failures fail the run.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Iterable
+
+from .paths import TMP_DIR
+from .plan import StepCase, step_key
+
+logger = logging.getLogger(__name__)
+
+FLAKINESS_PATH = TMP_DIR / "flakiness.json"
+HISTORY_LIMIT = 50
+PASSED, RETRIED, FAILED = "P", "R", "F"
+
+
+@dataclass
+class RetryBudget:
+    """Step retries shared by every case of a run.
+
+    Shard workers share one budget through ``spent``, a manager ``Value``
+    counting the retries of all workers, guarded by ``lock``; see
+    :meth:`shared`.
+    """
+
+    total: int = 5
+    per_step: int = 1
+    used: dict[str, dict[str, int]] = field(default_factory=dict)
+    spent: Any = None
+    lock: Any = None
+
+    @classmethod
+    def shared(cls, manager: Any, total: int) -> "RetryBudget":
+        """A budget whose total is shared by every process it is pickled to."""
+        return cls(total, spent=manager.Value("i", 0), lock=manager.Lock())
+
+    @property
+    def remaining(self) -> int:
+        if self.spent is not None:
+            return self.total - self.spent.value
+        return self.total - sum(sum(steps.values()) for steps in self.used.values())
+
+    def take(self, case_id: str, key: str) -> bool:
+        """Spend one retry on ``key`` of ``case_id``, if both budgets allow it."""
+        steps = self.used.setdefault(case_id, {})
+        if steps.get(key, 0) >= self.per_step:
+            return False
+        with self.lock if self.lock is not None else nullcontext():
+            if self.remaining <= 0:
+                return False
+            if self.spent is not None:
+                self.spent.value += 1
+        steps[key] = steps.get(key, 0) + 1
+        logger.info("%s: retrying step %s (%d retries left in this run)", case_id, key, self.remaining)
+        return True
+
+
+def score(history: str) -> float:
+    if not history:
+        return 0.0
+    outcomes = history.replace(RETRIED, "")
+    flips = sum(a != b for a, b in zip(outcomes, outcomes[1:]))
+    return min(1.0, (history.count(RETRIED) + flips) / len(history))
+
+
+class FlakeHistory:
+    def __init__(self, path: Path = FLAKINESS_PATH, limit: int = HISTORY_LIMIT) -> None:
+        self.path = path
+        self.limit = limit
+        try:
+            self.cases: dict[str, dict[str, Any]] = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            self.cases = {}
+
+    def _append(self, history: str, mark: str) -> str:
+        return (history + mark)[-self.limit :]
+
+    def record(self, outcomes: Iterable[Any], cases: dict[str, Any]) -> None:
+        """Append each outcome, and for step cases every step reached, to the history."""
+        for outcome in outcomes:
+            if outcome.cached:
+                continue
+            entry = self.cases.setdefault(outcome.case_id, {"runs": "", "steps": {}})
+            retried = outcome.retried_steps
+            mark = FAILED if not outcome.passed else RETRIED if retried else PASSED
+            entry["runs"] = self._append(entry["runs"], mark)
+            case = cases.get(outcome.case_id)
+            if not isinstance(case, StepCase):
+                continue
+            for index, step in enumerate(case.steps):
+                key = step_key(index, step)
+                if key == outcome.failed_step:
+                    step_mark = FAILED
+                elif key in retried:
+                    step_mark = RETRIED
+                else:
+                    step_mark = PASSED
+                entry["steps"][key] = self._append(entry["steps"].get(key, ""), step_mark)
+                if step_mark == FAILED:
+                    break
+
+    def score(self, case_id: str) -> float:
+        return score(self.cases.get(case_id, {}).get("runs", ""))
+
+    def quarantined(self, threshold: float = 0.3, min_runs: int = 5) -> dict[str, float]:
+        """Case id -> score of every case flaky enough to quarantine."""
+        return {
+            case_id: self.score(case_id)
+            for case_id, entry in sorted(self.cases.items())
+            if len(entry["runs"]) >= min_runs and self.score(case_id) >= threshold
+        }
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text(json.dumps(self.cases, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+
+    def format(self, limit: int = 3) -> str:
+        lines = [f"{'case':6} {'score':>5} {'runs':>4}  history (newest last) / flakiest steps"]
+        ranked = sorted(self.cases.items(), key=lambda item: (-self.score(item[0]), item[0]))
+        for case_id, entry in ranked:
+            lines.append(f"{case_id:6} {self.score(case_id):>5.2f} {len(entry['runs']):>4}  {entry['runs'][-30:]}")
+            steps = sorted(entry["steps"].items(), key=lambda item: -score(item[1]))
+            for key, history in steps[:limit]:
+                if score(history) > 0:
+                    lines.append(f"{'':6} {score(history):>5.2f} {len(history):>4}    {key[:60]}  {history[-20:]}")
+        return "\n".join(lines)
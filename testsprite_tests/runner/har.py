@@ -0,0 +1,189 @@
+"""Record each case's traffic to HAR once; replay it later without the backend.
+
+``--har record`` runs against the real stack and writes ``tmp/har/TCxxx.har``
+through Playwright's ``record_har_path``.  ``--har replay`` answers every
+request of that case from its archive with ``context.route``, so Next.js,
+Prisma and PostgreSQL need not be running.
+
+Replay matching is configurable through :class:`MatchRule`: requests are
+keyed on any combination of method, path, query and body.  Query parameters
+in :data:`VOLATILE_PARAMS` (Next.js RSC cache busters) are ignored, and JSON
+bodies are compared after canonicalisation.  When several recorded entries
+share a key they are served in recorded order, the last one repeating.
+Unmatched requests are aborted so a replayed run never reaches the network.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import json
+import logging
+from collections import defaultdict, deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+from .paths import TMP_DIR
+
+if TYPE_CHECKING:
+    from playwright.async_api import BrowserContext, Request, Route
+
+logger = logging.getLogger(__name__)
+
+HAR_DIR = TMP_DIR / "har"
+RECORD = "record"
+REPLAY = "replay"
+
+VOLATILE_PARAMS = frozenset({"_rsc", "_", "t"})
+# Headers Playwright computes itself; replaying them verbatim breaks fulfil.
+_SKIPPED_HEADERS = frozenset({"content-length", "content-encoding", "transfer-encoding", "connection"})
+
+
+@dataclass(frozen=True)
+class MatchRule:
+    """Which parts of a request identify a recorded response."""
+
+    method: bool = True
+    path: bool = True
+    query: bool = True
+    body: bool = False
+    ignore_params: frozenset[str] = VOLATILE_PARAMS
+
+    @classmethod
+    def parse(cls, spec: str) -> "MatchRule":
+        """``"method,path,query"`` -> a rule matching on exactly those parts."""
+        parts = {part.strip() for part in spec.split(",") if part.strip()}
+        unknown = parts - {"method", "path", "query", "body"}
+        if unknown:
+            raise ValueError(f"unknown match part(s): {', '.join(sorted(unknown))}")
+        return cls(**{name: name in parts for name in ("method", "path", "query", "body")})
+
+    def key(self, method: str, url: str, body: str | None) -> tuple[str, ...]:
+        parts = urlsplit(url)
+        key = [parts.netloc]
+        if self.method:
+            key.append(method.upper())
+        if self.path:
+            key.append(parts.path or "/")
+        if self.query:
+            pairs = parse_qsl(parts.query, keep_blank_values=True)
+            key.append(urlencode(sorted(pair for pair in pairs if pair[0] not in self.ignore_params)))
+        if self.body:
+            key.append(_canonical_body(body))
+        return tuple(key)
+
+
+def _canonical_body(body: str | None) -> str:
+    if not body:
+        return ""
+    try:
+        return json.dumps(json.loads(body), sort_keys=True, separators=(",", ":"))
+    except ValueError:
+        return body
+
+
+@dataclass
+class RecordedResponse:
+    status: int
+    headers: dict[str, str]
+    body: bytes
+
+    @classmethod
+    def from_entry(cls, entry: dict[str, Any]) -> "RecordedResponse":
+        response = entry["response"]
+        content = response.get("content", {})
+        text = content.get("text", "")
+        body = base64.b64decode(text) if content.get("encoding") == "base64" else text.encode("utf-8")
+        headers = {
+            header["name"]: header["value"]
+            for header in response.get("headers", [])
+            if header["name"].lower() not in _SKIPPED_HEADERS and not header["name"].startswith(":")
+        }
+        return cls(response["status"], headers, body)
+
+
+class HarReplay:
+    """Recorded responses of one archive, queued per match key."""
+
+    def __init__(self, entries: list[dict[str, Any]], rule: MatchRule = MatchRule(), delay_ms: float = 0.0) -> None:
+        self.rule = rule
+        self.delay_ms = delay_ms
+        self.responses: dict[tuple[str, ...], deque[RecordedResponse]] = defaultdict(deque)
+        self.missed: set[str] = set()
+        for entry in entries:
+            request = entry["request"]
+            if entry["response"].get("status", 0) <= 0:
+                continue  # aborted or blocked while recording
+            key = rule.key(request["method"], request["url"], request.get("postData", {}).get("text"))
+            self.responses[key].append(RecordedResponse.from_entry(entry))
+
+    @classmethod
+    def load(cls, path: Path, rule: MatchRule = MatchRule(), delay_ms: float = 0.0) -> "HarReplay":
+        archive = json.loads(path.read_text(encoding="utf-8"))
+        return cls(archive["log"]["entries"], rule, delay_ms)
+
+    def match(self, request: "Request") -> RecordedResponse | None:
+        queue = self.responses.get(self.rule.key(request.method, request.url, request.post_data))
+        if not queue:
+            return None
+        return queue.popleft() if len(queue) > 1 else queue[0]
+
+    async def install(self, context: "BrowserContext") -> None:
+        async def handle(route: "Route") -> None:
+            recorded = self.match(route.request)
+            if recorded is None:
+                miss = f"{route.request.method} {route.request.url}"
+                if miss not in self.missed:
+                    self.missed.add(miss)
+                    logger.warning("not in HAR, aborted: %s", miss)
+                await route.abort("internetdisconnected")
+                return
+            if self.delay_ms:
+                await asyncio.sleep(self.delay_ms / 1000)
+            await route.fulfill(status=recorded.status, headers=recorded.headers, body=recorded.body)
+
+        await context.route("**/*", handle)
+
+
+class HarArchive:
+    """Per-case HAR files in ``directory`` for one run in ``mode``."""
+
+    def __init__(
+        self,
+        mode: str,
+        directory: Path = HAR_DIR,
+        *,
+        rule: MatchRule = MatchRule(),
+        delay_ms: float = 0.0,
+    ) -> None:
+        if mode not in (RECORD, REPLAY):
+            raise ValueError(f"unknown HAR mode {mode!r}")
+        self.mode = mode
+        self.directory = directory
+        self.rule = rule
+        self.delay_ms = delay_ms
+
+    def path(self, case_id: str) -> Path:
+        return self.directory / f"{case_id}.har"
+
+    def context_options(self, case_id: str) -> dict[str, Any]:
+        if self.mode != RECORD:
+            return {}
+        self.directory.mkdir(parents=True, exist_ok=True)
+        return {"record_har_path": str(self.path(case_id)), "record_har_content": "embed"}
+
+    def hook(self, case_id: str) -> Callable[["BrowserContext"], Any] | None:
+        """Context hook serving ``case_id`` from its archive, or ``None`` when recording."""
+        if self.mode != REPLAY:
+            return None
+        path = self.path(case_id)
+
+        async def install(context: "BrowserContext") -> None:
+            # Raised here, inside the script, so a missing archive fails only this case.
+            if not path.exists():
+                raise FileNotFoundError(f"no recorded traffic for {case_id}; run with --har record first")
+            await HarReplay.load(path, self.rule, self.delay_ms).install(context)
+
+        return install
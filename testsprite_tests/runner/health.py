@@ -0,0 +1,270 @@
+"""Latency SLO sampler for ``/api/health`` and ``/api/health/db``.
+
+TC014 asserts the literal ``latency`` and ``timestamp`` of one recorded
+response, which can never pass twice.  The sampler instead polls both
+endpoints on a fixed schedule and parses the latencies they report:
+
+``health.db``     ``checks.database.latency`` of ``/api/health`` (``SELECT 1``)
+``health.total``  ``totalLatency`` of ``/api/health``
+``db.query``      ``latency`` of ``/api/health/db`` (``SELECT version()``)
+``*.request``     round trip measured by the sampler itself
+
+Warm samples go into a rolling window per metric; SLOs such as
+``health.db:p95=200`` are checked against that window after every tick.
+The first answered sample of each probe after the server started is a cold
+start (Prisma connecting, route compiling) and is reported separately
+instead of skewing the warm percentiles.  Restarts are detected from the
+``X-Uptime`` header ``/api/health`` sends when the app runs with
+``HEALTH_EXPOSE_UPTIME=true``: the server started between ``request start -
+uptime`` and ``response - uptime``, and a start after the last known one is
+a restart.  Without the header, a refused connection counts as a restart.
+The sampler is
+a closed loop, so a response slower than the interval also records the
+samples it delayed (:meth:`Histogram.record_corrected`).  Every sample is
+appended to ``tmp/health/samples.jsonl``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import math
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Sequence
+
+from .histogram import Histogram
+from .httpclient import ConnectionPool
+from .paths import TMP_DIR
+
+SAMPLES_PATH = TMP_DIR / "health" / "samples.jsonl"
+
+
+@dataclass(frozen=True)
+class Probe:
+    name: str
+    path: str
+    fields: dict[str, tuple[str, ...]]
+
+    def metrics(self) -> list[str]:
+        return [f"{self.name}.{field}" for field in (*self.fields, "request")]
+
+    def parse(self, payload: Any) -> dict[str, float]:
+        values = {}
+        for name, keys in self.fields.items():
+            value = payload
+            for key in keys:
+                value = value.get(key) if isinstance(value, dict) else None
+            if isinstance(value, (int, float)):
+                values[f"{self.name}.{name}"] = float(value)
+        return values
+
+
+PROBES = (
+    Probe("health", "/api/health", {"db": ("checks", "database", "latency"), "total": ("totalLatency",)}),
+    Probe("db", "/api/health/db", {"query": ("latency",)}),
+)
+
+
+@dataclass(frozen=True)
+class Slo:
+    """``metric``'s ``percentile`` (100 for max) must stay at or under ``threshold_ms``."""
+
+    metric: str
+    percentile: float
+    threshold_ms: float
+
+    @classmethod
+    def parse(cls, spec: str) -> "Slo":
+        """``"health.db:p95=200"`` or ``"db.query:max=1000"``."""
+        try:
+            metric, rest = spec.split(":", 1)
+            statistic, threshold = rest.split("=", 1)
+            percentile = 100.0 if statistic == "max" else float(statistic.removeprefix("p"))
+            return cls(metric, percentile, float(threshold))
+        except ValueError as exc:
+            raise ValueError(f"bad SLO {spec!r}; expected METRIC:pNN=MS or METRIC:max=MS") from exc
+
+    def __str__(self) -> str:
+        statistic = "max" if self.percentile == 100 else f"p{self.percentile:g}"
+        return f"{self.metric}:{statistic}<={self.threshold_ms:g}ms"
+
+
+DEFAULT_SLOS = (Slo("health.db", 95, 200), Slo("health.total", 99, 1000), Slo("db.query", 95, 200))
+
+
+@dataclass
+class MetricWindow:
+    """Rolling warm samples plus every cold one, in milliseconds."""
+
+    size: int
+    warm: deque[float] = field(init=False)
+    cold: list[float] = field(default_factory=list)
+
+    def __post_init__(self) -> None:
+        self.warm = deque(maxlen=self.size)
+
+    def add(self, value: float, cold: bool) -> None:
+        (self.cold.append if cold else self.warm.append)(value)
+
+    def percentile(self, percent: float) -> float:
+        if not self.warm:
+            return 0.0
+        ordered = sorted(self.warm)
+        return ordered[max(0, math.ceil(len(ordered) * percent / 100) - 1)]
+
+
+class HealthSampler:
+    def __init__(
+        self,
+        pool: ConnectionPool,
+        probes: Sequence[Probe] = PROBES,
+        *,
+        interval: float = 5.0,
+        window: int = 60,
+        slos: Sequence[Slo] = DEFAULT_SLOS,
+        min_samples: int = 10,
+        max_error_rate: float = 0.0,
+        log_path: Path | None = SAMPLES_PATH,
+    ) -> None:
+        self.pool = pool
+        self.probes = list(probes)
+        self.interval = interval
+        self.slos = list(slos)
+        self.min_samples = min_samples
+        self.max_error_rate = max_error_rate
+        self.log_path = log_path
+        self.windows = {metric: MetricWindow(window) for probe in self.probes for metric in probe.metrics()}
+        self.requests = {probe.name: Histogram() for probe in self.probes}
+        self.samples = {probe.name: 0 for probe in self.probes}
+        self.errors = {probe.name: 0 for probe in self.probes}
+        self.breaches: dict[str, str] = {}
+        # Earliest and latest monotonic time the server can have started at.
+        self.server_start: tuple[float, float] | None = None
+        self._warm: set[str] = set()
+
+    async def sample(self, probe: Probe) -> dict[str, Any]:
+        record: dict[str, Any] = {
+            "at": datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+            "probe": probe.name,
+        }
+        sent = time.monotonic()
+        started = time.perf_counter()
+        try:
+            response = await self.pool.request("GET", probe.path, headers={"Accept": "application/json"})
+            record["status"] = response.status
+            payload = response.json() if response.ok else {}
+            metrics = probe.parse(payload)
+            if "x-uptime" in response.headers:
+                uptime = float(response.headers["x-uptime"])
+                record["uptime"] = uptime
+                self._observe_start(sent - uptime, time.monotonic() - uptime)
+        except (OSError, asyncio.TimeoutError, ValueError) as exc:
+            if isinstance(exc, ConnectionRefusedError):
+                self._warm.clear()  # the server is down, so it restarts cold
+                self.server_start = None
+            record["status"] = type(exc).__name__
+            metrics = {}
+        elapsed = (time.perf_counter() - started) * 1000
+        metrics[f"{probe.name}.request"] = round(elapsed, 1)
+        self.requests[probe.name].record_corrected(int(elapsed * 1000), int(self.interval * 1_000_000))
+        self.samples[probe.name] += 1
+        if record["status"] != 200:
+            self.errors[probe.name] += 1
+        record["metrics"] = metrics
+        return record
+
+    def _observe_start(self, earliest: float, latest: float) -> None:
+        if self.server_start is not None and earliest > self.server_start[1]:
+            self._warm.clear()  # restarted: every probe is cold again
+            self.server_start = None
+        if self.server_start is None:
+            self.server_start = (earliest, latest)
+        else:
+            self.server_start = (max(earliest, self.server_start[0]), min(latest, self.server_start[1]))
+
+    async def tick(self) -> list[dict[str, Any]]:
+        """Sample every probe once and file the metrics as warm or cold."""
+        records = await asyncio.gather(*(self.sample(probe) for probe in self.probes))
+        # Tagged after the whole tick, so a restart seen by one probe covers all of them.
+        for record in records:
+            record["cold"] = record["probe"] not in self._warm
+            if record["status"] == 200:
+                self._warm.add(record["probe"])
+            for metric, value in record["metrics"].items():
+                self.windows[metric].add(value, record["cold"])
+        return records
+
+    def evaluate(self) -> dict[str, str]:
+        """Violated SLOs (and failing probes) of the current window, with details."""
+        violations = {}
+        for slo in self.slos:
+            window = self.windows.get(slo.metric)
+            if window is None or len(window.warm) < self.min_samples:
+                continue
+            observed = window.percentile(slo.percentile)
+            if observed > slo.threshold_ms:
+                violations[str(slo)] = f"{slo} breached: {observed:g}ms over the last {len(window.warm)} warm samples"
+        for name, count in self.samples.items():
+            if count and self.errors[name] / count > self.max_error_rate:
+                violations[f"{name}.errors"] = f"{name}: {self.errors[name]} of {count} samples failed"
+        return violations
+
+    async def run(self, duration: float | None = None, count: int | None = None) -> list[str]:
+        """Sample every ``interval`` seconds; return the first report of every SLO breached."""
+        log = None
+        if self.log_path is not None:
+            self.log_path.parent.mkdir(parents=True, exist_ok=True)
+            log = self.log_path.open("a", encoding="utf-8")
+        started = time.monotonic()
+        tick = 0
+        active: dict[str, str] = {}
+        try:
+            while (count is None or tick < count) and (duration is None or time.monotonic() - started < duration):
+                records = await self.tick()
+                for record in records:
+                    print(format_sample(record), flush=True)
+                    if log is not None:
+                        log.write(json.dumps(record) + "\n")
+                        log.flush()
+                violations = self.evaluate()
+                for key, message in violations.items():
+                    if key not in active:
+                        print(f"SLO {message}", flush=True)
+                    self.breaches.setdefault(key, message)
+                for key in active.keys() - violations.keys():
+                    print(f"SLO {key} recovered", flush=True)
+                active = violations
+                tick += 1
+                delay = started + tick * self.interval - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+        finally:
+            if log is not None:
+                log.close()
+        return list(self.breaches.values())
+
+    def summary(self) -> str:
+        lines = [
+            f"{'metric':16} {'warm':>5} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8} {'cold':>5} {'cold max':>9}"
+        ]
+        for metric, window in self.windows.items():
+            worst = max(window.warm, default=0.0)
+            cold_max = f"{max(window.cold):.0f}ms" if window.cold else "-"
+            lines.append(
+                f"{metric:16} {len(window.warm):>5} {window.percentile(50):>6.0f}ms {window.percentile(95):>6.0f}ms "
+                f"{window.percentile(99):>6.0f}ms {worst:>6.0f}ms {len(window.cold):>5} {cold_max:>9}"
+            )
+        for name, histogram in self.requests.items():
+            p99 = histogram.percentile(99) / 1000
+            lines.append(f"{name}.request p99 with delayed samples: {p99:.0f}ms over {histogram.total} samples")
+        return "\n".join(lines)
+
+
+def format_sample(record: dict[str, Any]) -> str:
+    values = "  ".join(f"{metric.split('.', 1)[1]}={value:g}ms" for metric, value in record["metrics"].items())
+    cold = "  (cold)" if record["cold"] else ""
+    return f"{record['at'][11:19]} {record['probe']:6} {record['status']}  {values}{cold}"
@@ -0,0 +1,96 @@
+"""HDR-style latency histogram.
+
+Values are non-negative integers (the callers record microseconds).  Values
+below ``2 ** precision_bits`` are counted exactly; larger values share a
+bucket with neighbours that agree in their top ``precision_bits`` bits, so
+every reported value is within ``2 ** (1 - precision_bits)`` of the truth
+(under 1% at the default of 8 bits) whatever the magnitude.  Percentiles
+report the highest value of the bucket, as HdrHistogram does.
+"""
+
+from __future__ import annotations
+
+from typing import Iterable
+
+DEFAULT_PERCENTILES = (50.0, 95.0, 99.0)
+
+
+class Histogram:
+    def __init__(self, precision_bits: int = 8) -> None:
+        if precision_bits < 2:
+            raise ValueError("precision_bits must be at least 2")
+        self.precision_bits = precision_bits
+        self.exact_limit = 1 << precision_bits
+        self.counts: dict[int, int] = {}
+        self.total = 0
+        self.min: int | None = None
+        self.max = 0
+
+    def record(self, value: int, count: int = 1) -> None:
+        if value < 0:
+            raise ValueError("histogram values must be non-negative")
+        index = self._index(value)
+        self.counts[index] = self.counts.get(index, 0) + count
+        self.total += count
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = max(self.max, value)
+
+    def record_corrected(self, value: int, expected_interval: int) -> None:
+        """Record ``value`` plus the samples a stalled closed loop never sent.
+
+        When a sampler that should fire every ``expected_interval`` waits
+        ``value`` for one response, the requests it would have issued in the
+        meantime would have seen ``value - expected_interval``,
+        ``value - 2 * expected_interval``... (coordinated omission).
+        """
+        self.record(value)
+        if expected_interval <= 0:
+            return
+        missing = value - expected_interval
+        while missing >= expected_interval:
+            self.record(missing)
+            missing -= expected_interval
+
+    def merge(self, other: "Histogram") -> None:
+        if other.precision_bits != self.precision_bits:
+            raise ValueError("cannot merge histograms of different precision")
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.total += other.total
+        if other.min is not None:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def percentile(self, percent: float) -> int:
+        """Highest value at or below which ``percent`` of the samples fall."""
+        if not self.total:
+            return 0
+        rank = max(1, -(-self.total * percent // 100))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                return min(self._highest(index), self.max)
+        return self.max
+
+    def percentiles(self, percents: Iterable[float] = DEFAULT_PERCENTILES) -> dict[float, int]:
+        return {percent: self.percentile(percent) for percent in percents}
+
+    def mean(self) -> float:
+        if not self.total:
+            return 0.0
+        return sum(self._highest(index) * count for index, count in self.counts.items()) / self.total
+
+    def _index(self, value: int) -> int:
+        if value < self.exact_limit:
+            return value
+        shift = value.bit_length() - self.precision_bits
+        return (shift << (self.precision_bits - 1)) + (value >> shift)
+
+    def _highest(self, index: int) -> int:
+        if index < self.exact_limit:
+            return index
+        half = 1 << (self.precision_bits - 1)
+        shift = index // half - 1
+        mantissa = index - shift * half
+        return ((mantissa + 1) << shift) - 1
@@ -0,0 +1,225 @@
+"""Minimal asyncio HTTP/1.1 client with pooled keep-alive connections.
+
+Only what the load tools need: one origin per pool, ``Content-Length`` and
+chunked bodies, request bodies streamed from an async iterable, and
+connection reuse unless the server says ``close``.  A pooled connection the
+server has closed meanwhile is replaced and the request sent once more; any
+other broken or unparseable response raises :class:`HttpError`.
+Stdlib only, so load runs do not depend on the browser stack.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import ssl
+import time
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterable, Mapping
+from urllib.parse import urlsplit
+
+USER_AGENT = "testsprite-runner"
+# Methods safe to resend when a reused connection dies unanswered (RFC 9110 §9.2.2).
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "TRACE", "PUT", "DELETE"})
+
+
+class HttpError(OSError):
+    """The server closed the connection or sent something unparseable."""
+
+
+class _Unanswered(HttpError):
+    """The connection failed before any byte of the response arrived."""
+
+
+@dataclass
+class Response:
+    status: int
+    headers: dict[str, str]
+    body: bytes
+    set_cookies: list[str] = field(default_factory=list)
+    # perf_counter() when the request body was sent and the status line arrived.
+    sent_at: float = 0.0
+    first_byte_at: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.status < 400
+
+    def json(self) -> Any:
+        return json.loads(self.body)
+
+
+def store_cookies(response: Response, jar: dict[str, str]) -> None:
+    """Apply the response's ``Set-Cookie`` headers to ``jar``, like a browser would."""
+    for header in response.set_cookies:
+        name, _, value = header.split(";", 1)[0].partition("=")
+        if value and "max-age=0" not in header.lower():
+            jar[name.strip()] = value.strip()
+        else:
+            jar.pop(name.strip(), None)
+
+
+def cookie_header(jar: Mapping[str, str]) -> dict[str, str]:
+    """``{"Cookie": ...}`` for ``jar``, or nothing when it is empty."""
+    return {"Cookie": "; ".join(f"{name}={value}" for name, value in jar.items())} if jar else {}
+
+
+@dataclass
+class _Connection:
+    reader: asyncio.StreamReader
+    writer: asyncio.StreamWriter
+
+    def close(self) -> None:
+        self.writer.close()
+
+
+class ConnectionPool:
+    """Up to ``size`` keep-alive connections to the origin of ``base_url``."""
+
+    def __init__(self, base_url: str, size: int = 16, *, timeout: float = 30.0) -> None:
+        parts = urlsplit(base_url)
+        if parts.scheme not in ("http", "https"):
+            raise ValueError(f"unsupported URL scheme in {base_url!r}")
+        self.host = parts.hostname or "localhost"
+        self.port = parts.port or (443 if parts.scheme == "https" else 80)
+        self.ssl = ssl.create_default_context() if parts.scheme == "https" else None
+        self.authority = parts.netloc
+        self.timeout = timeout
+        self._slots = asyncio.Semaphore(size)
+        self._idle: list[_Connection] = []
+        self.opened = 0
+
+    async def __aenter__(self) -> "ConnectionPool":
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        idle, self._idle = self._idle, []
+        for connection in idle:
+            connection.close()
+
+    async def request(
+        self,
+        method: str,
+        target: str,
+        *,
+        headers: Mapping[str, str] | None = None,
+        body: bytes | AsyncIterable[bytes] | None = None,
+    ) -> Response:
+        """Send one request on a pooled connection; waits when all are busy.
+
+        A streamed ``body`` needs a ``Content-Length`` in ``headers``.  When a
+        reused keep-alive connection turns out to be dead, an idempotent request
+        with a ``bytes`` body (or none) is retried once on a new connection; the
+        server may have acted on anything else.
+        """
+        async with self._slots:
+            while True:
+                reused = bool(self._idle)
+                connection = self._idle.pop() if reused else await self._connect()
+                try:
+                    response, reusable = await asyncio.wait_for(
+                        self._exchange(connection, method, target, headers or {}, body), self.timeout
+                    )
+                except _Unanswered:
+                    connection.close()
+                    if reused and method.upper() in IDEMPOTENT_METHODS and (body is None or isinstance(body, bytes)):
+                        continue
+                    raise
+                except BaseException:
+                    connection.close()
+                    raise
+                if reusable:
+                    self._idle.append(connection)
+                else:
+                    connection.close()
+                return response
+
+    async def _connect(self) -> _Connection:
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port, ssl=self.ssl), self.timeout
+        )
+        self.opened += 1
+        return _Connection(reader, writer)
+
+    async def _exchange(
+        self,
+        connection: _Connection,
+        method: str,
+        target: str,
+        headers: Mapping[str, str],
+        body: bytes | AsyncIterable[bytes] | None,
+    ) -> tuple[Response, bool]:
+        lines = [f"{method} {target} HTTP/1.1", f"Host: {self.authority}", f"User-Agent: {USER_AGENT}"]
+        lines += [f"{name}: {value}" for name, value in headers.items()]
+        if isinstance(body, bytes):
+            lines.append(f"Content-Length: {len(body)}")
+        head = ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+        try:
+            if body is None or isinstance(body, bytes):
+                connection.writer.write(head + (body or b""))
+            else:
+                connection.writer.write(head)
+                async for chunk in body:
+                    connection.writer.write(chunk)
+                    await connection.writer.drain()
+            await connection.writer.drain()
+            sent_at = time.perf_counter()
+            status_line = await connection.reader.readline()
+        except ConnectionError as exc:
+            raise _Unanswered(f"connection lost before the response: {exc}") from exc
+        first_byte_at = time.perf_counter()
+        if not status_line:
+            raise _Unanswered("connection closed before the response")
+        try:
+            response, keep_alive = await self._read_response(connection.reader, method, status_line)
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError, ValueError) as exc:
+            raise HttpError(f"broken response to {method} {target}: {exc!r}") from exc
+        response.sent_at, response.first_byte_at = sent_at, first_byte_at
+        return response, keep_alive
+
+    @staticmethod
+    async def _read_response(
+        reader: asyncio.StreamReader, method: str, status_line: bytes
+    ) -> tuple[Response, bool]:
+        """Everything after the status line; raises ``ValueError`` or ``EOFError`` on malformed input."""
+        version, status, *_ = status_line.decode("latin-1").split(" ", 2)
+        code = int(status)
+        response_headers: dict[str, str] = {}
+        set_cookies: list[str] = []
+        while True:
+            line = (await reader.readline()).decode("latin-1").rstrip("\r\n")
+            if not line:
+                break
+            name, _, value = line.partition(":")
+            name, value = name.strip().lower(), value.strip()
+            if name == "set-cookie":
+                set_cookies.append(value)
+            response_headers[name] = value
+
+        keep_alive = version == "HTTP/1.1" and response_headers.get("connection", "").lower() != "close"
+        if method == "HEAD" or code in (204, 304) or 100 <= code < 200:
+            payload = b""
+        elif response_headers.get("transfer-encoding", "").lower() == "chunked":
+            payload = await _read_chunked(reader)
+        elif "content-length" in response_headers:
+            payload = await reader.readexactly(int(response_headers["content-length"]))
+        else:
+            payload = await reader.read()
+            keep_alive = False
+        return Response(code, response_headers, payload, set_cookies), keep_alive
+
+
+async def _read_chunked(reader: asyncio.StreamReader) -> bytes:
+    chunks = []
+    while True:
+        size_line = await reader.readline()
+        size = int(size_line.split(b";", 1)[0].strip() or b"0", 16)
+        if size == 0:
+            while (await reader.readline()).strip():
+                pass  # trailers
+            return b"".join(chunks)
+        chunks.append(await reader.readexactly(size))
+        await reader.readexactly(2)
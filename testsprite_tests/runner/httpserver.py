@@ -0,0 +1,203 @@
+"""Minimal asyncio HTTP/1.1 server for the local service stand-ins.
+
+The server side of :mod:`runner.httpclient`: ``Content-Length`` and chunked
+bodies, keep-alive unless the client says ``close``, and a
+:meth:`HttpServer.handle` coroutine per request.  Bodies are read into
+:attr:`Request.body` (up to ``MAX_BODY``) or, for requests
+:meth:`HttpServer.streams` picks, handed over unread as
+:attr:`Request.stream`.  Stdlib only, so the stand-ins start in milliseconds
+and serve thousands of requests per second from one event loop.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Mapping
+from urllib.parse import parse_qsl, urlsplit
+
+MAX_BODY = 1 << 20
+REASONS = {200: "OK", 201: "Created", 302: "Found", 400: "Bad Request", 401: "Unauthorized", 404: "Not Found"}
+
+
+class DropConnection(Exception):
+    """Send nothing and close the connection after ``after`` seconds (a timeout)."""
+
+    def __init__(self, after: float = 0.0) -> None:
+        super().__init__(after)
+        self.after = after
+
+
+class Body:
+    """A request body read from the connection as it arrives."""
+
+    def __init__(self, reader: asyncio.StreamReader, length: int | None) -> None:
+        self.reader = reader
+        self.length = length  # None: chunked
+        self.received = 0
+        self._chunk_left = 0
+        self._done = length == 0
+
+    async def chunks(self, size: int = 1 << 16) -> AsyncIterator[bytes]:
+        while not self._done:
+            if self.length is not None:
+                data = await self.reader.read(min(size, self.length - self.received))
+                if not data:
+                    raise asyncio.IncompleteReadError(b"", self.length - self.received)
+                self.received += len(data)
+                self._done = self.received >= self.length
+                yield data
+                continue
+            if not self._chunk_left:
+                line = await self.reader.readuntil(b"\r\n")
+                self._chunk_left = int(line.split(b";", 1)[0].strip() or b"0", 16)
+                if not self._chunk_left:
+                    while (await self.reader.readuntil(b"\r\n")).strip():
+                        pass  # trailers
+                    self._done = True
+                    return
+            data = await self.reader.read(min(size, self._chunk_left))
+            if not data:
+                raise asyncio.IncompleteReadError(b"", self._chunk_left)
+            self._chunk_left -= len(data)
+            self.received += len(data)
+            if not self._chunk_left:
+                await self.reader.readexactly(2)
+            yield data
+
+    async def read(self, limit: int = MAX_BODY) -> bytes:
+        parts = []
+        async for data in self.chunks():
+            parts.append(data)
+            if self.received > limit:
+                raise ValueError(f"request body over {limit} bytes")
+        return b"".join(parts)
+
+    async def drain(self) -> None:
+        """Discard what the handler left unread, so the connection can be reused."""
+        async for _ in self.chunks():
+            pass
+
+
+@dataclass
+class Request:
+    method: str
+    target: str
+    headers: Mapping[str, str]
+    body: bytes = b""
+    stream: Body | None = None
+
+    @property
+    def path(self) -> str:
+        return urlsplit(self.target).path.rstrip("/") or "/"
+
+    @property
+    def query(self) -> dict[str, str]:
+        return dict(parse_qsl(urlsplit(self.target).query))
+
+    def json(self) -> Any:
+        return json.loads(self.body) if self.body else {}
+
+    def form(self) -> dict[str, str]:
+        """The body as form fields, or as a JSON object when it is one."""
+        if self.headers.get("content-type", "").startswith("application/json"):
+            return {key: str(value) for key, value in self.json().items()}
+        return dict(parse_qsl(self.body.decode("utf-8")))
+
+
+@dataclass
+class Reply:
+    status: int
+    body: bytes = b""
+    content_type: str = "application/json; charset=utf-8"
+    headers: dict[str, str] = field(default_factory=dict)
+
+    @classmethod
+    def json(cls, status: int, payload: Any) -> "Reply":
+        return cls(status, json.dumps(payload, ensure_ascii=False).encode("utf-8"))
+
+    @classmethod
+    def redirect(cls, location: str) -> "Reply":
+        return cls(302, headers={"Location": location})
+
+
+class HttpServer:
+    """Subclasses implement :meth:`handle`; :meth:`close` also ends idle keep-alive connections."""
+
+    def __init__(self) -> None:
+        self._server: asyncio.AbstractServer | None = None
+        self._connections: set[asyncio.Task[None]] = set()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> int:
+        """Listen on ``host:port`` (0 picks a free port); returns the port."""
+        self._server = await asyncio.start_server(self._serve, host, port, backlog=1024)
+        return self._server.sockets[0].getsockname()[1]
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+        # Keep-alive and hanging connections would keep wait_closed() waiting.
+        for task in self._connections:
+            task.cancel()
+        await asyncio.gather(*self._connections, return_exceptions=True)
+        if self._server is not None:
+            await self._server.wait_closed()
+
+    async def handle(self, request: Request) -> Reply:
+        raise NotImplementedError
+
+    def streams(self, request: Request) -> bool:
+        """Whether ``request`` gets its body as :attr:`Request.stream` instead of :attr:`Request.body`."""
+        return False
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        task = asyncio.current_task()
+        if task is not None:
+            self._connections.add(task)
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    return
+                request_line, *header_lines = head.decode("latin-1").split("\r\n")
+                method, target, version = (request_line.split(" ", 2) + ["", ""])[:3]
+                headers = {}
+                for line in header_lines:
+                    name, _, value = line.partition(":")
+                    if name:
+                        headers[name.strip().lower()] = value.strip()
+                chunked = headers.get("transfer-encoding", "").lower() == "chunked"
+                body = Body(reader, None if chunked else int(headers.get("content-length") or 0))
+                request = Request(method, target, headers)
+                if self.streams(request):
+                    request.stream = body
+                else:
+                    try:
+                        request.body = await body.read()
+                    except ValueError:
+                        return
+                try:
+                    reply = await self.handle(request)
+                except DropConnection as drop:
+                    await asyncio.sleep(drop.after)
+                    return
+                await body.drain()
+                keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                lines = [
+                    f"HTTP/1.1 {reply.status} {REASONS.get(reply.status, 'Error' if reply.status >= 400 else 'OK')}",
+                    f"Content-Type: {reply.content_type}",
+                    f"Content-Length: {len(reply.body)}",
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}",
+                    *(f"{name}: {value}" for name, value in reply.headers.items()),
+                ]
+                writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + reply.body)
+                await writer.drain()
+                if not keep_alive:
+                    return
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            return  # a cancelled handler ends quietly instead of logging from the stream callback
+        finally:
+            writer.close()
+            self._connections.discard(task)
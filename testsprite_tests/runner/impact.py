@@ -0,0 +1,321 @@
+"""Run only the cases a change can affect; reuse cached results for the rest.
+
+Changed files (``git diff --name-only <ref>``) are expanded through the
+import graph of ``src/`` to everything that transitively imports them, then
+mapped to features via ``tmp/code_summary.json`` and to cases via
+:data:`FEATURE_CASES`.  Files that shape every page (root layout, config,
+Prisma schema, translations...) select the whole suite.
+
+Every outcome is stored in ``tmp/result_cache.json`` under a content hash of
+the case itself plus every file its features depend on.  An unaffected case
+is reused from that cache when its hash matches; otherwise it runs anyway.
+Entries recorded at commits older than the last :data:`CACHE_COMMITS` are
+dropped on save.  Without a code summary no feature can be mapped, so every
+case is selected.
+"""
+
+from __future__ import annotations
+
+import fnmatch
+import hashlib
+import json
+import logging
+import re
+import subprocess
+from collections import defaultdict
+from dataclasses import asdict
+from pathlib import Path
+from typing import Iterable
+
+from .paths import REPO_ROOT, TMP_DIR
+from .suite import RunnableCase, TestOutcome
+
+logger = logging.getLogger(__name__)
+
+CODE_SUMMARY_PATH = TMP_DIR / "code_summary.json"
+RESULT_CACHE_PATH = TMP_DIR / "result_cache.json"
+CACHE_COMMITS = 20
+
+# Which generated cases exercise each feature of code_summary.json, plus a
+# few features the summary does not list.
+FEATURE_CASES: dict[str, tuple[str, ...]] = {
+    "Authentication": (
+        "TC001", "TC002", "TC003", "TC004", "TC006", "TC007", "TC008", "TC009",
+        "TC010", "TC011", "TC013", "TC015", "TC019", "TC020",
+    ),
+    "Marketplace": ("TC005", "TC006", "TC007", "TC008", "TC016", "TC017", "TC018"),
+    "Payment": ("TC007", "TC008"),
+    "Dashboard": ("TC001", "TC006", "TC011", "TC020"),
+    "Admin": ("TC015",),
+    "Community": ("TC009", "TC010"),
+    "Education": (),
+    "Realtime": ("TC013",),
+    "PWA": (),
+    "Health": ("TC014",),
+    "I18n": ("TC012",),
+    "Search": ("TC005", "TC018"),
+    "Upload": ("TC017",),
+    "Recommendations": ("TC011",),
+    "Notifications": ("TC013",),
+}
+
+EXTRA_FEATURE_FILES: dict[str, tuple[str, ...]] = {
+    "Health": ("src/app/api/health/route.ts", "src/app/api/health/db/route.ts"),
+    "I18n": ("src/i18n/request.ts",),
+    "Search": ("src/app/api/search/suggestions/route.ts", "src/app/api/search/popular/route.ts"),
+    "Upload": ("src/app/api/upload/route.ts", "src/lib/cloudinary.ts"),
+    "Recommendations": ("src/app/api/recommendations/route.ts",),
+    "Notifications": ("src/app/api/notifications/route.ts",),
+}
+
+# Files a case depends on outside its features: the language switch lives
+# in the header.
+EXTRA_CASE_FILES: dict[str, tuple[str, ...]] = {
+    "TC012": ("src/components/layout/header.tsx",),
+    "TC014": ("src/components/layout/header.tsx",),
+}
+
+GLOBAL_PATTERNS = (
+    "package.json",
+    "package-lock.json",
+    "next.config.js",
+    "tsconfig.json",
+    "tailwind.config.*",
+    "postcss.config.mjs",
+    "prisma/schema.prisma",
+    "prisma/seed.ts",
+    "messages/*.json",
+    "src/app/layout.tsx",
+    "src/app/globals.css",
+    "src/middleware.ts",
+    "testsprite_tests/runner/*",
+)
+
+SOURCE_SUFFIXES = (".ts", ".tsx", ".js", ".jsx", ".mjs")
+_IMPORT_RE = re.compile(
+    r"""(?:import|export)\s[^'";]*?from\s*['"]([^'"]+)['"]"""
+    r"""|import\s*\(\s*['"]([^'"]+)['"]\s*\)"""
+    r"""|require\(\s*['"]([^'"]+)['"]\s*\)"""
+    r"""|^\s*import\s+['"]([^'"]+)['"]""",
+    re.MULTILINE,
+)
+_ROUTE_WRAPPERS = ("layout", "template", "loading", "error", "not-found")
+
+
+class ImportGraph:
+    """Repo-relative import edges between the app's source files."""
+
+    def __init__(self, edges: dict[str, set[str]]) -> None:
+        self.edges = edges
+        self.reverse: dict[str, set[str]] = defaultdict(set)
+        for source, targets in edges.items():
+            for target in targets:
+                self.reverse[target].add(source)
+
+    @classmethod
+    def build(cls, root: Path = REPO_ROOT, source_dir: str = "src") -> "ImportGraph":
+        edges: dict[str, set[str]] = {}
+        for path in (root / source_dir).rglob("*"):
+            if path.suffix not in SOURCE_SUFFIXES or "node_modules" in path.parts:
+                continue
+            relative = path.relative_to(root).as_posix()
+            text = path.read_text(encoding="utf-8", errors="replace")
+            targets = set()
+            for match in _IMPORT_RE.finditer(text):
+                resolved = _resolve(root, path, next(group for group in match.groups() if group))
+                if resolved:
+                    targets.add(resolved)
+            targets.update(_route_wrappers(root, path))
+            edges[relative] = targets
+        return cls(edges)
+
+    def importers(self, files: Iterable[str]) -> set[str]:
+        """``files`` plus everything that transitively imports them."""
+        return _closure(files, self.reverse)
+
+    def dependencies(self, files: Iterable[str]) -> set[str]:
+        """``files`` plus everything they transitively import."""
+        return _closure(files, self.edges)
+
+
+def _closure(start: Iterable[str], edges: dict[str, set[str]]) -> set[str]:
+    seen = set(start)
+    stack = list(seen)
+    while stack:
+        for neighbour in edges.get(stack.pop(), ()):
+            if neighbour not in seen:
+                seen.add(neighbour)
+                stack.append(neighbour)
+    return seen
+
+
+def _resolve(root: Path, importer: Path, specifier: str) -> str | None:
+    if specifier.startswith("@/"):
+        base = root / "src" / specifier[2:]
+    elif specifier.startswith("."):
+        base = importer.parent / specifier
+    else:
+        return None
+    candidates = [base, *(base.with_name(base.name + suffix) for suffix in SOURCE_SUFFIXES)]
+    candidates += [base / f"index{suffix}" for suffix in SOURCE_SUFFIXES]
+    for candidate in candidates:
+        if candidate.is_file():
+            return candidate.resolve().relative_to(root.resolve()).as_posix()
+    return None
+
+
+def _route_wrappers(root: Path, path: Path) -> set[str]:
+    """App Router pages are implicitly wrapped by ancestor layouts and friends."""
+    if path.stem != "page":
+        return set()
+    wrappers = set()
+    app_dir = root / "src" / "app"
+    directory = path.parent
+    while directory == app_dir or app_dir in directory.parents:
+        for name in _ROUTE_WRAPPERS:
+            for suffix in (".tsx", ".ts", ".jsx", ".js"):
+                candidate = directory / f"{name}{suffix}"
+                if candidate.is_file():
+                    wrappers.add(candidate.relative_to(root).as_posix())
+        directory = directory.parent
+    return wrappers
+
+
+def load_features(path: Path = CODE_SUMMARY_PATH) -> dict[str, tuple[str, ...]]:
+    """Feature name to entry files; empty when there is no readable code summary."""
+    try:
+        summary = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError) as exc:
+        logger.warning("no code summary at %s (%s); every case counts as affected", path, exc)
+        return {}
+    features = {feature["name"]: tuple(feature.get("files", ())) for feature in summary.get("features", [])}
+    for name, files in EXTRA_FEATURE_FILES.items():
+        features[name] = tuple(dict.fromkeys((*features.get(name, ()), *files)))
+    return features
+
+
+def changed_files(ref: str, root: Path = REPO_ROOT) -> list[str]:
+    """Files that differ between ``ref`` and the working tree, plus untracked ones."""
+    diff = subprocess.run(
+        ["git", "diff", "--name-only", ref],
+        cwd=root, check=True, capture_output=True, text=True,
+    ).stdout.splitlines()
+    untracked = subprocess.run(
+        ["git", "ls-files", "--others", "--exclude-standard"],
+        cwd=root, check=True, capture_output=True, text=True,
+    ).stdout.splitlines()
+    return sorted(set(diff) | set(untracked))
+
+
+def recent_commits(count: int = CACHE_COMMITS, root: Path = REPO_ROOT) -> list[str]:
+    """The last ``count`` commits of ``HEAD``, newest first; empty outside a git checkout."""
+    try:
+        return subprocess.run(
+            ["git", "rev-list", f"--max-count={count}", "HEAD"],
+            cwd=root, check=True, capture_output=True, text=True,
+        ).stdout.split()
+    except (OSError, subprocess.CalledProcessError):
+        return []
+
+
+class ImpactSelector:
+    def __init__(
+        self,
+        graph: ImportGraph | None = None,
+        features: dict[str, tuple[str, ...]] | None = None,
+        feature_cases: dict[str, tuple[str, ...]] = FEATURE_CASES,
+    ) -> None:
+        self.graph = graph or ImportGraph.build()
+        self.features = features if features is not None else load_features()
+        self.feature_cases = feature_cases
+
+    def affected_features(self, changed: Iterable[str]) -> set[str]:
+        touched = self.graph.importers(changed)
+        return {name for name, files in self.features.items() if touched.intersection(files)}
+
+    def select(self, changed: Iterable[str], cases: Iterable[RunnableCase]) -> list[RunnableCase]:
+        """The subset of ``cases`` that ``changed`` can affect."""
+        changed = list(changed)
+        cases = list(cases)
+        if not self.features:
+            return cases
+        if any(fnmatch.fnmatch(path, pattern) for path in changed for pattern in GLOBAL_PATTERNS):
+            return cases
+        selected = {
+            case_id
+            for feature in self.affected_features(changed)
+            for case_id in self.feature_cases.get(feature, ())
+        }
+        touched = self.graph.importers(changed)
+        selected.update(case_id for case_id, files in EXTRA_CASE_FILES.items() if touched.intersection(files))
+        for case in cases:
+            path = getattr(case, "path", None)
+            if path is not None and Path(path).resolve().relative_to(REPO_ROOT).as_posix() in changed:
+                selected.add(case.case_id)
+        return [case for case in cases if case.case_id in selected]
+
+    def case_files(self, case_id: str) -> set[str]:
+        """Every source file the features of ``case_id`` depend on."""
+        entry_points = [
+            file
+            for feature, case_ids in self.feature_cases.items()
+            if case_id in case_ids
+            for file in self.features.get(feature, ())
+        ]
+        return self.graph.dependencies([*entry_points, *EXTRA_CASE_FILES.get(case_id, ())])
+
+
+class ResultCache:
+    """Outcomes keyed by a content hash of a case and its dependencies."""
+
+    def __init__(self, selector: ImpactSelector, path: Path = RESULT_CACHE_PATH, root: Path = REPO_ROOT) -> None:
+        self.selector = selector
+        self.path = path
+        self.root = root
+        try:
+            self.entries: dict[str, dict] = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            self.entries = {}
+        self._file_hashes: dict[str, str] = {}
+        self._commits = recent_commits(root=root)
+        self._revision = self._commits[0] if self._commits else ""
+        self._global_files = sorted(
+            {
+                path.relative_to(root).as_posix()
+                for pattern in GLOBAL_PATTERNS
+                for path in root.glob(pattern)
+                if path.is_file()
+            }
+        )
+
+    def key(self, case: RunnableCase) -> str:
+        digest = hashlib.sha256()
+        digest.update(case.case_id.encode())
+        digest.update(getattr(case, "source", "").encode())
+        for file in sorted(self.selector.case_files(case.case_id)) + self._global_files:
+            digest.update(file.encode())
+            digest.update(self._hash_file(file).encode())
+        return digest.hexdigest()
+
+    def _hash_file(self, file: str) -> str:
+        if file not in self._file_hashes:
+            try:
+                self._file_hashes[file] = hashlib.sha256((self.root / file).read_bytes()).hexdigest()
+            except OSError:
+                self._file_hashes[file] = "missing"
+        return self._file_hashes[file]
+
+    def get(self, case: RunnableCase) -> TestOutcome | None:
+        entry = self.entries.get(self.key(case))
+        return TestOutcome(**{**entry["outcome"], "cached": True}) if entry and "outcome" in entry else None
+
+    def put(self, case: RunnableCase, outcome: TestOutcome) -> None:
+        self.entries[self.key(case)] = {"revision": self._revision, "outcome": {**asdict(outcome), "cached": False}}
+
+    def save(self) -> None:
+        """Write the cache without entries from commits older than the last :data:`CACHE_COMMITS`."""
+        recent = set(self._commits)
+        if recent:
+            self.entries = {key: entry for key, entry in self.entries.items() if entry.get("revision") in recent}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text(json.dumps(self.entries, ensure_ascii=False, indent=1) + "\n", encoding="utf-8")
@@ -0,0 +1,220 @@
+"""Execute :class:`~runner.plan.StepCase` step lists on a leased browser.
+
+All cases share the runner's process and event loop.  Consecutive assertions
+are checked concurrently, since they only read the final page state; the
+scripts ran them one by one, each with its own 30 second timeout.  With a
+:class:`~runner.flaky.RetryBudget`, a failing step is retried on its own
+instead of the whole case; with a :class:`~runner.checkpoint.CheckpointStore`,
+a case can resume after the last step that passed.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from itertools import groupby
+from typing import TYPE_CHECKING, Awaitable, Callable
+from urllib.parse import urljoin
+
+from .paths import base_url
+from .plan import ASSERTION, Step, StepCase, step_key
+
+if TYPE_CHECKING:
+    from playwright.async_api import BrowserContext, Locator, Page
+
+    from .checkpoint import CheckpointStore
+    from .flaky import RetryBudget
+    from .pool import BrowserLease
+    from .selectors import SelectorCompiler
+    from .waits import WaitEngine
+
+DEFAULT_TIMEOUT_MS = 5000
+NAVIGATION_TIMEOUT_MS = 10000
+ASSERTION_TIMEOUT_MS = 30000
+RETRY_DELAY_S = 0.5
+
+
+class StepError(AssertionError):
+    """A step failed; carries its position so reports can point at it."""
+
+    def __init__(self, index: int, step: Step, cause: BaseException) -> None:
+        self.index = index
+        self.step = step
+        self.cause = cause
+        super().__init__(f"step {index + 1} ({step.label()}): {cause}")
+
+
+StepTimer = Callable[[int, Step, float], None]
+StepRetry = Callable[[int, Step], bool]
+
+
+async def run_steps(
+    case: StepCase,
+    lease: "BrowserLease",
+    waits: "WaitEngine | None" = None,
+    on_step: StepTimer | None = None,
+    selectors: "SelectorCompiler | None" = None,
+    retries: "RetryBudget | None" = None,
+    checkpoints: "CheckpointStore | None" = None,
+    skip: frozenset[int] = frozenset(),
+) -> None:
+    """Run ``case``; ``on_step(index, step, seconds)`` is called after every passed step.
+
+    With ``selectors``, absolute XPaths are replaced by the semantic locators
+    it compiled for them (see :mod:`runner.selectors`); with ``retries``,
+    failed steps are repeated while the budget lasts; with ``checkpoints``,
+    the state after each passed step is saved and, when resuming, restored.
+    Steps whose index is in ``skip`` are left out; the others keep their index.
+    """
+    checkpoint = checkpoints.load(case) if checkpoints is not None else None
+    if checkpoint is not None:
+        context = await lease.new_context(storage_state=checkpoint.storage_state)
+    else:
+        context = await lease.new_context()
+    context.set_default_timeout(DEFAULT_TIMEOUT_MS)
+    page = await context.new_page()
+    indexed = [(index, step) for index, step in enumerate(case.steps) if index not in skip]
+    if checkpoint is not None and checkpoints is not None:
+        await checkpoints.restore(checkpoint, context, page, waits)
+        indexed = [(index, step) for index, step in indexed if index > checkpoint.index]
+    retry = (lambda index, step: retries.take(case.case_id, step_key(index, step))) if retries else None
+    for is_assertion, group in groupby(indexed, key=lambda item: item[1].type == ASSERTION):
+        batch = list(group)
+        if is_assertion:
+            await _check_all(context, batch, on_step, selectors, retry)
+        else:
+            for index, step in batch:
+                await _guarded(index, step, lambda: perform(context, step, waits, selectors), on_step, retry)
+                if checkpoints is not None:
+                    await checkpoints.save(case, index, context)
+        if is_assertion and checkpoints is not None:
+            await checkpoints.save(case, batch[-1][0], context)
+    if checkpoints is not None:
+        checkpoints.clear(case)
+
+
+async def _guarded(
+    index: int,
+    step: Step,
+    operation: Callable[[], Awaitable[None]],
+    on_step: StepTimer | None = None,
+    retry: StepRetry | None = None,
+) -> None:
+    started = time.perf_counter()
+    while True:
+        try:
+            await operation()
+            break
+        except StepError:
+            raise
+        except Exception as exc:  # noqa: BLE001 - re-raised with step context
+            if retry is None or not retry(index, step):
+                raise StepError(index, step, exc) from exc
+        await asyncio.sleep(RETRY_DELAY_S)
+    if on_step is not None:
+        on_step(index, step, time.perf_counter() - started)
+
+
+async def _check_all(
+    context: "BrowserContext",
+    batch: list[tuple[int, Step]],
+    on_step: StepTimer | None = None,
+    selectors: "SelectorCompiler | None" = None,
+    retry: StepRetry | None = None,
+) -> None:
+    results = await asyncio.gather(
+        *(
+            _guarded(index, step, lambda step=step: check(context, step, selectors), on_step, retry)
+            for index, step in batch
+        ),
+        return_exceptions=True,
+    )
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+
+
+async def locate(page: "Page", step: Step, selectors: "SelectorCompiler | None" = None) -> "Locator":
+    from .selectors import is_compilable
+
+    if selectors is not None and is_compilable(step.selector):
+        return await selectors.locate(page, step.selector or "", step.nth)
+    locator = page.locator(step.selector or "")
+    return locator.nth(step.nth) if step.nth is not None else locator
+
+
+async def perform(
+    context: "BrowserContext",
+    step: Step,
+    waits: "WaitEngine | None" = None,
+    selectors: "SelectorCompiler | None" = None,
+) -> None:
+    action = ACTIONS.get(step.action or "")
+    if action is None:
+        raise ValueError(f"unsupported action {step.action!r}")
+    await action(context.pages[-1], step, waits, selectors)
+
+
+async def check(context: "BrowserContext", step: Step, selectors: "SelectorCompiler | None" = None) -> None:
+    from playwright.async_api import expect
+
+    if step.assertion != "visible":
+        raise ValueError(f"unsupported assertion {step.assertion!r}")
+    locator = await locate(context.pages[-1], step, selectors)
+    try:
+        await expect(locator).to_be_visible(timeout=step.timeout or ASSERTION_TIMEOUT_MS)
+    except AssertionError:
+        if step.message:
+            raise AssertionError(step.message) from None
+        raise
+
+
+async def _goto(
+    page: "Page", step: Step, waits: "WaitEngine | None", selectors: "SelectorCompiler | None"
+) -> None:
+    url = urljoin(base_url() + "/", step.url or "")
+    await page.goto(url, wait_until="commit", timeout=step.timeout or NAVIGATION_TIMEOUT_MS)
+    if waits is not None:
+        await waits.after_navigation(page, 3)
+    else:
+        await page.wait_for_load_state("domcontentloaded")
+
+
+async def _settled_locate(
+    page: "Page", step: Step, waits: "WaitEngine | None", selectors: "SelectorCompiler | None", action: str
+) -> "Locator":
+    """Locate once the page has settled, so the route and markup selectors compile against are final."""
+    if waits is None:
+        return await locate(page, step, selectors)
+    return await waits.before_located_action(page, 3000, lambda: locate(page, step, selectors), action)
+
+
+async def _click(
+    page: "Page", step: Step, waits: "WaitEngine | None", selectors: "SelectorCompiler | None"
+) -> None:
+    locator = await _settled_locate(page, step, waits, selectors, "click")
+    await locator.click(timeout=step.timeout or DEFAULT_TIMEOUT_MS)
+
+
+async def _fill(
+    page: "Page", step: Step, waits: "WaitEngine | None", selectors: "SelectorCompiler | None"
+) -> None:
+    locator = await _settled_locate(page, step, waits, selectors, "fill")
+    await locator.fill(step.value or "", timeout=step.timeout or DEFAULT_TIMEOUT_MS)
+
+
+async def _scroll(
+    page: "Page", step: Step, waits: "WaitEngine | None", selectors: "SelectorCompiler | None"
+) -> None:
+    delta_y = await page.evaluate(step.y) if isinstance(step.y, str) else step.y or 0
+    await page.mouse.wheel(step.x or 0, delta_y)
+
+
+Action = Callable[["Page", Step, "WaitEngine | None", "SelectorCompiler | None"], Awaitable[None]]
+
+ACTIONS: dict[str, Action] = {
+    "goto": _goto,
+    "click": _click,
+    "fill": _fill,
+    "scroll": _scroll,
+}
@@ -0,0 +1,394 @@
+"""Browser-free virtual users walking the user journeys of the TC scripts.
+
+:mod:`runner.load` measures endpoints one by one; capacity depends on the
+mix real users produce.  A :class:`Journey` is the request sequence behind
+one UI flow, split into :class:`Action` s: each action is one click or page
+view, its :class:`Call` s go out together the way a browser fires a page's
+fetches, and a think time separates the actions.
+
+Built-in journeys (:data:`JOURNEYS`) follow TC005 (browse the marketplace),
+TC018 (search), TC008 (open a product and start checkout) and TC009 (read
+the community), with the calls the pages make.  Static assets are left out;
+browsers cache them.  ``from_har`` derives the same shape from a recorded
+``tmp/har/TCxxx.har`` instead, grouping requests sent close together into
+one action.
+
+:func:`simulate` runs ``users`` virtual users as asyncio tasks, each picking
+journeys by weight until the duration is up, with its own cookie jar and the
+cached session of the journey's role.  Ids come from earlier responses
+(``capture``), so users spread over different products and posts.  Latency
+is recorded per call and per journey (the time the user waited, think time
+excluded); a failed call ends its journey.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import random
+import re
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Iterable, Mapping, Sequence
+from urllib.parse import urlencode, urlsplit
+
+from .bootpay import Latency
+from .har import HAR_DIR
+from .histogram import Histogram
+from .httpclient import ConnectionPool, cookie_header, store_cookies
+from .load import EndpointStats
+
+DEFAULT_THINK = "lognormal:3000,0.6"
+# Requests that start within this many seconds of the previous one in a HAR
+# belong to the same action.
+HAR_GAP = 0.5
+# Request headers worth replaying from a HAR: Next.js client navigations
+# fetch the RSC payload of a page and are told apart by these.
+_HAR_HEADERS = frozenset({"accept", "content-type", "next-router-prefetch", "next-router-state-tree", "next-url", "rsc"})
+_STATIC = re.compile(r"^/(_next/|favicon|icons/|images/)|\.(js|css|map|png|jpe?g|gif|svg|webp|ico|woff2?)$")
+
+
+@dataclass(frozen=True)
+class Call:
+    """One request; ``{name}`` in the path is filled from earlier captures."""
+
+    name: str
+    path: str
+    method: str = "GET"
+    body: bytes | None = None
+    headers: Mapping[str, str] = field(default_factory=dict)
+    # variable -> dotted path into the JSON response; ``*`` picks a random item.
+    capture: Mapping[str, str] = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class Action:
+    name: str
+    calls: tuple[Call, ...]
+
+
+@dataclass(frozen=True)
+class Journey:
+    name: str
+    case_id: str
+    actions: tuple[Action, ...]
+    weight: float = 1.0
+    role: str | None = None  # cached session to start from
+
+
+def _page(path: str) -> tuple[Call, ...]:
+    """The document and the session lookup every page makes."""
+    return Call(f"page {path}", path, headers={"Accept": "text/html"}), Call("session", "/api/auth/session")
+
+
+def _products(name: str, capture: Mapping[str, str] | None = None, **params: Any) -> Call:
+    query = {"page": 1, "limit": 12, "sortBy": "createdAt", "sortOrder": "desc", **params}
+    return Call(name, "/api/products?" + urlencode(query, safe="{}"), capture=capture or {})
+
+
+JOURNEYS = {
+    journey.name: journey
+    for journey in (
+        Journey(
+            "browse",
+            "TC005",
+            (
+                Action(
+                    "open marketplace",
+                    (
+                        *_page("/marketplace"),
+                        Call("categories", "/api/categories", capture={"category": "categories.*.id"}),
+                        Call("popular tags", "/api/search/popular?limit=10"),
+                        _products("products"),
+                    ),
+                ),
+                Action(
+                    "search keyword",
+                    (
+                        Call("suggestions", "/api/search/suggestions?" + urlencode({"q": "코딩", "limit": 5})),
+                        _products("products search", search="코딩"),
+                    ),
+                ),
+                Action("category filter", (_products("products category", category="{category}"),)),
+                Action("sort", (_products("products sorted", sortBy="price", sortOrder="asc"),)),
+                Action("next page", (_products("products page 2", page=2),)),
+            ),
+            weight=4,
+        ),
+        Journey(
+            "search",
+            "TC018",
+            (
+                Action("open home", _page("/")),
+                Action("open search", (Call("popular tags", "/api/search/popular?limit=10"),)),
+                Action("type query", (Call("suggestions", "/api/search/suggestions?" + urlencode({"q": "AI", "limit": 5})),)),
+                Action("submit search", (_products("products search", search="AI"),)),
+            ),
+            weight=2,
+        ),
+        Journey(
+            "checkout",
+            "TC008",
+            (
+                Action(
+                    "open marketplace",
+                    (*_page("/marketplace"), _products("products", capture={"product": "products.*.id"})),
+                ),
+                Action(
+                    "open product",
+                    (
+                        *_page("/marketplace/{product}"),
+                        Call("purchase check", "/api/purchases?productId={product}"),
+                        Call("wishlist check", "/api/wishlist/check?productId={product}"),
+                        Call("reviews", "/api/reviews?productId={product}"),
+                    ),
+                ),
+                # 구매하기 opens the payment selector; paying itself is the Bootpay stand-in's job.
+                Action("start checkout", (Call("payment providers", "/api/payment/providers?type=providers"),)),
+            ),
+            weight=3,
+            role="buyer",
+        ),
+        Journey(
+            "community",
+            "TC009",
+            (
+                Action(
+                    "open community",
+                    (*_page("/community"), Call("posts", "/api/posts", capture={"post": "posts.*.id"})),
+                ),
+                Action("open post", (*_page("/community/{post}"), Call("post", "/api/posts/{post}"))),
+                Action("category", (Call("posts category", "/api/posts?category=qa"),)),
+                Action("search", (Call("posts search", "/api/posts?" + urlencode({"search": "질문"})),)),
+            ),
+            weight=2,
+        ),
+    )
+}
+
+
+def from_har(path: Path, name: str, *, weight: float = 1.0, role: str | None = None) -> Journey:
+    """A journey from the same-origin documents and API calls of a recorded HAR."""
+    entries = json.loads(path.read_text(encoding="utf-8"))["log"]["entries"]
+    origin = None
+    actions: list[list[Call]] = []
+    last_start = None
+    for entry in sorted(entries, key=lambda entry: entry["startedDateTime"]):
+        request = entry["request"]
+        url = urlsplit(request["url"])
+        if origin is None:
+            origin = url.netloc
+        if url.netloc != origin or _STATIC.search(url.path):
+            continue
+        if url.path.startswith("/api/auth/") and url.path != "/api/auth/session":
+            continue  # the virtual user starts signed in
+        mime = entry.get("response", {}).get("content", {}).get("mimeType", "")
+        if not url.path.startswith("/api/") and "html" not in mime and "x-component" not in mime:
+            continue
+        started = _timestamp(entry["startedDateTime"])
+        if last_start is None or started - last_start > HAR_GAP:
+            actions.append([])
+        last_start = started
+        target = (url.path + (f"?{url.query}" if url.query else "")).replace("{", "{{").replace("}", "}}")
+        text = (request.get("postData") or {}).get("text")
+        headers = {
+            header["name"]: header["value"] for header in request.get("headers", []) if header["name"].lower() in _HAR_HEADERS
+        }
+        actions[-1].append(
+            Call(f"{request['method']} {url.path}", target, request["method"], text.encode("utf-8") if text else None, headers)
+        )
+    if not actions:
+        raise ValueError(f"{path} has no same-origin page or API requests")
+    return Journey(
+        name,
+        path.stem,
+        tuple(Action(f"step {index}", tuple(calls)) for index, calls in enumerate(actions, 1)),
+        weight=weight,
+        role=role,
+    )
+
+
+def _timestamp(value: str) -> float:
+    return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+
+
+def with_recordings(journeys: Iterable[Journey], directory: Path = HAR_DIR) -> list[Journey]:
+    """``journeys`` with each one replaced by its case's HAR when one was recorded."""
+    replaced = []
+    for journey in journeys:
+        har = directory / f"{journey.case_id}.har"
+        replaced.append(from_har(har, journey.name, weight=journey.weight, role=journey.role) if har.exists() else journey)
+    return replaced
+
+
+def _extract(payload: Any, path: str, rng: random.Random) -> Any:
+    for part in path.split("."):
+        if part == "*":
+            if not isinstance(payload, list) or not payload:
+                return None
+            payload = rng.choice(payload)
+        elif isinstance(payload, list):
+            payload = payload[int(part)] if part.isdigit() and int(part) < len(payload) else None
+        elif isinstance(payload, dict):
+            payload = payload.get(part)
+        else:
+            return None
+    return payload
+
+
+class JourneyFailed(Exception):
+    pass
+
+
+@dataclass
+class JourneyStats:
+    """Waited time per journey in microseconds, and each call's latency."""
+
+    latency: Histogram = field(default_factory=Histogram)
+    failures: Counter[str] = field(default_factory=Counter)
+    calls: dict[str, EndpointStats] = field(default_factory=dict)
+
+    def summary(self) -> dict[str, Any]:
+        return {
+            "completed": self.latency.total,
+            "failed": sum(self.failures.values()),
+            "failures": dict(self.failures.most_common()),
+            **{f"p{p:g}_ms": round(self.latency.percentile(p) / 1000, 2) for p in (50, 95, 99)},
+            "calls": {name: stats.summary() for name, stats in self.calls.items()},
+        }
+
+
+@dataclass
+class SimulationResult:
+    users: int
+    elapsed: float
+    journeys: dict[str, JourneyStats]
+
+    @property
+    def requests(self) -> int:
+        return sum(stats.latency.total for journey in self.journeys.values() for stats in journey.calls.values())
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "users": self.users,
+            "elapsed": round(self.elapsed, 2),
+            "requests_per_second": round(self.requests / self.elapsed, 2) if self.elapsed else 0.0,
+            "journeys": {name: stats.summary() for name, stats in self.journeys.items()},
+        }
+
+
+class VirtualUser:
+    def __init__(self, pool: ConnectionPool, sessions: Mapping[str, Mapping[str, str]], rng: random.Random) -> None:
+        self.pool = pool
+        self.sessions = sessions
+        self.rng = rng
+
+    async def run(self, journey: Journey, stats: JourneyStats, think: Latency, deadline: float) -> bool:
+        """Walk ``journey``; False when the deadline came first."""
+        jar = dict(self.sessions.get(journey.role or "", {}))
+        variables: dict[str, Any] = {}
+        waited = 0.0
+        try:
+            for action in journey.actions:
+                await asyncio.sleep(think.sample(self.rng))
+                if time.perf_counter() > deadline:
+                    return False
+                started = time.perf_counter()
+                await asyncio.gather(*(self._call(call, jar, variables, stats) for call in action.calls))
+                waited += time.perf_counter() - started
+        except JourneyFailed as failure:
+            stats.failures[str(failure)] += 1
+            return True
+        stats.latency.record(int(waited * 1_000_000))
+        return True
+
+    async def _call(self, call: Call, jar: dict[str, str], variables: dict[str, Any], stats: JourneyStats) -> None:
+        try:
+            target = call.path.format_map(variables)
+        except KeyError as missing:
+            raise JourneyFailed(f"{call.name}: nothing captured for {missing}") from None
+        headers = {"Accept": "application/json", **call.headers, **cookie_header(jar)}
+        if call.body is not None and "Content-Type" not in headers:
+            headers["Content-Type"] = "application/json"
+        started = time.perf_counter()
+        try:
+            response = await self.pool.request(call.method, target, headers=headers, body=call.body)
+        except (OSError, asyncio.TimeoutError) as exc:
+            stats.calls.setdefault(call.name, EndpointStats()).record(
+                int((time.perf_counter() - started) * 1_000_000), type(exc).__name__, True
+            )
+            raise JourneyFailed(f"{call.name}: {type(exc).__name__}") from None
+        stats.calls.setdefault(call.name, EndpointStats()).record(
+            int((time.perf_counter() - started) * 1_000_000), str(response.status), response.status >= 400
+        )
+        if response.status >= 400:
+            raise JourneyFailed(f"{call.name}: HTTP {response.status}")
+        store_cookies(response, jar)
+        for variable, path in call.capture.items():
+            try:
+                value = _extract(response.json(), path, self.rng)
+            except ValueError:
+                value = None
+            if value is not None:
+                variables[variable] = value
+
+
+async def simulate(
+    app_url: str,
+    journeys: Sequence[Journey],
+    users: int,
+    duration: float,
+    *,
+    think: Latency,
+    ramp_up: float = 10.0,
+    sessions: Mapping[str, Mapping[str, str]] | None = None,
+    connections: int = 256,
+    timeout: float = 30.0,
+    seed: int | None = None,
+) -> SimulationResult:
+    """``users`` virtual users walking ``journeys`` for ``duration`` seconds.
+
+    Users start evenly over ``ramp_up`` seconds.  They share ``connections``
+    keep-alive connections; time spent waiting for one counts as latency.
+    ``sessions`` maps a role to the cookies its journeys start with.
+    """
+    stats = {journey.name: JourneyStats() for journey in journeys}
+    weights = [journey.weight for journey in journeys]
+    seeds = random.Random(seed)
+
+    async def user(index: int, pool: ConnectionPool) -> None:
+        await asyncio.sleep(ramp_up * index / users)
+        rng = random.Random(seeds.random())
+        visitor = VirtualUser(pool, sessions or {}, rng)
+        while time.perf_counter() < deadline:
+            journey = rng.choices(journeys, weights)[0]
+            if not await visitor.run(journey, stats[journey.name], think, deadline):
+                return
+
+    started = time.perf_counter()
+    deadline = started + ramp_up + duration
+    async with ConnectionPool(app_url, connections, timeout=timeout) as pool:
+        await asyncio.gather(*(user(index, pool) for index in range(users)))
+    return SimulationResult(users, time.perf_counter() - started, stats)
+
+
+def format_simulation(result: SimulationResult) -> str:
+    lines = [
+        f"{result.users} users for {result.elapsed:.0f}s: {result.requests} requests "
+        f"({result.requests / result.elapsed if result.elapsed else 0:.1f}/s)",
+        f"{'journey / call':28} {'count':>7} {'fail':>6} {'p50':>9} {'p95':>9} {'p99':>9}",
+    ]
+
+    def row(name: str, count: int, failed: int, histogram: Histogram) -> str:
+        p50, p95, p99 = (histogram.percentile(p) / 1000 for p in (50, 95, 99))
+        return f"{name:28} {count:>7} {failed:>6} {p50:>7.1f}ms {p95:>7.1f}ms {p99:>7.1f}ms"
+
+    for name, journey in result.journeys.items():
+        lines.append(row(name, journey.latency.total, sum(journey.failures.values()), journey.latency))
+        for call, stats in journey.calls.items():
+            lines.append(row(f"  {call}", stats.latency.total, stats.errors, stats.latency))
+        lines += [f"  {count:>5}× {reason}" for reason, count in journey.failures.most_common(3)]
+    return "\n".join(lines)
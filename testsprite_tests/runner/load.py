@@ -0,0 +1,228 @@
+"""Open-loop load generator for the API endpoints the suite touches.
+
+Requests are issued at a fixed arrival rate whether or not earlier ones have
+returned, the way independent users arrive.  Latency is measured from each
+request's *scheduled* send time, so time spent queued behind a slow server
+(or an exhausted connection pool) is charged to the server instead of being
+silently omitted, which is the coordinated-omission trap of closed-loop
+tools.  Each endpoint gets its own :class:`~runner.histogram.Histogram`.
+
+``--rate 10,25,50,100`` runs one stage per rate and stops after the first
+stage that breaches the error-rate or p99 limit or cannot keep up with the
+offered rate: that is the saturation point.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import random
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Mapping, Sequence
+
+from .auth import AUTH_DIR
+from .histogram import Histogram
+from .httpclient import ConnectionPool
+
+
+@dataclass(frozen=True)
+class Endpoint:
+    name: str
+    path: str
+    method: str = "GET"
+    weight: float = 1.0
+    body: Any = None
+
+    def encoded_body(self) -> bytes | None:
+        return None if self.body is None else json.dumps(self.body).encode("utf-8")
+
+
+# The endpoints the TC scripts hit.  TC001 visits /api/auth/user, which is no
+# NextAuth action; /api/auth/session is the session lookup it stands for.
+ENDPOINTS = {
+    endpoint.name: endpoint
+    for endpoint in (
+        Endpoint("health", "/api/health"),
+        Endpoint("products", "/api/products?page=1&limit=12"),
+        Endpoint("session", "/api/auth/session"),
+        Endpoint("suggestions", "/api/search/suggestions?q=ai&limit=5"),
+        Endpoint("recommendations", "/api/recommendations?type=global&limit=10"),
+    )
+}
+
+
+@dataclass
+class EndpointStats:
+    """Response times in microseconds from the scheduled send time."""
+
+    latency: Histogram = field(default_factory=Histogram)
+    errors: int = 0
+    statuses: dict[str, int] = field(default_factory=dict)
+
+    def record(self, micros: int, status: str, failed: bool) -> None:
+        self.latency.record(micros)
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+        self.errors += failed
+
+    @property
+    def error_rate(self) -> float:
+        return self.errors / self.latency.total if self.latency.total else 0.0
+
+    def summary(self) -> dict[str, Any]:
+        p50, p95, p99 = (self.latency.percentile(p) / 1000 for p in (50, 95, 99))
+        return {
+            "requests": self.latency.total,
+            "errors": self.errors,
+            "error_rate": round(self.error_rate, 4),
+            "p50_ms": round(p50, 2),
+            "p95_ms": round(p95, 2),
+            "p99_ms": round(p99, 2),
+            "max_ms": round(self.latency.max / 1000, 2),
+            "statuses": dict(sorted(self.statuses.items())),
+        }
+
+
+@dataclass
+class StageResult:
+    """One stage; ``completed`` counts responses that arrived within ``duration``."""
+
+    rate: float
+    duration: float
+    elapsed: float
+    endpoints: dict[str, EndpointStats]
+    completed: int = 0
+
+    @property
+    def total(self) -> EndpointStats:
+        merged = EndpointStats()
+        for stats in self.endpoints.values():
+            merged.latency.merge(stats.latency)
+            merged.errors += stats.errors
+            for status, count in stats.statuses.items():
+                merged.statuses[status] = merged.statuses.get(status, 0) + count
+        return merged
+
+    @property
+    def throughput(self) -> float:
+        """Completions per second over the offered window, not the trailing drain."""
+        return self.completed / self.duration if self.duration else 0.0
+
+    def saturated(self, max_error_rate: float, max_p99_ms: float | None) -> list[str]:
+        """Why this stage counts as past the saturation point, if it does."""
+        total = self.total
+        reasons = []
+        if total.error_rate > max_error_rate:
+            reasons.append(f"error rate {total.error_rate:.1%}")
+        if max_p99_ms is not None and total.latency.percentile(99) / 1000 > max_p99_ms:
+            reasons.append(f"p99 {total.latency.percentile(99) / 1000:.0f}ms")
+        if self.throughput < 0.95 * self.rate:
+            reasons.append(f"throughput {self.throughput:.1f}/s of {self.rate:g}/s offered")
+        return reasons
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "rate": self.rate,
+            "duration": self.duration,
+            "throughput": round(self.throughput, 2),
+            "total": self.total.summary(),
+            "endpoints": {name: stats.summary() for name, stats in self.endpoints.items()},
+        }
+
+
+def session_cookie(role: str, directory: Path = AUTH_DIR) -> str:
+    """``Cookie`` header from the cached ``storage_state`` of ``role``."""
+    state = json.loads((directory / f"{role}.json").read_text(encoding="utf-8"))
+    return "; ".join(f"{cookie['name']}={cookie['value']}" for cookie in state.get("cookies", []))
+
+
+async def run_stage(
+    pool: ConnectionPool,
+    endpoints: Sequence[Endpoint],
+    rate: float,
+    duration: float,
+    *,
+    headers: Mapping[str, str] | None = None,
+    seed: int = 0,
+) -> StageResult:
+    """Offer ``rate`` requests per second for ``duration`` seconds."""
+    stats = {endpoint.name: EndpointStats() for endpoint in endpoints}
+    count = int(rate * duration)
+    picks = random.Random(seed).choices(endpoints, [endpoint.weight for endpoint in endpoints], k=count)
+    base_headers = {"Accept": "application/json", **(headers or {})}
+    pending: set[asyncio.Task[None]] = set()
+    completed = 0
+
+    async def fire(endpoint: Endpoint, scheduled: float) -> None:
+        nonlocal completed
+        request_headers = dict(base_headers)
+        body = endpoint.encoded_body()
+        if body is not None:
+            request_headers["Content-Type"] = "application/json"
+        try:
+            response = await pool.request(endpoint.method, endpoint.path, headers=request_headers, body=body)
+            status, failed = str(response.status), response.status >= 400
+        except (OSError, asyncio.TimeoutError) as exc:
+            status, failed = type(exc).__name__, True
+        finished = time.perf_counter()
+        stats[endpoint.name].record(int((finished - scheduled) * 1_000_000), status, failed)
+        if finished <= window_end:
+            completed += 1
+
+    started = time.perf_counter()
+    window_end = started + duration
+    for index, endpoint in enumerate(picks):
+        scheduled = started + index / rate
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        task = asyncio.create_task(fire(endpoint, scheduled))
+        pending.add(task)
+        task.add_done_callback(pending.discard)
+    if pending:
+        await asyncio.gather(*pending)
+    return StageResult(rate, duration, time.perf_counter() - started, stats, completed)
+
+
+async def ramp(
+    base_url: str,
+    endpoints: Sequence[Endpoint],
+    rates: Sequence[float],
+    duration: float,
+    *,
+    connections: int = 32,
+    timeout: float = 30.0,
+    headers: Mapping[str, str] | None = None,
+    max_error_rate: float = 0.01,
+    max_p99_ms: float | None = None,
+) -> list[StageResult]:
+    """Run one stage per rate, stopping after the first saturated one."""
+    results = []
+    async with ConnectionPool(base_url, connections, timeout=timeout) as pool:
+        for rate in rates:
+            result = await run_stage(pool, endpoints, rate, duration, headers=headers)
+            results.append(result)
+            print(format_stage(result), flush=True)
+            reasons = result.saturated(max_error_rate, max_p99_ms)
+            if reasons:
+                print(f"saturated at {rate:g}/s: {', '.join(reasons)}", flush=True)
+                break
+    return results
+
+
+def format_stage(result: StageResult) -> str:
+    lines = [
+        f"\n{result.rate:g} req/s offered, {result.throughput:.1f} req/s completed within {result.duration:g}s"
+        f" (drained after {result.elapsed:.1f}s)",
+        f"{'endpoint':16} {'reqs':>6} {'err%':>6} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}",
+    ]
+    rows = [*result.endpoints.items(), ("total", result.total)]
+    for name, stats in rows:
+        summary = stats.summary()
+        lines.append(
+            f"{name:16} {summary['requests']:>6} {100 * summary['error_rate']:>5.1f}% "
+            f"{summary['p50_ms']:>6.1f}ms {summary['p95_ms']:>6.1f}ms "
+            f"{summary['p99_ms']:>6.1f}ms {summary['max_ms']:>6.1f}ms"
+        )
+    return "\n".join(lines)
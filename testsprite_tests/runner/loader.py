@@ -0,0 +1,223 @@
+"""Discover the generated ``TCxxx_*.py`` scripts and load them in-process.
+
+Each script ends in ``asyncio.run(run_test())`` and builds its own driver via
+``async_api.async_playwright()``.  The loader strips that trailing call, execs
+the module into a private namespace and swaps ``async_api`` for a shim whose
+``chromium.launch()`` hands back a lease on a pooled browser.  The script body
+is otherwise executed unchanged, except that a context which starts with a
+cached session skips the script's own UI login (:func:`strip_login`).
+"""
+
+from __future__ import annotations
+
+import ast
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Iterable
+
+from .auth import LoginSteps
+from .paths import TESTS_DIR
+
+if TYPE_CHECKING:
+    from .pool import BrowserLease
+    from .waits import WaitEngine
+
+_SCRIPT_RE = re.compile(r"^(TC\d{3})_(.+)\.py$")
+
+
+@dataclass
+class TestCase:
+    """One generated TestSprite script."""
+
+    case_id: str
+    title: str
+    path: Path
+    source: str = field(repr=False)
+
+    @classmethod
+    def from_path(cls, path: Path) -> "TestCase":
+        match = _SCRIPT_RE.match(path.name)
+        if not match:
+            raise ValueError(f"not a TestSprite script: {path.name}")
+        case_id, slug = match.groups()
+        return cls(
+            case_id=case_id,
+            title=slug.replace("_", " "),
+            path=path,
+            source=path.read_text(encoding="utf-8"),
+        )
+
+    def module_ast(self) -> ast.Module:
+        """Parse the script without its module-level ``asyncio.run(...)``."""
+        tree = ast.parse(self.source, filename=str(self.path))
+        tree.body = [node for node in tree.body if not _is_asyncio_run(node)]
+        return tree
+
+    def entrypoint(
+        self,
+        lease: "BrowserLease",
+        waits: "WaitEngine | None" = None,
+        signed_in: bool = False,
+    ) -> Callable[[], Awaitable[None]]:
+        """Return the script's ``run_test`` bound to ``lease``.
+
+        With ``waits`` the script's fixed sleeps are routed through the wait
+        engine (see :func:`runner.waits.rewrite_sleeps`); with ``signed_in``
+        its UI login is left out.
+        """
+        tree = self.module_ast()
+        if signed_in:
+            tree = strip_login(tree)
+        namespace: dict[str, Any] = {"__name__": f"testsprite.{self.case_id}"}
+        if waits is not None:
+            from .waits import WAITS_NAME, rewrite_sleeps
+
+            tree = rewrite_sleeps(tree)
+            namespace[WAITS_NAME] = waits
+        exec(compile(tree, str(self.path), "exec"), namespace)
+        namespace["async_api"] = ScriptApi(lease)
+        return namespace["run_test"]
+
+
+def _is_asyncio_run(node: ast.stmt) -> bool:
+    if not isinstance(node, ast.Expr) or not isinstance(node.value, ast.Call):
+        return False
+    func = node.value.func
+    return (
+        isinstance(func, ast.Attribute)
+        and func.attr == "run"
+        and isinstance(func.value, ast.Name)
+        and func.value.id == "asyncio"
+    )
+
+
+def strip_login(tree: ast.Module) -> ast.Module:
+    """Drop the scripted UI login, for a context that already has a session.
+
+    A login step is the ``elem = frame.locator(...)`` assignment of a login
+    target plus the awaited pause and action on it that follow, or a
+    ``page.goto`` of the login page.
+    """
+    login = LoginSteps()
+    for node in list(ast.walk(tree)):
+        for field_name in ("body", "orelse", "finalbody"):
+            statements = getattr(node, field_name, None)
+            if isinstance(statements, list) and statements and isinstance(statements[0], ast.stmt):
+                setattr(node, field_name, _strip_block(statements, login) or [ast.copy_location(ast.Pass(), statements[0])])
+    return ast.fix_missing_locations(tree)
+
+
+def _strip_block(statements: list[ast.stmt], login: LoginSteps) -> list[ast.stmt]:
+    kept = []
+    dropping = False
+    for statement in statements:
+        target = _locator_target(statement)
+        awaited = statement.value.value if isinstance(statement, ast.Expr) and isinstance(statement.value, ast.Await) else None
+        if target is not None:
+            dropping = login.selector(target)
+        elif _is_goto(awaited):
+            if login.goto(awaited.args[0].value):
+                continue
+            dropping = False
+        elif not (dropping and isinstance(awaited, ast.Call)):
+            dropping = False
+        if not dropping:
+            kept.append(statement)
+    return kept
+
+
+def _locator_target(statement: ast.stmt) -> str | None:
+    """The selector of ``name = <...>.locator("selector")<...>``."""
+    if not isinstance(statement, ast.Assign):
+        return None
+    for node in ast.walk(statement.value):
+        if (
+            isinstance(node, ast.Call)
+            and isinstance(node.func, ast.Attribute)
+            and node.func.attr == "locator"
+            and node.args
+            and isinstance(node.args[0], ast.Constant)
+            and isinstance(node.args[0].value, str)
+        ):
+            return node.args[0].value
+    return None
+
+
+def _is_goto(call: ast.expr | None) -> bool:
+    return (
+        isinstance(call, ast.Call)
+        and isinstance(call.func, ast.Attribute)
+        and call.func.attr == "goto"
+        and bool(call.args)
+        and isinstance(call.args[0], ast.Constant)
+        and isinstance(call.args[0].value, str)
+    )
+
+
+def discover(directory: Path = TESTS_DIR, only: Iterable[str] | None = None) -> list[TestCase]:
+    """Return the scripts in ``directory`` sorted by case id.
+
+    ``only`` restricts the result to the given case ids (``TC001``...).
+    """
+    wanted = {case_id.upper() for case_id in only} if only else None
+    cases = []
+    for path in sorted(directory.glob("TC*.py")):
+        if not _SCRIPT_RE.match(path.name):
+            continue
+        case = TestCase.from_path(path)
+        if wanted is None or case.case_id in wanted:
+            cases.append(case)
+    return cases
+
+
+def load_cases(only: Iterable[str] | None = None, steps: Path | None = None) -> list[Any]:
+    """Scripts from :data:`TESTS_DIR`, or the step file at ``steps`` if given."""
+    if steps is not None:
+        from .plan import load_plan
+
+        return load_plan(steps, list(only) if only else None)
+    return discover(only=only)
+
+
+class ScriptApi:
+    """Stand-in for ``playwright.async_api`` inside a loaded script.
+
+    Only ``async_playwright`` is redirected; every other attribute (notably
+    ``Error``) resolves to the real module.
+    """
+
+    def __init__(self, lease: "BrowserLease") -> None:
+        self._lease = lease
+
+    def async_playwright(self) -> "_BorrowedPlaywright":
+        return _BorrowedPlaywright(self._lease)
+
+    def __getattr__(self, name: str) -> Any:
+        from playwright import async_api
+
+        return getattr(async_api, name)
+
+
+class _BorrowedPlaywright:
+    """Mimics ``async_playwright()`` while the pool owns the real driver."""
+
+    def __init__(self, lease: "BrowserLease") -> None:
+        self._lease = lease
+        self.chromium = _BorrowedBrowserType(lease)
+
+    async def start(self) -> "_BorrowedPlaywright":
+        return self
+
+    async def stop(self) -> None:
+        return None
+
+
+class _BorrowedBrowserType:
+    def __init__(self, lease: "BrowserLease") -> None:
+        self._lease = lease
+
+    async def launch(self, **_ignored: Any) -> "BrowserLease":
+        # Launch arguments such as ``--single-process`` are deliberately
+        # dropped: the pool owns browser configuration.
+        return self._lease
@@ -0,0 +1,373 @@
+"""Local GitHub and Google OAuth stand-in for the NextAuth sign-in flows.
+
+TC003 and TC004 click "GitHub/Google로 계속하기" and then wait out their
+timeouts on an ``OAuthSignin`` error, because offline there is no GitHub or
+Google to redirect to.  :class:`OAuthProvider` plays both, answering at once:
+
+``/github/login/oauth/authorize``        302 back to NextAuth with a code
+``/github/login/oauth/access_token``     code -> access token
+``/github/user``, ``/github/user/emails`` the GitHub profile
+``/google/.well-known/openid-configuration``, ``/google/authorize``,
+``/google/token`` (with an ``id_token``), ``/google/userinfo``, ``/google/jwks``
+
+``src/lib/auth.ts`` points both providers here when ``OAUTH_MOCK_URL`` is
+set and ``NODE_ENV`` is not ``production`` (``next dev``).  Google's ``id_token`` is signed HS256 with the client secret (the auth
+config asks openid-client for that algorithm in mock mode), so no key pair
+is needed.  Codes are single-use, bound to the client, the redirect URI and
+the PKCE challenge, and expire after ``code_ttl`` seconds; access tokens are
+signed and need no storage.  Every authorization signs in the next of
+``users`` in turn, or the user named by ``login_hint``.
+
+:func:`storm` drives complete sign-ins through the app (CSRF token, signin
+POST, authorize, callback) with many in flight, and reports the latency of
+the NextAuth callback separately from the whole flow.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import hashlib
+import hmac
+import itertools
+import json
+import secrets
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Mapping, Sequence
+from urllib.parse import unquote_plus, urlencode, urlsplit
+
+from .histogram import Histogram
+from .httpclient import ConnectionPool, cookie_header, store_cookies
+from .httpserver import HttpServer, Reply, Request
+
+PROVIDERS = ("github", "google")
+CODE_TTL_S = 60.0
+TOKEN_TTL_S = 3600
+
+
+@dataclass(frozen=True)
+class Identity:
+    email: str
+    name: str = ""
+
+    @property
+    def login(self) -> str:
+        return self.email.partition("@")[0]
+
+    @property
+    def numeric_id(self) -> int:
+        """Stable GitHub-style id derived from the email."""
+        return int.from_bytes(hashlib.blake2b(self.email.encode(), digest_size=4).digest(), "big")
+
+    @property
+    def display_name(self) -> str:
+        return self.name or self.login
+
+    @classmethod
+    def parse(cls, value: str) -> "Identity":
+        """``email`` or ``email=Display Name``."""
+        email, _, name = value.partition("=")
+        if "@" not in email:
+            raise ValueError(f"{email!r} is not an email address")
+        return cls(email.strip(), name.strip())
+
+
+def users(count: int, domain: str = "oauth.test") -> list[Identity]:
+    return [Identity(f"oauth{index}@{domain}", f"OAuth Tester {index}") for index in range(count)]
+
+
+@dataclass
+class _Grant:
+    provider: str
+    client_id: str
+    redirect_uri: str
+    identity: Identity
+    expires: float
+    challenge: str = ""
+    challenge_method: str = "plain"
+    nonce: str = ""
+    scope: str = ""
+
+
+class OAuthError(Exception):
+    def __init__(self, error: str, description: str, status: int = 400) -> None:
+        super().__init__(description)
+        self.error = error
+        self.status = status
+
+
+def _b64(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _with_query(url: str, params: Mapping[str, str]) -> str:
+    return url + ("&" if urlsplit(url).query else "?") + urlencode(params)
+
+
+class OAuthProvider(HttpServer):
+    def __init__(self, identities: Sequence[Identity] | None = None, *, code_ttl: float = CODE_TTL_S) -> None:
+        super().__init__()
+        self.identities = list(identities or users(1))
+        self.code_ttl = code_ttl
+        self._next = itertools.cycle(range(len(self.identities)))
+        self._codes: dict[str, _Grant] = {}
+        self._key = secrets.token_bytes(16)
+        self.counts: Counter[str] = Counter()
+
+    async def handle(self, request: Request) -> Reply:
+        provider, _, endpoint = request.path.lstrip("/").partition("/")
+        key = f"{request.method} /{provider}/{endpoint}"
+        self.counts[key] += 1
+        try:
+            if provider not in PROVIDERS:
+                raise OAuthError("not_found", f"{request.method} {request.path} is not mocked", 404)
+            return self._route(provider, endpoint, request)
+        except OAuthError as exc:
+            self.counts["errors"] += 1
+            return Reply.json(exc.status, {"error": exc.error, "error_description": str(exc)})
+
+    def _route(self, provider: str, endpoint: str, request: Request) -> Reply:
+        issuer = f"http://{request.headers.get('host', 'localhost')}/{provider}"
+        if provider == "google" and endpoint == ".well-known/openid-configuration":
+            return Reply.json(200, self.discovery(issuer))
+        if endpoint in ("login/oauth/authorize", "authorize"):
+            return self.authorize(provider, request.query)
+        if endpoint in ("login/oauth/access_token", "token") and request.method == "POST":
+            payload = self.token(provider, issuer, request)
+            if provider == "github" and "json" not in request.headers.get("accept", ""):
+                return Reply(200, urlencode(payload).encode(), "application/x-www-form-urlencoded")
+            return Reply.json(200, payload)
+        if endpoint in ("user", "userinfo"):
+            return Reply.json(200, self.profile(provider, self._bearer(provider, request.headers)))
+        if provider == "github" and endpoint == "user/emails":
+            identity = self._bearer(provider, request.headers)
+            return Reply.json(200, [{"email": identity.email, "primary": True, "verified": True, "visibility": "public"}])
+        if provider == "google" and endpoint == "jwks":
+            return Reply.json(200, {"keys": []})
+        raise OAuthError("not_found", f"{request.method} {request.path} is not mocked", 404)
+
+    def discovery(self, issuer: str) -> dict[str, Any]:
+        return {
+            "issuer": issuer,
+            "authorization_endpoint": f"{issuer}/authorize",
+            "token_endpoint": f"{issuer}/token",
+            "userinfo_endpoint": f"{issuer}/userinfo",
+            "jwks_uri": f"{issuer}/jwks",
+            "response_types_supported": ["code"],
+            "subject_types_supported": ["public"],
+            "id_token_signing_alg_values_supported": ["HS256"],
+            "scopes_supported": ["openid", "email", "profile"],
+            "token_endpoint_auth_methods_supported": ["client_secret_basic", "client_secret_post"],
+            "code_challenge_methods_supported": ["S256", "plain"],
+            "claims_supported": ["sub", "email", "email_verified", "name", "picture", "nonce"],
+        }
+
+    def authorize(self, provider: str, query: Mapping[str, str]) -> Reply:
+        redirect_uri = query.get("redirect_uri", "")
+        if not query.get("client_id") or not redirect_uri.startswith(("http://", "https://")):
+            raise OAuthError("invalid_request", "client_id and an absolute redirect_uri are required")
+        hint = query.get("login_hint", "")
+        identity = Identity(hint) if "@" in hint else self.identities[next(self._next)]
+        now = time.monotonic()
+        if len(self._codes) > 10_000:
+            self._codes = {code: grant for code, grant in self._codes.items() if grant.expires > now}
+        code = secrets.token_urlsafe(18)
+        self._codes[code] = _Grant(
+            provider,
+            query["client_id"],
+            redirect_uri,
+            identity,
+            now + self.code_ttl,
+            query.get("code_challenge", ""),
+            query.get("code_challenge_method", "plain"),
+            query.get("nonce", ""),
+            query.get("scope", ""),
+        )
+        params = {"code": code}
+        if "state" in query:
+            params["state"] = query["state"]
+        return Reply.redirect(_with_query(redirect_uri, params))
+
+    def token(self, provider: str, issuer: str, request: Request) -> dict[str, Any]:
+        form = request.form()
+        client_id, client_secret = form.get("client_id", ""), form.get("client_secret", "")
+        scheme, _, credentials = request.headers.get("authorization", "").partition(" ")
+        if scheme.lower() == "basic":
+            user, _, password = base64.b64decode(credentials).decode("utf-8").partition(":")
+            client_id, client_secret = unquote_plus(user), unquote_plus(password)
+        grant = self._codes.pop(form.get("code", ""), None)
+        if grant is None or grant.provider != provider or grant.expires < time.monotonic():
+            raise OAuthError("invalid_grant", "the code is unknown, used or expired")
+        if grant.client_id != client_id or grant.redirect_uri != form.get("redirect_uri", grant.redirect_uri):
+            raise OAuthError("invalid_grant", "the code was issued to another client or redirect_uri")
+        if grant.challenge:
+            verifier = form.get("code_verifier", "")
+            derived = _b64(hashlib.sha256(verifier.encode()).digest()) if grant.challenge_method == "S256" else verifier
+            if not hmac.compare_digest(derived, grant.challenge):
+                raise OAuthError("invalid_grant", "code_verifier does not match the code_challenge")
+        access_token = self._access_token(provider, grant.identity)
+        if provider == "github":
+            return {"access_token": access_token, "token_type": "bearer", "scope": grant.scope}
+        if not client_secret:
+            raise OAuthError("invalid_client", "client_secret is required to sign the id_token", 401)
+        claims = {
+            **self.profile(provider, grant.identity),
+            "iss": issuer,
+            "aud": client_id,
+            "iat": int(time.time()),
+            "exp": int(time.time()) + TOKEN_TTL_S,
+            "at_hash": _b64(hashlib.sha256(access_token.encode()).digest()[:16]),
+        }
+        if grant.nonce:
+            claims["nonce"] = grant.nonce
+        return {
+            "access_token": access_token,
+            "token_type": "Bearer",
+            "expires_in": TOKEN_TTL_S,
+            "scope": grant.scope,
+            "id_token": _jwt(claims, client_secret),
+        }
+
+    def profile(self, provider: str, identity: Identity) -> dict[str, Any]:
+        avatar = f"https://avatars.example.test/{identity.login}.png"
+        if provider == "github":
+            return {
+                "login": identity.login,
+                "id": identity.numeric_id,
+                "name": identity.display_name,
+                "email": identity.email,
+                "avatar_url": avatar,
+                "type": "User",
+            }
+        return {
+            "sub": str(identity.numeric_id),
+            "email": identity.email,
+            "email_verified": True,
+            "name": identity.display_name,
+            "given_name": identity.display_name.split(" ")[0],
+            "picture": avatar,
+        }
+
+    def _access_token(self, provider: str, identity: Identity) -> str:
+        payload = _b64(json.dumps([provider, identity.email, identity.name]).encode())
+        return f"{payload}.{self._sign(payload)}"
+
+    def _sign(self, payload: str) -> str:
+        return hashlib.blake2b(payload.encode(), key=self._key, digest_size=12).hexdigest()
+
+    def _bearer(self, provider: str, headers: Mapping[str, str]) -> Identity:
+        scheme, _, token = headers.get("authorization", "").partition(" ")
+        payload, _, signature = token.partition(".")
+        if scheme.lower() not in ("bearer", "token") or not hmac.compare_digest(signature, self._sign(payload)):
+            raise OAuthError("invalid_token", "access token is missing or was not issued here", 401)
+        token_provider, email, name = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+        if token_provider != provider:
+            raise OAuthError("invalid_token", f"token was issued for {token_provider}", 401)
+        return Identity(email, name)
+
+
+def _jwt(claims: Mapping[str, Any], secret: str) -> str:
+    header = _b64(json.dumps({"alg": "HS256", "typ": "JWT"}).encode())
+    body = _b64(json.dumps(claims, separators=(",", ":")).encode())
+    signature = hmac.new(secret.encode(), f"{header}.{body}".encode(), hashlib.sha256).digest()
+    return f"{header}.{body}.{_b64(signature)}"
+
+
+# -- sign-in load ---------------------------------------------------------
+
+
+@dataclass
+class StormResult:
+    provider: str
+    elapsed: float
+    flow: Histogram = field(default_factory=Histogram)
+    callback: Histogram = field(default_factory=Histogram)
+    failures: Counter[str] = field(default_factory=Counter)
+
+    @property
+    def completed(self) -> int:
+        return self.flow.total
+
+    def summary(self) -> str:
+        def ms(histogram: Histogram, percent: float) -> float:
+            return histogram.percentile(percent) / 1000
+
+        lines = [
+            f"{self.provider}: {self.completed} sign-ins in {self.elapsed:.1f}s "
+            f"({self.completed / self.elapsed if self.elapsed else 0:.1f}/s), {sum(self.failures.values())} failed"
+        ]
+        for label, histogram in (("whole flow", self.flow), ("callback", self.callback)):
+            if histogram.total:
+                lines.append(
+                    f"  {label:10} p50 {ms(histogram, 50):7.1f} ms  p95 {ms(histogram, 95):7.1f} ms  "
+                    f"p99 {ms(histogram, 99):7.1f} ms  max {histogram.max / 1000:7.1f} ms"
+                )
+        lines += [f"  {count:>5}× {reason}" for reason, count in self.failures.most_common(5)]
+        return "\n".join(lines)
+
+
+async def sign_in(app: ConnectionPool, provider: OAuthProvider, name: str, result: StormResult) -> None:
+    """One NextAuth OAuth sign-in: csrf, signin POST, authorize (in process), callback."""
+    started = time.perf_counter()
+    jar: dict[str, str] = {}
+    try:
+        response = await app.request("GET", "/api/auth/csrf", headers={"Accept": "application/json"})
+        store_cookies(response, jar)
+        body = urlencode({"csrfToken": response.json()["csrfToken"], "callbackUrl": "/", "json": "true"}).encode()
+        response = await app.request(
+            "POST",
+            f"/api/auth/signin/{name}",
+            headers={"Content-Type": "application/x-www-form-urlencoded", **cookie_header(jar)},
+            body=body,
+        )
+        store_cookies(response, jar)
+        authorize_url = response.json().get("url", "") if response.ok else ""
+        if f"/{name}/" not in authorize_url:
+            result.failures[f"signin {response.status}: {authorize_url[:80] or 'no authorize url'}"] += 1
+            return
+        parts = urlsplit(authorize_url)
+        request = Request("GET", f"{parts.path}?{parts.query}", {"host": parts.netloc})
+        redirect = await provider.handle(request)
+        location = redirect.headers.get("Location", "")
+        if redirect.status != 302:
+            result.failures[f"authorize {redirect.status}"] += 1
+            return
+        callback = urlsplit(location)
+        callback_started = time.perf_counter()
+        response = await app.request("GET", f"{callback.path}?{callback.query}", headers=cookie_header(jar))
+        result.callback.record(int((time.perf_counter() - callback_started) * 1_000_000))
+        store_cookies(response, jar)
+        if not any(cookie.endswith("next-auth.session-token") for cookie in jar):
+            target = response.headers.get("location", "")
+            result.failures[f"callback {response.status}: {target[:80] or 'no session cookie'}"] += 1
+            return
+    except (OSError, asyncio.TimeoutError, ValueError, KeyError) as exc:
+        result.failures[type(exc).__name__] += 1
+        return
+    result.flow.record(int((time.perf_counter() - started) * 1_000_000))
+
+
+async def storm(
+    app_url: str,
+    provider: OAuthProvider,
+    name: str,
+    total: int,
+    concurrency: int,
+    *,
+    timeout: float = 30.0,
+) -> StormResult:
+    """``total`` sign-ins through the app with ``concurrency`` in flight."""
+    result = StormResult(name, 0.0)
+    slots = asyncio.Semaphore(concurrency)
+
+    async def one() -> None:
+        async with slots:
+            await sign_in(pool, provider, name, result)
+
+    started = time.perf_counter()
+    async with ConnectionPool(app_url, concurrency, timeout=timeout) as pool:
+        await asyncio.gather(*(one() for _ in range(total)))
+    result.elapsed = time.perf_counter() - started
+    return result
@@ -0,0 +1,30 @@
+"""Filesystem locations and endpoint configuration shared by the runner."""
+
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+REPO_ROOT = ROOT.parent
+TESTS_DIR = ROOT / "testsprite_tests_list"
+TMP_DIR = ROOT / "tmp"
+
+DEFAULT_BASE_URL = "http://localhost:3000"
+
+
+def base_url() -> str:
+    """Return the app under test, honouring ``TESTSPRITE_BASE_URL``.
+
+    Falls back to the ``localEndpoint`` TestSprite recorded in
+    ``tmp/config.json`` and finally to the local dev server.
+    """
+    env = os.environ.get("TESTSPRITE_BASE_URL")
+    if env:
+        return env.rstrip("/")
+    try:
+        config = json.loads((TMP_DIR / "config.json").read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return DEFAULT_BASE_URL
+    return str(config.get("localEndpoint") or DEFAULT_BASE_URL).rstrip("/")
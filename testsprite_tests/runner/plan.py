@@ -0,0 +1,162 @@
+"""Test cases written as step lists instead of Python scripts.
+
+The file format extends ``testsprite_frontend_test_plan.json``: each case has
+``id``, ``title``, ``description``, ``category``, ``priority`` and ``steps``,
+and every step keeps the plan's ``type``/``description`` pair while adding
+the concrete selector and data needed to execute it::
+
+    {"type": "action", "description": "Click the login button",
+     "action": "click", "selector": "xpath=html/body/header/nav/div/div[2]/a/button", "nth": 0}
+    {"type": "assertion", "description": "Dashboard is shown",
+     "assert": "visible", "selector": "text=dashboard", "nth": 0, "timeout": 30000}
+
+Supported actions are ``goto`` (``url``, relative to the base URL),
+``click``, ``fill`` (``value``) and ``scroll`` (``x``/``y``, where ``y`` may be
+a JS expression).  The only assertion is ``visible``; ``message`` replaces the
+assertion error text.  :mod:`runner.convert` produces this file from the
+generated scripts and :mod:`runner.interpreter` executes it.
+"""
+
+from __future__ import annotations
+
+import json
+from dataclasses import asdict, dataclass, field, fields
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Awaitable, Callable
+
+from .auth import LoginSteps
+from .paths import TESTS_DIR
+
+if TYPE_CHECKING:
+    from .checkpoint import CheckpointStore
+    from .flaky import RetryBudget
+    from .pool import BrowserLease
+    from .selectors import SelectorCompiler
+    from .waits import WaitEngine
+
+STEPS_PATH = TESTS_DIR / "testsprite_frontend_test_steps.json"
+
+ACTION = "action"
+ASSERTION = "assertion"
+
+
+@dataclass
+class Step:
+    type: str
+    description: str = ""
+    action: str | None = None
+    selector: str | None = None
+    nth: int | None = None
+    value: str | None = None
+    url: str | None = None
+    x: int | None = None
+    y: int | str | None = None
+    assertion: str | None = None
+    timeout: int | None = None
+    message: str | None = None
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "Step":
+        data = dict(data)
+        if "assert" in data:
+            data["assertion"] = data.pop("assert")
+        known = {item.name for item in fields(cls)}
+        return cls(**{key: value for key, value in data.items() if key in known})
+
+    def to_dict(self) -> dict[str, Any]:
+        data = {key: value for key, value in asdict(self).items() if value is not None}
+        if "assertion" in data:
+            data["assert"] = data.pop("assertion")
+        return data
+
+    def label(self) -> str:
+        target = self.url or self.selector or ""
+        return f"{self.action or self.assertion} {target}".strip()
+
+
+def step_key(index: int, step: Step) -> str:
+    """Stable name of a step within its case, e.g. ``"03 click xpath=..."``."""
+    return f"{index + 1:02d} {step.label()}"
+
+
+@dataclass
+class StepCase:
+    """A declarative test case; runs on :class:`~runner.suite.SuiteRunner`."""
+
+    case_id: str
+    title: str
+    steps: list[Step]
+    description: str = ""
+    category: str = "functional"
+    priority: str = ""
+    source: str = field(default="", repr=False)
+    selectors: "SelectorCompiler | None" = field(default=None, repr=False, compare=False)
+    retries: "RetryBudget | None" = field(default=None, repr=False, compare=False)
+    checkpoints: "CheckpointStore | None" = field(default=None, repr=False, compare=False)
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "StepCase":
+        return cls(
+            case_id=data["id"],
+            title=data.get("title", ""),
+            description=data.get("description", ""),
+            category=data.get("category", "functional"),
+            priority=data.get("priority", ""),
+            steps=[Step.from_dict(step) for step in data.get("steps", [])],
+            source=json.dumps(data, ensure_ascii=False, sort_keys=True),
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "id": self.case_id,
+            "title": self.title,
+            "description": self.description,
+            "category": self.category,
+            "priority": self.priority,
+            "steps": [step.to_dict() for step in self.steps],
+        }
+
+    def entrypoint(
+        self,
+        lease: "BrowserLease",
+        waits: "WaitEngine | None" = None,
+        signed_in: bool = False,
+    ) -> Callable[[], Awaitable[None]]:
+        from .interpreter import run_steps
+
+        async def run_test() -> None:
+            await run_steps(
+                self,
+                lease,
+                waits,
+                selectors=self.selectors,
+                retries=self.retries,
+                checkpoints=self.checkpoints,
+                skip=self.login_steps() if signed_in else frozenset(),
+            )
+
+        return run_test
+
+    def login_steps(self) -> frozenset[int]:
+        """Indexes of the steps that log in through the UI."""
+        login = LoginSteps()
+        skipped = set()
+        for index, step in enumerate(self.steps):
+            if step.action == "goto" and step.url and login.goto(step.url):
+                skipped.add(index)
+            elif step.type == ACTION and step.selector and login.selector(step.selector):
+                skipped.add(index)
+        return frozenset(skipped)
+
+
+def load_plan(path: Path = STEPS_PATH, only: list[str] | None = None) -> list[StepCase]:
+    cases = [StepCase.from_dict(item) for item in json.loads(path.read_text(encoding="utf-8"))]
+    if only:
+        wanted = {case_id.upper() for case_id in only}
+        cases = [case for case in cases if case.case_id in wanted]
+    return cases
+
+
+def dump_plan(cases: list[StepCase], path: Path = STEPS_PATH) -> None:
+    payload = json.dumps([case.to_dict() for case in cases], ensure_ascii=False, indent=2)
+    path.write_text(payload + "\n", encoding="utf-8")
@@ -0,0 +1,163 @@
+"""One Playwright driver, a few browsers, a fresh context per test."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING, Any, AsyncIterator, Awaitable, Callable, Sequence
+
+if TYPE_CHECKING:
+    from playwright.async_api import Browser, BrowserContext, Playwright
+
+logger = logging.getLogger(__name__)
+
+ContextTeardown = Callable[[], Awaitable[None]]
+# A hook may return a teardown, awaited just before the context closes.
+ContextHook = Callable[["BrowserContext"], Awaitable["ContextTeardown | None"]]
+
+DEFAULT_LAUNCH_ARGS = (
+    "--window-size=1280,720",
+    "--disable-dev-shm-usage",
+)
+
+
+class BrowserPool:
+    """Owns the driver and ``size`` Chromium instances for a whole run.
+
+    Tests never see the browsers directly; they borrow one through
+    :meth:`lease`, which picks the browser with the fewest open contexts.
+    """
+
+    def __init__(
+        self,
+        size: int = 1,
+        *,
+        headless: bool = True,
+        launch_args: Sequence[str] = DEFAULT_LAUNCH_ARGS,
+    ) -> None:
+        if size < 1:
+            raise ValueError("pool size must be at least 1")
+        self.size = size
+        self.headless = headless
+        self.launch_args = list(launch_args)
+        self._playwright: "Playwright | None" = None
+        self._browsers: list["Browser"] = []
+        self._load: dict[int, int] = {}
+        self._lock = asyncio.Lock()
+
+    async def start(self) -> "BrowserPool":
+        from playwright.async_api import async_playwright
+
+        self._playwright = await async_playwright().start()
+        self._browsers = list(
+            await asyncio.gather(
+                *(
+                    self._playwright.chromium.launch(headless=self.headless, args=self.launch_args)
+                    for _ in range(self.size)
+                )
+            )
+        )
+        self._load = {index: 0 for index in range(self.size)}
+        return self
+
+    async def close(self) -> None:
+        await asyncio.gather(*(browser.close() for browser in self._browsers), return_exceptions=True)
+        self._browsers = []
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+
+    async def __aenter__(self) -> "BrowserPool":
+        return await self.start()
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        await self.close()
+
+    @property
+    def playwright(self) -> "Playwright":
+        if self._playwright is None:
+            raise RuntimeError("BrowserPool.start() has not been awaited")
+        return self._playwright
+
+    @asynccontextmanager
+    async def lease(
+        self,
+        *,
+        context_options: dict[str, Any] | None = None,
+        hooks: Sequence[ContextHook] = (),
+    ) -> AsyncIterator["BrowserLease"]:
+        """Borrow the least-loaded browser for the duration of one test."""
+        if not self._browsers:
+            raise RuntimeError("BrowserPool.start() has not been awaited")
+        async with self._lock:
+            index = min(self._load, key=self._load.__getitem__)
+            self._load[index] += 1
+        lease = BrowserLease(self._browsers[index], context_options or {}, hooks)
+        try:
+            yield lease
+        finally:
+            await lease.close()
+            async with self._lock:
+                self._load[index] -= 1
+
+
+class BrowserLease:
+    """What a loaded script receives from ``chromium.launch()``.
+
+    ``new_context`` merges the runner's context options underneath the
+    script's own and runs the registered hooks on every new context; their
+    teardowns run when the context is closed, by the script or by the lease.
+    ``close`` only closes contexts opened through this lease, never the
+    shared browser.
+    """
+
+    def __init__(
+        self,
+        browser: "Browser",
+        context_options: dict[str, Any],
+        hooks: Sequence[ContextHook],
+    ) -> None:
+        self.browser = browser
+        self.context_options = dict(context_options)
+        self.hooks = list(hooks)
+        self.contexts: list["BrowserContext"] = []
+
+    async def new_context(self, **options: Any) -> "BrowserContext":
+        context = await self.browser.new_context(**{**self.context_options, **options})
+        self.contexts.append(context)
+        teardowns = []
+        for hook in self.hooks:
+            teardown = await hook(context)
+            if teardown is not None:
+                teardowns.append(teardown)
+        if teardowns:
+            _close_with(context, teardowns)
+        return context
+
+    async def close(self) -> None:
+        contexts, self.contexts = self.contexts, []
+        await asyncio.gather(*(context.close() for context in contexts), return_exceptions=True)
+
+    def is_connected(self) -> bool:
+        return self.browser.is_connected()
+
+    @property
+    def version(self) -> str:
+        return self.browser.version
+
+
+def _close_with(context: "BrowserContext", teardowns: list[ContextTeardown]) -> None:
+    """Make ``context.close()`` run ``teardowns`` (once, in reverse order) first."""
+    close = context.close
+
+    async def close_after_teardown(*args: Any, **kwargs: Any) -> None:
+        pending, teardowns[:] = teardowns[::-1], []
+        for teardown in pending:
+            try:
+                await teardown()
+            except Exception:  # noqa: BLE001 - never keep a context open over a failed teardown
+                logger.warning("context teardown failed", exc_info=True)
+        await close(*args, **kwargs)
+
+    context.close = close_after_teardown  # type: ignore[method-assign]
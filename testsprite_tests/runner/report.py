@@ -0,0 +1,163 @@
+"""Streaming, deduplicating renderer for the TestSprite-style ``raw_report.md``.
+
+The TestSprite report repeats the same browser console line dozens of times
+per test (mostly ``401`` responses from ``/api/notifications`` polling).  The
+renderer folds identical lines into one entry with a count and the positions
+of their first and last occurrence.
+
+Every test gets its own section file under ``tmp/report/sections/``; the
+report is reassembled from those files after each test finishes, so it can be
+read mid-run.  A ``run`` drops only the sections of the cases it reruns, so
+the report keeps every other case's latest section; ``report -k`` rewrites
+just the given sections.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+from typing import Any, Iterable, Sequence
+
+from .paths import TESTS_DIR, TMP_DIR
+
+REPORT_DIR = TMP_DIR / "report"
+CONSOLE_MARKER = "Browser Console Logs:"
+_STATUS_RE = re.compile(r"^<!-- status: (\w+) -->")
+
+
+@dataclass
+class FoldedLine:
+    text: str
+    count: int
+    first: int
+    last: int
+
+    def render(self) -> str:
+        if self.count == 1:
+            return self.text
+        return f"{self.text} ×{self.count} (first #{self.first}, last #{self.last})"
+
+
+def fold_lines(lines: Iterable[str]) -> list[FoldedLine]:
+    """Collapse identical lines, keeping first-seen order; positions are 1-based."""
+    folded: dict[str, FoldedLine] = {}
+    for position, line in enumerate(lines, start=1):
+        line = line.rstrip()
+        if not line:
+            continue
+        entry = folded.get(line)
+        if entry is None:
+            folded[line] = FoldedLine(line, 1, position, position)
+        else:
+            entry.count += 1
+            entry.last = position
+    return list(folded.values())
+
+
+def split_console(error: str) -> tuple[str, list[str]]:
+    """Separate the error message from its trailing console dump."""
+    message, marker, console = error.partition(CONSOLE_MARKER)
+    return message.strip(), console.strip().splitlines() if marker else []
+
+
+def render_section(case_id: str, record: dict[str, Any], report_dir: Path = REPORT_DIR) -> str:
+    status = record.get("testStatus", "")
+    title = record.get("title", case_id).split("-", 1)[-1]
+    lines = [f"<!-- status: {status} -->", f"#### Test {case_id}", f"- **Test Name:** {title}"]
+    script = next(TESTS_DIR.glob(f"{case_id}_*.py"), None)
+    if script is not None:
+        lines.append(f"- **Test Code:** [{script.name}]({os.path.relpath(script, report_dir)})")
+    message, console = split_console(record.get("testError", ""))
+    if message:
+        lines.append(f"- **Test Error:** {message}")
+    if console:
+        folded = fold_lines(console)
+        lines.append(f"{CONSOLE_MARKER} {len(console)} lines, {len(folded)} distinct")
+        lines.extend(entry.render() for entry in folded)
+    if record.get("testVisualization"):
+        lines.append(f"- **Test Visualization and Result:** {record['testVisualization']}")
+    if record.get("duration") is not None:
+        lines.append(f"- **Duration:** {record['duration']:.1f}s")
+    lines.append(f"- **Status:** {'✅ Passed' if status == 'PASSED' else '❌ Failed'}")
+    lines.append("---")
+    return "\n".join(lines) + "\n"
+
+
+class ReportWriter:
+    """Keeps one section file per case and reassembles the report on demand."""
+
+    def __init__(
+        self,
+        directory: Path = REPORT_DIR,
+        *,
+        project: str = "vibe-olympics",
+        expected: Sequence[str] = (),
+    ) -> None:
+        self.directory = directory
+        self.sections = directory / "sections"
+        self.path = directory / "raw_report.md"
+        self.project = project
+        self.expected = list(expected)
+        self.sections.mkdir(parents=True, exist_ok=True)
+
+    def discard(self, case_ids: Iterable[str] | None = None) -> None:
+        """Remove the sections of ``case_ids``, or every section when ``None``."""
+        if case_ids is None:
+            stale = list(self.sections.glob("*.md"))
+        else:
+            stale = [self.sections / f"{case_id}.md" for case_id in case_ids]
+        for path in stale:
+            path.unlink(missing_ok=True)
+
+    def update(self, case_id: str, record: dict[str, Any]) -> Path:
+        """Re-render one case's section and refresh the assembled report."""
+        _write_atomic(self.sections / f"{case_id}.md", render_section(case_id, record, self.directory))
+        return self.assemble()
+
+    def assemble(self) -> Path:
+        sections = {path.stem: path.read_text(encoding="utf-8") for path in sorted(self.sections.glob("*.md"))}
+        statuses = {case_id: _section_status(text) for case_id, text in sections.items()}
+        pending = [case_id for case_id in self.expected if case_id not in sections]
+        parts = [self._header(), *sections.values()]
+        if pending:
+            parts.append(f"⏳ **Pending:** {', '.join(pending)}\n\n---\n")
+        parts.append(self._coverage(statuses))
+        _write_atomic(self.path, "\n".join(parts))
+        return self.path
+
+    def _header(self) -> str:
+        return (
+            "\n# TestSprite AI Testing Report(MCP)\n\n---\n\n"
+            "## 1️⃣ Document Metadata\n"
+            f"- **Project Name:** {self.project}\n"
+            f"- **Date:** {date.today().isoformat()}\n"
+            "- **Prepared by:** testsprite_tests runner\n\n---\n\n"
+            "## 2️⃣ Requirement Validation Summary\n"
+        )
+
+    @staticmethod
+    def _coverage(statuses: dict[str, str]) -> str:
+        total = len(statuses)
+        passed = sum(status == "PASSED" for status in statuses.values())
+        rate = 100 * passed / total if total else 0.0
+        return (
+            "\n## 3️⃣ Coverage & Matching Metrics\n\n"
+            f"- **{rate:.2f}%** of tests passed\n\n"
+            "| Total Tests | ✅ Passed | ❌ Failed |\n"
+            "|-------------|-----------|-----------|\n"
+            f"| {total} | {passed} | {total - passed} |\n---\n"
+        )
+
+
+def _section_status(text: str) -> str:
+    match = _STATUS_RE.match(text)
+    return match.group(1) if match else ""
+
+
+def _write_atomic(path: Path, text: str) -> None:
+    partial = path.with_name(path.name + ".tmp")
+    partial.write_text(text, encoding="utf-8")
+    partial.replace(path)
@@ -0,0 +1,202 @@
+"""Per-test request routing: block non-essential resources, stub idle endpoints.
+
+A :class:`RoutingProfile` installs one ``context.route("**/*")`` handler that
+
+* fulfils requests matching a :class:`Stub` with a canned response (by
+  default the unauthenticated ``/api/notifications`` polling that fills
+  ``raw_report.md`` with 401s),
+* aborts resource types and URLs the test does not need (images, fonts,
+  media, Sentry and analytics beacons),
+* falls back to the network (or an earlier route, e.g. HAR replay) otherwise.
+
+Counts and bytes per test go to :class:`RoutingStats`.  Blocked requests are
+never fetched, so their bytes are estimated from the ``Content-Length`` seen
+for the same URL while it was not blocked (kept in ``tmp/resource_sizes.json``).
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable
+from urllib.parse import parse_qs, urlsplit
+
+from .paths import TMP_DIR
+
+if TYPE_CHECKING:
+    from playwright.async_api import BrowserContext, Request, Response, Route
+
+SIZES_PATH = TMP_DIR / "resource_sizes.json"
+
+
+@dataclass
+class RoutingStats:
+    blocked_requests: int = 0
+    blocked_bytes: int = 0
+    stubbed_requests: int = 0
+    stubbed_bytes: int = 0
+
+    def as_dict(self) -> dict[str, int]:
+        return asdict(self)
+
+
+@dataclass(frozen=True)
+class Stub:
+    """Canned response for requests whose URL matches ``pattern``."""
+
+    pattern: str
+    body: Any = None
+    status: int = 200
+    methods: tuple[str, ...] = ("GET",)
+    content_type: str = "application/json"
+
+    def matches(self, request: "Request") -> bool:
+        return request.method in self.methods and re.search(self.pattern, request.url) is not None
+
+    def payload(self, url: str) -> bytes:
+        body = self.body(url) if callable(self.body) else self.body
+        if isinstance(body, bytes):
+            return body
+        if isinstance(body, str):
+            return body.encode("utf-8")
+        return json.dumps(body, ensure_ascii=False).encode("utf-8")
+
+
+def _empty_notifications(url: str) -> dict[str, Any]:
+    query = parse_qs(urlsplit(url).query)
+    page = int(query.get("page", ["1"])[0])
+    limit = int(query.get("limit", ["20"])[0])
+    return {
+        "notifications": [],
+        "unreadCount": 0,
+        "pagination": {"page": page, "limit": limit, "total": 0, "totalPages": 0},
+    }
+
+
+NOTIFICATIONS_STUB = Stub(r"/api/notifications(\?|$)", _empty_notifications)
+
+BEACON_PATTERNS = (
+    r"sentry\.io/",
+    r"google-analytics\.com/",
+    r"googletagmanager\.com/",
+    r"vitals\.vercel-insights\.com/",
+    r"/_vercel/(insights|speed-insights)/",
+)
+
+
+@dataclass(frozen=True)
+class RoutingProfile:
+    name: str
+    block_types: frozenset[str] = frozenset()
+    block_patterns: tuple[str, ...] = ()
+    stubs: tuple[Stub, ...] = ()
+
+    def stub_for(self, request: "Request") -> Stub | None:
+        return next((stub for stub in self.stubs if stub.matches(request)), None)
+
+    def blocks(self, request: "Request") -> bool:
+        if request.resource_type in self.block_types:
+            return True
+        return any(re.search(pattern, request.url) for pattern in self.block_patterns)
+
+    async def install(self, context: "BrowserContext", stats: RoutingStats, sizes: "SizeLedger") -> None:
+        async def handle(route: "Route") -> None:
+            request = route.request
+            stub = self.stub_for(request)
+            if stub is not None:
+                body = stub.payload(request.url)
+                stats.stubbed_requests += 1
+                stats.stubbed_bytes += len(body)
+                await route.fulfill(status=stub.status, body=body, content_type=stub.content_type)
+            elif self.blocks(request):
+                stats.blocked_requests += 1
+                stats.blocked_bytes += sizes.get(request.url)
+                await route.abort("blockedbyclient")
+            else:
+                await route.fallback()
+
+        await context.route("**/*", handle)
+        context.on("response", sizes.observe)
+
+
+PROFILES = {
+    profile.name: profile
+    for profile in (
+        RoutingProfile("full"),
+        RoutingProfile("lean", frozenset({"image", "font", "media"}), BEACON_PATTERNS, (NOTIFICATIONS_STUB,)),
+        RoutingProfile("quiet", frozenset(), BEACON_PATTERNS, (NOTIFICATIONS_STUB,)),
+    )
+}
+DEFAULT_PROFILE = "lean"
+
+# Cases that assert on what the lean profile would remove.
+CASE_PROFILES = {
+    "TC013": "full",  # notification subscription lifecycle
+    "TC016": "quiet",  # layout depends on images and fonts
+    "TC017": "quiet",  # upload previews
+}
+
+
+class SizeLedger:
+    """Last seen ``Content-Length`` per URL, persisted across runs."""
+
+    def __init__(self, path: Path = SIZES_PATH) -> None:
+        self.path = path
+        self.sizes: dict[str, int] = _read(path)
+        self.observed: dict[str, int] = {}
+
+    def get(self, url: str) -> int:
+        return self.sizes.get(_without_query(url), 0)
+
+    def observe(self, response: "Response") -> None:
+        length = response.headers.get("content-length")
+        if length and length.isdigit():
+            url = _without_query(response.url)
+            self.sizes[url] = self.observed[url] = int(length)
+
+    def save(self) -> None:
+        """Merge with sizes other processes (e.g. shard workers) saved meanwhile, then replace the file."""
+        if not self.observed:
+            return
+        merged = _read(self.path)
+        merged.update(self.observed)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        partial = self.path.with_name(self.path.name + f".{os.getpid()}.tmp")
+        partial.write_text(json.dumps(merged, indent=1, sort_keys=True) + "\n", encoding="utf-8")
+        partial.replace(self.path)
+        self.observed = {}
+
+
+def _read(path: Path) -> dict[str, int]:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def _without_query(url: str) -> str:
+    return url.split("?", 1)[0]
+
+
+@dataclass
+class RoutingPolicy:
+    """Chooses a profile per case and owns the shared size ledger."""
+
+    default: str = DEFAULT_PROFILE
+    case_profiles: dict[str, str] = field(default_factory=lambda: dict(CASE_PROFILES))
+    profiles: dict[str, RoutingProfile] = field(default_factory=lambda: dict(PROFILES))
+    sizes: SizeLedger = field(default_factory=SizeLedger)
+
+    def profile(self, case_id: str) -> RoutingProfile:
+        return self.profiles[self.case_profiles.get(case_id, self.default)]
+
+    def hook(self, case_id: str, stats: RoutingStats) -> Callable[["BrowserContext"], Any]:
+        profile = self.profile(case_id)
+
+        async def install(context: "BrowserContext") -> None:
+            await profile.install(context, stats, self.sizes)
+
+        return install
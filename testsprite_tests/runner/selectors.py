@@ -0,0 +1,233 @@
+"""Compile the generated absolute XPaths into semantic locators, once.
+
+The step lists address elements as ``xpath=html/body/main/div/div[2]/...``,
+which is slow on large DOMs and breaks on any markup change.  The first time
+such a selector is used on a route, :class:`SelectorCompiler` finds the
+element by its XPath and looks for a semantic locator that resolves to the
+same element, in this order:
+
+1. ``data-testid``;
+2. ARIA role and accessible name, from the element's accessibility snapshot;
+3. associated label, then placeholder (form fields);
+4. exact visible text (short, non-field elements).
+
+Results are cached in ``tmp/selectors.json`` per route and build hash (the
+``.next/BUILD_ID`` of a production build, else the git tree of ``src/``).  On
+the same build the cached locator is used without any resolution work; on a
+new build it is kept if it resolves to the same element as the XPath, or,
+when the XPath no longer resolves because the markup changed, to exactly
+one element; otherwise it is compiled afresh.  The XPath stays the fallback when
+nothing semantic is unique.  Callers locate after the page has settled, so
+the route key and the compiled locator belong to the page the action runs
+on.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import re
+import subprocess
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+from urllib.parse import urlsplit
+
+from .paths import REPO_ROOT, TMP_DIR
+
+if TYPE_CHECKING:
+    from playwright.async_api import Locator, Page
+
+logger = logging.getLogger(__name__)
+
+SELECTORS_PATH = TMP_DIR / "selectors.json"
+CONFIRM_TIMEOUT_MS = 2000
+MAX_CANDIDATES = 20
+MAX_TEXT = 60
+
+_ABSOLUTE_XPATH = re.compile(r"^xpath=/?html/")
+_SNAPSHOT_LINE = re.compile(r'^- (?P<role>[\w-]+)(?: "(?P<name>(?:[^"\\]|\\.)*)")?')
+
+_DESCRIBE_JS = """
+(el) => {
+  const labels = el.labels ? Array.from(el.labels).map((label) => label.innerText.trim()).filter(Boolean) : [];
+  return {
+    tag: el.tagName.toLowerCase(),
+    testid: el.getAttribute("data-testid"),
+    label: el.getAttribute("aria-label") || labels[0] || null,
+    placeholder: el.getAttribute("placeholder"),
+    text: (el.innerText || "").trim(),
+  };
+}
+"""
+
+_FIELD_TAGS = frozenset({"input", "textarea", "select"})
+
+
+def is_compilable(selector: str | None) -> bool:
+    return bool(selector) and _ABSOLUTE_XPATH.match(selector) is not None
+
+
+@dataclass(frozen=True)
+class LocatorSpec:
+    """A semantic locator: ``kind`` is testid, role, label, placeholder or text."""
+
+    kind: str
+    value: str
+    role: str | None = None
+    nth: int | None = None
+
+    def locator(self, page: "Page") -> "Locator":
+        if self.kind == "testid":
+            locator = page.get_by_test_id(self.value)
+        elif self.kind == "role":
+            locator = page.get_by_role(self.role, name=self.value, exact=True)  # type: ignore[arg-type]
+        elif self.kind == "label":
+            locator = page.get_by_label(self.value, exact=True)
+        elif self.kind == "placeholder":
+            locator = page.get_by_placeholder(self.value, exact=True)
+        else:
+            locator = page.get_by_text(self.value, exact=True)
+        return locator.nth(self.nth) if self.nth is not None else locator
+
+    def to_dict(self) -> dict[str, Any]:
+        return {key: value for key, value in self.__dict__.items() if value is not None}
+
+
+def build_hash(root: Path = REPO_ROOT) -> str:
+    """Identify the build under test; markup can only change between builds."""
+    build_id = root / ".next" / "BUILD_ID"
+    if build_id.is_file():
+        return build_id.read_text(encoding="utf-8").strip()
+    try:
+        tree = _git(root, "rev-parse", "HEAD:src")
+        diff = _git(root, "diff", "HEAD", "--", "src")
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    if not diff:
+        return tree[:16]
+    return f"{tree[:16]}+{hashlib.blake2b(diff.encode(), digest_size=8).hexdigest()}"
+
+
+def _git(root: Path, *args: str) -> str:
+    return subprocess.run(["git", *args], cwd=root, check=True, capture_output=True, text=True).stdout.strip()
+
+
+class SelectorCompiler:
+    """Resolves compilable selectors and caches the result per route and build."""
+
+    def __init__(self, path: Path = SELECTORS_PATH, build: str | None = None) -> None:
+        self.path = path
+        self.build = build or build_hash()
+        self.entries = _read(path)
+        self.changed = False
+        self.stats = {"cached": 0, "confirmed": 0, "compiled": 0, "fallback": 0}
+
+    async def locate(self, page: "Page", selector: str, nth: int | None) -> "Locator":
+        fallback = page.locator(selector)
+        fallback = fallback.nth(nth) if nth is not None else fallback
+        key = f"{urlsplit(page.url).path or '/'} {selector} {'' if nth is None else nth}".rstrip()
+        entry = self.entries.get(key)
+        if entry is not None and entry.get("spec"):
+            spec = LocatorSpec(**entry["spec"])
+            if self.build in entry["builds"]:
+                self.stats["cached"] += 1
+                return spec.locator(page)
+            if await _confirm(spec.locator(page), fallback):
+                self.stats["confirmed"] += 1
+                self._remember(key, spec)
+                return spec.locator(page)
+        try:
+            await fallback.wait_for(state="attached")
+            spec = await compile_locator(page, fallback)
+        except Exception as exc:  # noqa: BLE001 - the XPath itself reports the real failure
+            logger.debug("could not compile %s: %s", selector, exc)
+            spec = None
+        if spec is None:
+            self.stats["fallback"] += 1
+            return fallback
+        self.stats["compiled"] += 1
+        self._remember(key, spec)
+        return spec.locator(page)
+
+    def _remember(self, key: str, spec: LocatorSpec) -> None:
+        entry = self.entries.setdefault(key, {"spec": spec.to_dict(), "builds": []})
+        if entry["spec"] != spec.to_dict():
+            entry.update(spec=spec.to_dict(), builds=[])
+        if self.build not in entry["builds"]:
+            entry["builds"] = [*entry["builds"], self.build][-5:]
+        self.changed = True
+
+    def save(self) -> None:
+        """Merge with entries other processes saved meanwhile, then replace the file."""
+        if not self.changed:
+            return
+        merged = _read(self.path)
+        merged.update(self.entries)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        partial = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        partial.write_text(json.dumps(merged, ensure_ascii=False, indent=1, sort_keys=True) + "\n", encoding="utf-8")
+        partial.replace(self.path)
+        self.changed = False
+
+
+async def compile_locator(page: "Page", target: "Locator") -> LocatorSpec | None:
+    """The first semantic locator that resolves to ``target``'s element."""
+    handle = await target.element_handle()
+    if handle is None:
+        return None
+    facts = await handle.evaluate(_DESCRIBE_JS)
+    candidates: list[LocatorSpec] = []
+    if facts["testid"]:
+        candidates.append(LocatorSpec("testid", facts["testid"]))
+    try:
+        snapshot = await target.aria_snapshot()
+    except Exception:  # noqa: BLE001 - older drivers have no aria_snapshot()
+        snapshot = ""
+    match = _SNAPSHOT_LINE.match(snapshot.splitlines()[0]) if snapshot else None
+    if match and match.group("name"):
+        name = match.group("name").replace('\\"', '"')
+        candidates.append(LocatorSpec("role", name, role=match.group("role")))
+    if facts["label"]:
+        candidates.append(LocatorSpec("label", facts["label"]))
+    if facts["placeholder"]:
+        candidates.append(LocatorSpec("placeholder", facts["placeholder"]))
+    text = facts["text"]
+    if facts["tag"] not in _FIELD_TAGS and text and len(text) <= MAX_TEXT and "\n" not in text:
+        candidates.append(LocatorSpec("text", text))
+    for candidate in candidates:
+        located = candidate.locator(page)
+        count = await located.count()
+        if not 0 < count <= MAX_CANDIDATES:
+            continue
+        for index in range(count):
+            if await located.nth(index).evaluate("(el, target) => el === target", handle):
+                return LocatorSpec(candidate.kind, candidate.value, candidate.role, index if count > 1 else None)
+    return None
+
+
+async def _confirm(candidate: "Locator", target: "Locator") -> bool:
+    """Whether the cached ``candidate`` can stand in for the XPath ``target`` on a new build.
+
+    If both resolve, they must find the same element; if the XPath no longer
+    resolves, ``candidate`` must find exactly one.
+    """
+    try:
+        await candidate.first.wait_for(state="attached", timeout=CONFIRM_TIMEOUT_MS)
+        if await candidate.count() != 1:
+            return False
+        if not await target.count():
+            return True
+        handle = await target.element_handle(timeout=CONFIRM_TIMEOUT_MS)
+        return bool(await candidate.evaluate("(el, target) => el === target", handle, timeout=CONFIRM_TIMEOUT_MS))
+    except Exception:  # noqa: BLE001 - any failure means "not confirmed"
+        return False
+
+
+def _read(path: Path) -> dict[str, dict[str, Any]]:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
@@ -0,0 +1,178 @@
+"""Spread the suite over worker processes, balanced by historical duration.
+
+Each worker process owns one browser and runs its shard on the usual
+:class:`~runner.suite.SuiteRunner`.  Shards are filled longest test first,
+always onto the currently lightest shard (LPT), so slow cases such as TC016
+and TC008 no longer end up queued behind each other.
+
+Durations come from ``tmp/timings.json``, which every ``run`` appends the
+wall times of passed cases to (a failure's time says little about the next
+run).  Cases without such samples are seeded from the ``created``/``modified``
+timestamps TestSprite recorded in ``tmp/test_results.json``.
+
+Workers share one step retry budget and stream their outcomes back to the
+parent as they finish, so the results log and the report fill in during a
+sharded run just as they do otherwise.
+"""
+
+from __future__ import annotations
+
+import heapq
+import json
+import multiprocessing
+import queue
+import statistics
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, replace
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Iterable, Sequence
+
+from .flaky import RetryBudget
+from .loader import load_cases
+from .paths import TMP_DIR
+from .suite import OutcomeCallback, RunConfig, TestOutcome, format_outcome, run_with_pool
+
+TIMINGS_PATH = TMP_DIR / "timings.json"
+RESULTS_PATH = TMP_DIR / "test_results.json"
+HISTORY_LIMIT = 20
+DEFAULT_DURATION = 60.0
+
+
+class TimingHistory:
+    """Recent wall times per case id, persisted as JSON."""
+
+    def __init__(self, path: Path = TIMINGS_PATH, seed_path: Path = RESULTS_PATH) -> None:
+        self.path = path
+        self.samples: dict[str, list[float]] = _read_json(path, {})
+        self.seed = _seed_durations(seed_path)
+
+    def seed_scale(self) -> float | None:
+        """Factor from TestSprite seed durations to this runner's wall times.
+
+        Seeds span TestSprite's whole remote session and run far longer than a
+        local run, so they are scaled by the median ``samples / seed`` ratio of
+        the cases that have both.  ``None`` once samples exist without any such
+        overlap: raw seeds would then dwarf every measured case.
+        """
+        ratios = [
+            statistics.median(samples) / self.seed[case_id]
+            for case_id, samples in self.samples.items()
+            if samples and self.seed.get(case_id, 0) > 0
+        ]
+        if ratios:
+            return statistics.median(ratios)
+        return None if any(self.samples.values()) else 1.0
+
+    def estimate(self, case_id: str) -> float:
+        samples = self.samples.get(case_id)
+        if samples:
+            return statistics.median(samples)
+        scale = self.seed_scale() if case_id in self.seed else None
+        if scale is not None:
+            return self.seed[case_id] * scale
+        known = [statistics.median(values) for values in self.samples.values() if values]
+        return statistics.median(known) if known else DEFAULT_DURATION
+
+    def record(self, outcomes: Iterable[TestOutcome]) -> None:
+        """Add the durations of passed runs; a case's samples then replace its seed."""
+        for outcome in outcomes:
+            if not outcome.passed or outcome.cached:
+                continue
+            samples = self.samples.setdefault(outcome.case_id, [])
+            samples.append(round(outcome.duration, 3))
+            del samples[:-HISTORY_LIMIT]
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text(json.dumps(self.samples, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+
+
+def _read_json(path: Path, default):  # noqa: ANN001, ANN202
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return default
+
+
+def _seed_durations(path: Path) -> dict[str, float]:
+    seeds = {}
+    for record in _read_json(path, []):
+        try:
+            created = datetime.fromisoformat(record["created"].replace("Z", "+00:00"))
+            modified = datetime.fromisoformat(record["modified"].replace("Z", "+00:00"))
+        except (KeyError, ValueError):
+            continue
+        seeds[record.get("title", "").split("-", 1)[0]] = (modified - created).total_seconds()
+    return seeds
+
+
+@dataclass(order=True)
+class Shard:
+    estimate: float
+    index: int
+    case_ids: list[str] = field(default_factory=list, compare=False)
+
+
+def plan_shards(case_ids: Sequence[str], count: int, history: TimingHistory) -> list[Shard]:
+    """Longest-processing-time-first assignment of ``case_ids`` to ``count`` shards."""
+    shards = [Shard(0.0, index) for index in range(max(1, min(count, len(case_ids))))]
+    heap = list(shards)
+    for case_id in sorted(case_ids, key=history.estimate, reverse=True):
+        lightest = heapq.heappop(heap)
+        lightest.case_ids.append(case_id)
+        lightest.estimate += history.estimate(case_id)
+        heapq.heappush(heap, lightest)
+    return shards
+
+
+def run_shard(case_ids: list[str], config: RunConfig, retries: RetryBudget | None, outcomes: Any) -> None:
+    """Worker entry point: one process, one browser, one shard.
+
+    Every outcome is put on the ``outcomes`` queue as soon as it is known.
+    """
+    import asyncio
+
+    cases = load_cases(case_ids, config.steps)
+    asyncio.run(run_with_pool(cases, replace(config, browsers=1), outcomes.put, retries))
+
+
+def run_sharded(
+    case_ids: Sequence[str],
+    shards: int,
+    config: RunConfig,
+    history: TimingHistory | None = None,
+    on_outcome: OutcomeCallback | None = None,
+) -> list[TestOutcome]:
+    """Run ``case_ids`` on ``shards`` worker processes; ``on_outcome`` is called in this process."""
+    history = history or TimingHistory()
+    on_outcome = on_outcome or (lambda outcome: print(format_outcome(outcome), flush=True))
+    plan = plan_shards(case_ids, shards, history)
+    for shard in plan:
+        print(f"shard {shard.index + 1}: ~{shard.estimate:.0f}s  {', '.join(shard.case_ids)}", flush=True)
+    outcomes: list[TestOutcome] = []
+
+    def deliver(block: bool) -> None:
+        while True:
+            try:
+                outcome = received.get(timeout=0.2) if block else received.get_nowait()
+            except queue.Empty:
+                return
+            outcomes.append(outcome)
+            on_outcome(outcome)
+            block = False
+
+    # Spawn rather than fork: Playwright's driver threads do not survive fork.
+    context = multiprocessing.get_context("spawn")
+    with context.Manager() as manager:
+        received = manager.Queue()
+        retries = RetryBudget.shared(manager, config.step_retries) if config.step_retries and config.steps else None
+        with ProcessPoolExecutor(max_workers=len(plan), mp_context=context) as executor:
+            futures = [executor.submit(run_shard, shard.case_ids, config, retries, received) for shard in plan]
+            while not all(future.done() for future in futures):
+                deliver(block=True)
+            deliver(block=False)
+            for future in futures:
+                future.result()
+    order = {case_id: position for position, case_id in enumerate(case_ids)}
+    return sorted(outcomes, key=lambda outcome: order.get(outcome.case_id, len(order)))
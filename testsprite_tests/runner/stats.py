@@ -0,0 +1,79 @@
+"""Small non-parametric statistics for benchmark comparisons (stdlib only)."""
+
+from __future__ import annotations
+
+import math
+import random
+import statistics
+from typing import Callable, Sequence
+
+
+def mann_whitney_u(a: Sequence[float], b: Sequence[float]) -> tuple[float, float]:
+    """Two-sided Mann-Whitney U test of ``a`` against ``b``.
+
+    Returns ``(U of b, p-value)`` from the normal approximation with tie and
+    continuity correction, which is adequate from about eight samples per
+    side.  ``U`` above ``len(a) * len(b) / 2`` means ``b`` tends to be larger.
+    """
+    n_a, n_b = len(a), len(b)
+    if not n_a or not n_b:
+        raise ValueError("both samples must be non-empty")
+    ranked = sorted([(value, 0) for value in a] + [(value, 1) for value in b])
+    ranks = [0.0] * len(ranked)
+    ties = 0.0
+    start = 0
+    while start < len(ranked):
+        end = start
+        while end + 1 < len(ranked) and ranked[end + 1][0] == ranked[start][0]:
+            end += 1
+        for index in range(start, end + 1):
+            ranks[index] = (start + end) / 2 + 1
+        size = end - start + 1
+        ties += size**3 - size
+        start = end + 1
+    rank_sum_b = sum(rank for rank, (_, group) in zip(ranks, ranked) if group == 1)
+    u_b = rank_sum_b - n_b * (n_b + 1) / 2
+    mean = n_a * n_b / 2
+    n = n_a + n_b
+    variance = n_a * n_b / 12 * ((n + 1) - ties / (n * (n - 1)))
+    if variance <= 0:
+        return u_b, 1.0
+    z = (abs(u_b - mean) - 0.5) / math.sqrt(variance)
+    return u_b, min(1.0, math.erfc(max(z, 0.0) / math.sqrt(2)))
+
+
+def relative_median_change(a: Sequence[float], b: Sequence[float]) -> float:
+    """``median(b) / median(a) - 1``; +0.10 means ``b`` is 10% slower."""
+    base = statistics.median(a)
+    return statistics.median(b) / base - 1 if base else 0.0
+
+
+def bootstrap_ci(
+    a: Sequence[float],
+    b: Sequence[float],
+    statistic: Callable[[Sequence[float], Sequence[float]], float] = relative_median_change,
+    *,
+    resamples: int = 2000,
+    confidence: float = 0.95,
+    seed: int = 0,
+) -> tuple[float, float]:
+    """Percentile bootstrap confidence interval of ``statistic(a, b)``."""
+    rng = random.Random(seed)
+    values = sorted(
+        statistic(rng.choices(a, k=len(a)), rng.choices(b, k=len(b))) for _ in range(resamples)
+    )
+    tail = (1 - confidence) / 2
+    low = values[int(tail * (resamples - 1))]
+    high = values[int(math.ceil((1 - tail) * (resamples - 1)))]
+    return low, high
+
+
+def holm(p_values: Sequence[float]) -> list[float]:
+    """Holm-Bonferroni adjusted p-values, in input order."""
+    order = sorted(range(len(p_values)), key=p_values.__getitem__)
+    adjusted = [0.0] * len(p_values)
+    running = 0.0
+    for rank, index in enumerate(order):
+        running = max(running, min(1.0, (len(p_values) - rank) * p_values[index]))
+        adjusted[index] = running
+    return adjusted
@@ -0,0 +1,199 @@
+"""Append-only results log that replaces rewriting ``tmp/test_results.json``.
+
+``tmp/results/`` holds three JSON-lines files that are only ever appended to:
+
+``records.jsonl``
+    One line per test outcome.  ``code`` and ``testError`` hold content
+    hashes instead of the script source and error text.
+``blobs.jsonl``
+    ``{"hash": ..., "text": ...}`` for every distinct script body and error
+    message, written once no matter how many runs reference it.
+``index.jsonl``
+    Byte offsets: ``{"case": "TC001", "run": ..., "offset": ...}`` for
+    records and ``{"blob": ..., "offset": ...}`` for blobs.
+
+Writers stream a record as soon as a test finishes; readers load only the
+index and seek straight to one case's history.  Data lines are flushed
+before their index line, so a crash never leaves the index pointing at a
+partial record.  One writer per store at a time.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import IO, Any, Iterator
+
+from .paths import TMP_DIR
+
+STORE_DIR = TMP_DIR / "results"
+LEGACY_RESULTS_PATH = TMP_DIR / "test_results.json"
+
+RECORDS = "records.jsonl"
+BLOBS = "blobs.jsonl"
+INDEX = "index.jsonl"
+
+BLOB_FIELDS = ("code", "testError")
+
+
+def content_hash(text: str) -> str:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def new_run_id() -> str:
+    return f"{datetime.now(timezone.utc):%Y%m%dT%H%M%SZ}-{os.getpid()}"
+
+
+@dataclass(frozen=True)
+class IndexEntry:
+    run: str
+    offset: int
+
+
+class ResultsStore:
+    """Read side: index in memory, records and blobs fetched by offset."""
+
+    def __init__(self, directory: Path = STORE_DIR) -> None:
+        self.directory = directory
+        self.cases: dict[str, list[IndexEntry]] = {}
+        self.blobs: dict[str, int] = {}
+        self._index_size = 0
+        self.refresh()
+
+    def refresh(self) -> None:
+        """Pick up index lines appended since the last call."""
+        path = self.directory / INDEX
+        if not path.exists():
+            return
+        with path.open("rb") as index:
+            index.seek(self._index_size)
+            for line in index:
+                if not line.endswith(b"\n"):
+                    break  # a writer is mid-line; read it next time
+                self._index_size += len(line)
+                entry = json.loads(line)
+                if "blob" in entry:
+                    self.blobs[entry["blob"]] = entry["offset"]
+                else:
+                    self.cases.setdefault(entry["case"], []).append(IndexEntry(entry["run"], entry["offset"]))
+
+    def runs(self) -> list[str]:
+        return sorted({entry.run for entries in self.cases.values() for entry in entries})
+
+    def history(self, case_id: str, *, resolve: bool = False) -> list[dict[str, Any]]:
+        """Every stored outcome of ``case_id``, oldest first."""
+        entries = self.cases.get(case_id.upper(), [])
+        if not entries:
+            return []
+        with (self.directory / RECORDS).open("rb") as records:
+            result = [_read_line(records, entry.offset) for entry in entries]
+        return [self.resolve(record) for record in result] if resolve else result
+
+    def latest(self, case_id: str, *, resolve: bool = False) -> dict[str, Any] | None:
+        entries = self.cases.get(case_id.upper())
+        if not entries:
+            return None
+        with (self.directory / RECORDS).open("rb") as records:
+            record = _read_line(records, entries[-1].offset)
+        return self.resolve(record) if resolve else record
+
+    def blob(self, digest: str) -> str:
+        if not digest:
+            return ""
+        with (self.directory / BLOBS).open("rb") as blobs:
+            return _read_line(blobs, self.blobs[digest])["text"]
+
+    def resolve(self, record: dict[str, Any]) -> dict[str, Any]:
+        """Replace blob hashes with their text."""
+        return {key: self.blob(value) if key in BLOB_FIELDS else value for key, value in record.items()}
+
+
+class ResultsWriter:
+    """Append records for one run; use as a context manager."""
+
+    def __init__(self, directory: Path = STORE_DIR, run: str | None = None) -> None:
+        self.directory = directory
+        self.run = run or new_run_id()
+        directory.mkdir(parents=True, exist_ok=True)
+        self._known_blobs = set(ResultsStore(directory).blobs)
+        self._records: IO[bytes] = (directory / RECORDS).open("ab")
+        self._blobs: IO[bytes] = (directory / BLOBS).open("ab")
+        self._index: IO[bytes] = (directory / INDEX).open("ab")
+
+    def __enter__(self) -> "ResultsWriter":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        for handle in (self._records, self._blobs, self._index):
+            handle.close()
+
+    def append(self, case_id: str, record: dict[str, Any]) -> None:
+        """Store ``record``; ``code``/``testError`` text is deduplicated."""
+        stored = dict(record, run=self.run)
+        for name in BLOB_FIELDS:
+            if stored.get(name):
+                stored[name] = self._blob(stored[name])
+        offset = self._write(self._records, stored)
+        self._write(self._index, {"case": case_id.upper(), "run": self.run, "offset": offset})
+
+    def _blob(self, text: str) -> str:
+        digest = content_hash(text)
+        if digest not in self._known_blobs:
+            offset = self._write(self._blobs, {"hash": digest, "text": text})
+            self._write(self._index, {"blob": digest, "offset": offset})
+            self._known_blobs.add(digest)
+        return digest
+
+    @staticmethod
+    def _write(handle: IO[bytes], payload: dict[str, Any]) -> int:
+        offset = handle.tell()
+        handle.write(json.dumps(payload, ensure_ascii=False).encode("utf-8") + b"\n")
+        handle.flush()
+        return offset
+
+
+def outcome_record(case: Any, outcome: Any) -> dict[str, Any]:
+    """A ``test_results.json``-shaped record for one runner outcome."""
+    finished = datetime.fromisoformat(outcome.started_at).timestamp() + outcome.duration
+    return {
+        "title": f"{outcome.case_id}-{outcome.title}",
+        "description": getattr(case, "description", ""),
+        "code": getattr(case, "source", ""),
+        "testStatus": outcome.status,
+        "testError": outcome.error,
+        "testType": "FRONTEND",
+        "createFrom": "runner",
+        "created": outcome.started_at,
+        "modified": datetime.fromtimestamp(finished, timezone.utc).isoformat(timespec="milliseconds"),
+        "duration": round(outcome.duration, 3),
+    }
+
+
+def import_legacy(path: Path = LEGACY_RESULTS_PATH, directory: Path = STORE_DIR) -> int:
+    """Append the records of a TestSprite ``test_results.json`` as one run."""
+    records = json.loads(path.read_text(encoding="utf-8"))
+    created = min((record.get("created", "") for record in records), default="")
+    run = f"testsprite-{created[:19].replace(':', '').replace('-', '')}Z" if created else None
+    with ResultsWriter(directory, run) as writer:
+        for record in records:
+            writer.append(record.get("title", "").split("-", 1)[0], record)
+    return len(records)
+
+
+def _read_line(handle: IO[bytes], offset: int) -> dict[str, Any]:
+    handle.seek(offset)
+    return json.loads(handle.readline())
+
+
+def iter_latest(store: ResultsStore) -> Iterator[dict[str, Any]]:
+    for case_id in sorted(store.cases):
+        record = store.latest(case_id)
+        if record is not None:
+            yield record
@@ -0,0 +1,285 @@
+"""Run loaded scripts concurrently on a :class:`~runner.pool.BrowserPool`."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Iterable, Protocol, Sequence
+
+from .auth import CASE_ROLES, SessionCache
+from .checkpoint import CheckpointStore
+from .events import EventCapture
+from .flaky import RetryBudget
+from .har import HarArchive, MatchRule
+from .interpreter import StepError
+from .paths import base_url
+from .plan import StepCase, step_key
+from .pool import BrowserPool, ContextHook
+from .routing import RoutingPolicy, RoutingStats
+from .selectors import SelectorCompiler
+from .vitals import VitalsCollector, trace_hook
+from .waits import WaitEngine
+
+if TYPE_CHECKING:
+    from .pool import BrowserLease
+
+logger = logging.getLogger(__name__)
+
+PASSED = "PASSED"
+FAILED = "FAILED"
+
+
+class RunnableCase(Protocol):
+    """Anything the suite can schedule: a loaded script or a step list."""
+
+    case_id: str
+    title: str
+
+    def entrypoint(
+        self,
+        lease: "BrowserLease",
+        waits: WaitEngine | None = None,
+        signed_in: bool = False,
+    ) -> Callable[[], Awaitable[None]]: ...
+
+
+@dataclass
+class TestOutcome:
+    """Result of one script, using the status vocabulary of ``test_results.json``."""
+
+    case_id: str
+    title: str
+    status: str
+    error: str
+    started_at: str
+    duration: float
+    wait_saved: float = 0.0
+    cached: bool = False
+    routing: dict[str, int] = field(default_factory=dict)
+    events: dict[str, Any] = field(default_factory=dict)
+    failed_step: str = ""
+    retried_steps: dict[str, int] = field(default_factory=dict)
+
+    @property
+    def passed(self) -> bool:
+        return self.status == PASSED
+
+
+def format_outcome(outcome: TestOutcome) -> str:
+    mark = "PASS" if outcome.passed else "FAIL"
+    if outcome.cached:
+        return f"{mark} {outcome.case_id}  cached  {outcome.title}"
+    saved = f" (-{outcome.wait_saved:.1f}s)" if outcome.wait_saved else ""
+    line = f"{mark} {outcome.case_id} {outcome.duration:6.1f}s{saved}  {outcome.title}"
+    if outcome.error:
+        line += f"\n     {outcome.error.splitlines()[0]}"
+    return line
+
+
+OutcomeCallback = Callable[[TestOutcome], Awaitable[None] | None]
+
+
+class SuiteRunner:
+    """Schedule test cases onto a pool with at most ``concurrency`` in flight."""
+
+    def __init__(
+        self,
+        pool: BrowserPool,
+        *,
+        concurrency: int = 4,
+        timeout: float | None = None,
+        context_options: dict[str, Any] | None = None,
+        hooks: Sequence[ContextHook] = (),
+        smart_waits: bool = True,
+        sessions: SessionCache | None = None,
+        case_roles: dict[str, str] = CASE_ROLES,
+        routing: RoutingPolicy | None = None,
+        har: HarArchive | None = None,
+        vitals: VitalsCollector | None = None,
+        trace: bool = False,
+        capture_events: bool = True,
+        retries: RetryBudget | None = None,
+        on_outcome: OutcomeCallback | None = None,
+    ) -> None:
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        self.pool = pool
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.context_options = dict(context_options or {})
+        self.hooks = list(hooks)
+        self.smart_waits = smart_waits
+        self.sessions = sessions
+        self.case_roles = case_roles
+        self.routing = routing
+        self.har = har
+        self.vitals = vitals
+        self.trace = trace
+        self.capture_events = capture_events
+        self.retries = retries
+        self.on_outcome = on_outcome
+
+    async def run(self, cases: Iterable[RunnableCase]) -> list[TestOutcome]:
+        """Run ``cases`` and return their outcomes in input order."""
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def bounded(case: RunnableCase) -> TestOutcome:
+            async with semaphore:
+                outcome = await self.run_case(case)
+            if self.on_outcome is not None:
+                result = self.on_outcome(outcome)
+                if asyncio.iscoroutine(result):
+                    await result
+            return outcome
+
+        return list(await asyncio.gather(*(bounded(case) for case in cases)))
+
+    async def run_case(self, case: RunnableCase) -> TestOutcome:
+        started_at = datetime.now(timezone.utc).isoformat(timespec="milliseconds")
+        started = time.perf_counter()
+        error = ""
+        failed_step = ""
+        waits = WaitEngine(base_url()) if self.smart_waits else None
+        hooks = [*self.hooks, waits.attach] if waits else list(self.hooks)
+        replay = self.har.hook(case.case_id) if self.har else None
+        if replay is not None:
+            hooks.insert(0, replay)  # registered first, so routing stubs take precedence
+        routing = RoutingStats()
+        if self.routing is not None:
+            hooks.append(self.routing.hook(case.case_id, routing))
+        if self.vitals is not None:
+            hooks.append(self.vitals.hook(case.case_id))
+        if self.trace:
+            hooks.append(trace_hook(case.case_id))
+        events = EventCapture(base_url()) if self.capture_events else None
+        if events is not None:
+            hooks.append(events.attach)
+        context_options = await self._context_options(case)
+        async with self.pool.lease(context_options=context_options, hooks=hooks) as lease:
+            try:
+                run_test = case.entrypoint(lease, waits, signed_in="storage_state" in context_options)
+                await asyncio.wait_for(run_test(), self.timeout)
+            except asyncio.TimeoutError as exc:
+                # Without a suite timeout this came from the script itself.
+                if self.timeout is None:
+                    error = f"{type(exc).__name__}: {exc}"
+                else:
+                    error = f"TimeoutError: exceeded {self.timeout}s"
+            except Exception as exc:  # noqa: BLE001 - a failing script must not stop the suite
+                error = f"{type(exc).__name__}: {exc}"
+                if isinstance(exc, StepError):
+                    failed_step = step_key(exc.index, exc.step)
+        if error and events is not None:
+            error += events.console_tail()
+        return TestOutcome(
+            case_id=case.case_id,
+            title=case.title,
+            status=FAILED if error else PASSED,
+            error=error,
+            started_at=started_at,
+            duration=time.perf_counter() - started,
+            wait_saved=waits.stats.saved if waits else 0.0,
+            routing=routing.as_dict() if self.routing is not None else {},
+            events=events.summary() if events is not None else {},
+            failed_step=failed_step,
+            retried_steps=dict(self.retries.used.get(case.case_id, {})) if self.retries is not None else {},
+        )
+
+    async def _context_options(self, case: RunnableCase) -> dict[str, Any]:
+        options = dict(self.context_options)
+        if self.har is not None:
+            options.update(self.har.context_options(case.case_id))
+        role = self.case_roles.get(case.case_id)
+        if self.sessions is None or role is None:
+            return options
+        try:
+            options["storage_state"] = str(await self.sessions.storage_state(role))
+        except Exception as exc:  # noqa: BLE001 - the script can still log in through the UI
+            logger.warning("%s: no cached %s session (%s); running unauthenticated", case.case_id, role, exc)
+        return options
+
+
+@dataclass(frozen=True)
+class RunConfig:
+    """Picklable run settings, shared by the CLI and shard workers."""
+
+    concurrency: int = 4
+    browsers: int = 1
+    timeout: float | None = None
+    smart_waits: bool = True
+    session_cache: bool = True
+    headless: bool = True
+    steps: Path | None = None
+    routing: bool = True
+    har: str | None = None
+    har_match: str = "method,path,query"
+    har_delay_ms: float = 0.0
+    vitals: bool = True
+    trace: bool = False
+    compile_selectors: bool = True
+    events: bool = True
+    step_retries: int = 5
+    checkpoints: bool = False
+    resume: bool = False
+
+
+async def run_with_pool(
+    cases: Iterable[RunnableCase],
+    config: RunConfig,
+    on_outcome: OutcomeCallback | None = None,
+    retries: RetryBudget | None = None,
+) -> list[TestOutcome]:
+    """Start a pool sized by ``config``, run ``cases`` on it and shut it down.
+
+    ``retries`` replaces the run's own step retry budget, e.g. with one
+    shared by shard workers.
+    """
+    routing = RoutingPolicy() if config.routing else None
+    har = (
+        HarArchive(config.har, rule=MatchRule.parse(config.har_match), delay_ms=config.har_delay_ms)
+        if config.har
+        else None
+    )
+    vitals = VitalsCollector() if config.vitals else None
+    selectors = SelectorCompiler() if config.compile_selectors and config.steps else None
+    if retries is None and config.step_retries and config.steps:
+        retries = RetryBudget(config.step_retries)
+    checkpoints = (
+        CheckpointStore(resume=config.resume) if (config.checkpoints or config.resume) and config.steps else None
+    )
+    cases = list(cases)
+    for case in cases:
+        if isinstance(case, StepCase):
+            case.selectors = selectors
+            case.retries = retries
+            case.checkpoints = checkpoints
+    async with BrowserPool(config.browsers, headless=config.headless) as pool:
+        runner = SuiteRunner(
+            pool,
+            concurrency=config.concurrency,
+            timeout=config.timeout,
+            smart_waits=config.smart_waits,
+            sessions=SessionCache(pool.playwright) if config.session_cache else None,
+            routing=routing,
+            har=har,
+            vitals=vitals,
+            trace=config.trace,
+            capture_events=config.events,
+            retries=retries,
+            on_outcome=on_outcome,
+        )
+        outcomes = await runner.run(cases)
+    if routing is not None:
+        routing.sizes.save()
+    if vitals is not None:
+        path = vitals.write()
+        if path is not None:
+            logger.info("%d navigations recorded in %s", len(vitals.rows), path)
+    if selectors is not None:
+        selectors.save()
+        logger.info("selectors: %s", ", ".join(f"{count} {kind}" for kind, count in selectors.stats.items()))
+    return outcomes
@@ -0,0 +1,85 @@
+import textwrap
+from pathlib import Path
+
+import pytest
+
+from runner.convert import ConversionError, convert_all, convert_case
+from runner import loader
+from runner.plan import ACTION, ASSERTION, load_plan
+
+SCRIPT = '''
+import asyncio
+from playwright import async_api
+from playwright.async_api import expect
+
+async def run_test():
+    page = await context.new_page()
+    await page.goto("http://localhost:3000/login", wait_until="commit", timeout=10000)
+    try:
+        await page.wait_for_load_state("domcontentloaded", timeout=3000)
+    except async_api.Error:
+        pass
+    for frame in page.frames:
+        await frame.wait_for_load_state("domcontentloaded", timeout=3000)
+    frame = context.pages[-1]
+    # Enter the email
+    elem = frame.locator('xpath=//input[@name="email"]').nth(0)
+    await page.wait_for_timeout(3000); await elem.fill('buyer@example.com')
+    # Submit
+    elem = frame.locator('xpath=//button').nth(1)
+    await elem.click(timeout=5000)
+    await page.mouse.wheel(0, await page.evaluate('() => window.innerHeight'))
+    try:
+        await expect(frame.locator('text=Welcome').first).to_be_visible(timeout=30000)
+    except AssertionError:
+        raise AssertionError('Login did not finish')
+    await asyncio.sleep(5)
+
+asyncio.run(run_test())
+'''
+
+
+def _case(source: str) -> loader.TestCase:
+    return loader.TestCase("TC900", "Synthetic", Path("TC900_Synthetic.py"), textwrap.dedent(source))
+
+
+def test_steps_of_a_synthetic_script():
+    steps = [step.to_dict() for step in convert_case(_case(SCRIPT)).steps]
+    assert steps == [
+        {"type": ACTION, "description": "", "action": "goto", "url": "/login"},
+        {
+            "type": ACTION,
+            "description": "Enter the email",
+            "action": "fill",
+            "selector": 'xpath=//input[@name="email"]',
+            "nth": 0,
+            "value": "buyer@example.com",
+        },
+        {"type": ACTION, "description": "Submit", "action": "click", "selector": "xpath=//button", "nth": 1},
+        {"type": ACTION, "description": "", "action": "scroll", "x": 0, "y": "() => window.innerHeight"},
+        {
+            "type": ASSERTION,
+            "description": "text=Welcome is visible",
+            "assert": "visible",
+            "selector": "text=Welcome",
+            "nth": 0,
+            "timeout": 30000,
+            "message": "Login did not finish",
+        },
+    ]
+
+
+def test_description_is_taken_from_the_recorded_run():
+    case = convert_case(_case(SCRIPT), {"TC900": "Signs a buyer in"})
+    assert (case.case_id, case.title, case.description) == ("TC900", "Synthetic", "Signs a buyer in")
+
+
+def test_script_without_run_test_is_rejected():
+    with pytest.raises(ConversionError, match="no async run_test"):
+        convert_case(_case("def run_test():\n    pass\n"))
+
+
+def test_scripts_match_the_committed_step_file():
+    converted = {case.case_id: case.to_dict() for case in convert_all(loader.discover())}
+    committed = {case.case_id: case.to_dict() for case in load_plan()}
+    assert converted == committed
@@ -0,0 +1,55 @@
+import pytest
+
+from runner.histogram import Histogram
+
+
+def test_small_values_are_exact():
+    histogram = Histogram()
+    for value in range(1, 101):
+        histogram.record(value)
+    assert histogram.percentiles((50, 95, 99, 100)) == {50: 50, 95: 95, 99: 99, 100: 100}
+    assert histogram.min == 1
+    assert histogram.mean() == pytest.approx(50.5)
+
+
+def test_large_values_stay_within_precision():
+    histogram = Histogram(precision_bits=8)
+    for value in (1_000, 123_456, 9_999_999):
+        histogram.record(value)
+    # A bucket reports its highest value, at most 2 ** (1 - 8) above the recorded one.
+    assert 123_456 <= histogram.percentile(50) <= 123_456 * (1 + 2**-7)
+    assert 1_000 <= histogram.percentile(0) <= 1_000 * (1 + 2**-7)
+    assert histogram.percentile(100) == 9_999_999
+
+
+def test_percentile_rounds_rank_up():
+    histogram = Histogram()
+    histogram.record(10, count=99)
+    histogram.record(200)
+    assert histogram.percentile(99) == 10
+    assert histogram.percentile(99.5) == 200
+    assert Histogram().percentile(99) == 0
+
+
+def test_merge_matches_recording_into_one():
+    left, right, both = Histogram(), Histogram(), Histogram()
+    for value in range(0, 5_000, 7):
+        (left if value % 2 else right).record(value)
+        both.record(value)
+    left.merge(right)
+    assert left.counts == both.counts
+    assert (left.total, left.min, left.max) == (both.total, both.min, both.max)
+    with pytest.raises(ValueError):
+        left.merge(Histogram(precision_bits=4))
+
+
+def test_record_corrected_backfills_stalled_samples():
+    histogram = Histogram()
+    histogram.record_corrected(100, expected_interval=30)
+    assert histogram.total == 3
+    assert sorted(histogram.counts) == [40, 70, 100]
+
+
+def test_rejects_negative_values():
+    with pytest.raises(ValueError):
+        Histogram().record(-1)
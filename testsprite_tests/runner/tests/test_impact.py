@@ -0,0 +1,78 @@
+from types import SimpleNamespace
+
+import pytest
+
+from runner.impact import ImpactSelector, ImportGraph
+
+SOURCES = {
+    "src/lib/db.ts": "export const db = {};\n",
+    "src/lib/auth.ts": "import { db } from '@/lib/db';\nexport const auth = db;\n",
+    "src/lib/format.ts": "export const format = (value: number) => `${value}`;\n",
+    "src/app/api/products/route.ts": "import { auth } from '../../../lib/auth';\nconst f = require('@/lib/format');\n",
+    "src/app/shop/layout.tsx": "export default function Layout() {}\n",
+    "src/app/shop/page.tsx": "const Chart = import('@/components/chart');\n",
+    "src/components/chart/index.tsx": "export * from '@/lib/format';\n",
+}
+FEATURES = {
+    "Auth": ("src/lib/auth.ts",),
+    "Marketplace": ("src/app/api/products/route.ts",),
+    "Shop": ("src/app/shop/page.tsx",),
+}
+FEATURE_CASES = {"Auth": ("TC001",), "Marketplace": ("TC005",), "Shop": ("TC016",)}
+CASES = [SimpleNamespace(case_id=case_id) for case_id in ("TC001", "TC005", "TC016", "TC020")]
+
+
+@pytest.fixture
+def selector(tmp_path):
+    for name, text in SOURCES.items():
+        path = tmp_path / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text, encoding="utf-8")
+    return ImpactSelector(ImportGraph.build(tmp_path), FEATURES, FEATURE_CASES)
+
+
+def _selected(selector, *changed):
+    return [case.case_id for case in selector.select(changed, CASES)]
+
+
+def test_import_graph_resolves_every_import_form(selector):
+    edges = selector.graph.edges
+    assert edges["src/lib/auth.ts"] == {"src/lib/db.ts"}
+    assert edges["src/app/api/products/route.ts"] == {"src/lib/auth.ts", "src/lib/format.ts"}
+    assert edges["src/app/shop/page.tsx"] == {"src/components/chart/index.tsx", "src/app/shop/layout.tsx"}
+    assert edges["src/components/chart/index.tsx"] == {"src/lib/format.ts"}
+
+
+def test_change_reaches_features_through_importers(selector):
+    assert selector.affected_features(["src/lib/db.ts"]) == {"Auth", "Marketplace"}
+    assert _selected(selector, "src/lib/db.ts") == ["TC001", "TC005"]
+    assert _selected(selector, "src/app/api/products/route.ts") == ["TC005"]
+    assert _selected(selector, "src/lib/format.ts") == ["TC005", "TC016"]
+
+
+def test_layout_change_selects_the_pages_it_wraps(selector):
+    assert _selected(selector, "src/app/shop/layout.tsx") == ["TC016"]
+
+
+def test_unrelated_change_selects_nothing(selector):
+    assert _selected(selector, "README.md", "docs/guide.md") == []
+
+
+def test_global_files_select_every_case(selector):
+    assert _selected(selector, "package.json") == [case.case_id for case in CASES]
+    assert _selected(selector, "messages/ko.json") == [case.case_id for case in CASES]
+
+
+def test_without_a_code_summary_every_case_is_selected(tmp_path):
+    selector = ImpactSelector(ImportGraph.build(tmp_path), {}, FEATURE_CASES)
+    assert _selected(selector, "README.md") == [case.case_id for case in CASES]
+
+
+def test_case_files_follow_dependencies(selector):
+    assert selector.case_files("TC005") == {
+        "src/app/api/products/route.ts",
+        "src/lib/auth.ts",
+        "src/lib/db.ts",
+        "src/lib/format.ts",
+    }
+    assert selector.case_files("TC020") == set()
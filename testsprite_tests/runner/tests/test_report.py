@@ -0,0 +1,59 @@
+from runner.report import CONSOLE_MARKER, FoldedLine, ReportWriter, fold_lines, render_section, split_console
+
+UNAUTHORIZED = "[ERROR] Failed to load resource: the server responded with a status of 401 () (at /api/notifications:0:0)"
+CONSOLE = [UNAUTHORIZED, "[WARNING] slow image", UNAUTHORIZED, "", UNAUTHORIZED + "   "]
+
+
+def test_fold_lines_counts_repeats_in_first_seen_order():
+    assert fold_lines(CONSOLE) == [
+        FoldedLine(UNAUTHORIZED, 3, 1, 5),
+        FoldedLine("[WARNING] slow image", 1, 2, 2),
+    ]
+
+
+def test_folded_line_rendering():
+    assert FoldedLine("x", 1, 4, 4).render() == "x"
+    assert FoldedLine("x", 3, 1, 5).render() == "x ×3 (first #1, last #5)"
+
+
+def test_split_console():
+    error = f"Timeout 5000ms exceeded.\n{CONSOLE_MARKER}\n" + "\n".join(CONSOLE)
+    message, console = split_console(error)
+    assert message == "Timeout 5000ms exceeded."
+    assert console[0] == UNAUTHORIZED and len(console) == 5
+    assert split_console("plain failure") == ("plain failure", [])
+
+
+def test_render_section_folds_the_console(tmp_path):
+    record = {
+        "title": "TC013-Notification lifecycle",
+        "testStatus": "FAILED",
+        "testError": f"Timeout\n{CONSOLE_MARKER}\n" + "\n".join(CONSOLE),
+        "duration": 12.34,
+    }
+    section = render_section("TC013", record, tmp_path)
+    assert section.startswith("<!-- status: FAILED -->\n#### Test TC013\n- **Test Name:** Notification lifecycle\n")
+    assert f"{CONSOLE_MARKER} 5 lines, 2 distinct" in section
+    assert f"{UNAUTHORIZED} ×3 (first #1, last #5)" in section
+    assert section.count(UNAUTHORIZED) == 1
+    assert "- **Duration:** 12.3s" in section and "❌ Failed" in section
+
+
+def test_writer_lists_pending_cases_and_coverage(tmp_path):
+    report = ReportWriter(tmp_path, expected=["TC001", "TC002", "TC003"])
+    report.update("TC002", {"title": "TC002-Login failure", "testStatus": "PASSED"})
+    path = report.update("TC001", {"title": "TC001-Login", "testStatus": "FAILED", "testError": "boom"})
+    text = path.read_text(encoding="utf-8")
+    assert text.index("#### Test TC001") < text.index("#### Test TC002")
+    assert "⏳ **Pending:** TC003" in text
+    assert "| 2 | 1 | 1 |" in text
+
+
+def test_discard_removes_only_the_given_sections(tmp_path):
+    report = ReportWriter(tmp_path)
+    for case_id in ("TC001", "TC002"):
+        report.update(case_id, {"title": f"{case_id}-x", "testStatus": "PASSED"})
+    report.discard(["TC001", "TC404"])
+    assert sorted(path.stem for path in report.sections.glob("*.md")) == ["TC002"]
+    report.discard()
+    assert not list(report.sections.glob("*.md"))
@@ -0,0 +1,45 @@
+import math
+
+import pytest
+
+from runner.stats import holm, mann_whitney_u
+
+
+def test_mann_whitney_u_separated_samples():
+    u, p = mann_whitney_u(range(1, 9), range(9, 17))
+    assert u == 64
+    # z = (|64 - 32| - 0.5) / sqrt(8 * 8 / 12 * 17)
+    assert p == pytest.approx(math.erfc((32 - 0.5) / math.sqrt(64 / 12 * 17) / math.sqrt(2)))
+    assert p == pytest.approx(0.000939, abs=1e-6)
+
+
+def test_mann_whitney_u_is_symmetric():
+    a, b = [3.1, 4.0, 2.2, 5.5, 4.8], [4.9, 6.0, 5.1, 7.3, 3.0, 6.6]
+    u_b, p_b = mann_whitney_u(a, b)
+    u_a, p_a = mann_whitney_u(b, a)
+    assert u_a + u_b == len(a) * len(b)
+    assert p_a == pytest.approx(p_b)
+
+
+def test_mann_whitney_u_corrects_for_ties():
+    # Ranks: 1 | 2 2 2 -> 3 | 3 3 3 -> 6 | 4 -> 8 | 5 -> 9 | 6 -> 10; b sums to 33.
+    u, p = mann_whitney_u([1, 2, 2, 3, 5], [2, 3, 3, 4, 6])
+    assert u == 18
+    variance = 25 / 12 * (11 - 48 / 90)
+    assert p == pytest.approx(math.erfc((18 - 12.5 - 0.5) / math.sqrt(variance) / math.sqrt(2)))
+
+
+def test_mann_whitney_u_identical_samples():
+    assert mann_whitney_u([5, 5, 5], [5, 5]) == (3.0, 1.0)
+    with pytest.raises(ValueError):
+        mann_whitney_u([], [1])
+
+
+def test_holm_adjusts_in_input_order():
+    assert holm([0.01, 0.04, 0.03]) == pytest.approx([0.03, 0.06, 0.06])
+
+
+def test_holm_is_monotone_and_capped():
+    assert holm([0.5, 0.6]) == [1.0, 1.0]
+    assert holm([0.001, 0.2, 0.01, 0.04]) == pytest.approx([0.004, 0.2, 0.03, 0.08])
+    assert holm([]) == []
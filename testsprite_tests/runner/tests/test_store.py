@@ -0,0 +1,74 @@
+import json
+
+from runner.store import BLOBS, INDEX, RECORDS, ResultsStore, ResultsWriter, content_hash, import_legacy
+
+
+def _record(status: str, error: str = "", code: str = "await page.goto('/')") -> dict:
+    return {"title": "TC001-Login", "code": code, "testStatus": status, "testError": error}
+
+
+def _lines(path) -> list[dict]:
+    return [json.loads(line) for line in path.read_bytes().splitlines()]
+
+
+def test_blobs_are_written_once_across_runs(tmp_path):
+    with ResultsWriter(tmp_path, "run-1") as writer:
+        writer.append("TC001", _record("FAILED", "Timeout"))
+        writer.append("TC002", _record("FAILED", "Timeout"))
+    with ResultsWriter(tmp_path, "run-2") as writer:
+        writer.append("TC001", _record("PASSED"))
+    blobs = _lines(tmp_path / BLOBS)
+    assert sorted(blob["text"] for blob in blobs) == ["Timeout", "await page.goto('/')"]
+    records = _lines(tmp_path / RECORDS)
+    assert [record["code"] for record in records] == [content_hash("await page.goto('/')")] * 3
+    assert [record["testError"] for record in records] == [content_hash("Timeout")] * 2 + [""]
+
+
+def test_history_is_appended_in_run_order(tmp_path):
+    for run, status in (("run-1", "FAILED"), ("run-2", "PASSED"), ("run-3", "FAILED")):
+        with ResultsWriter(tmp_path, run) as writer:
+            writer.append("tc001", _record(status, "boom" if status == "FAILED" else ""))
+    store = ResultsStore(tmp_path)
+    assert store.runs() == ["run-1", "run-2", "run-3"]
+    history = store.history("TC001", resolve=True)
+    assert [(record["run"], record["testStatus"], record["testError"]) for record in history] == [
+        ("run-1", "FAILED", "boom"),
+        ("run-2", "PASSED", ""),
+        ("run-3", "FAILED", "boom"),
+    ]
+    assert store.latest("tc001", resolve=True)["code"] == "await page.goto('/')"
+    assert store.latest("TC404") is None and store.history("TC404") == []
+
+
+def test_refresh_waits_for_complete_index_lines(tmp_path):
+    with ResultsWriter(tmp_path, "run-1") as writer:
+        writer.append("TC001", _record("PASSED"))
+    store = ResultsStore(tmp_path)
+    with ResultsWriter(tmp_path, "run-2") as writer:
+        writer.append("TC001", _record("FAILED"))
+    index = tmp_path / INDEX
+    complete = index.read_bytes()
+    index.write_bytes(complete[:-5])  # a writer caught mid-line
+    store.refresh()
+    assert [entry.run for entry in store.cases["TC001"]] == ["run-1"]
+    index.write_bytes(complete)
+    store.refresh()
+    assert [entry.run for entry in store.cases["TC001"]] == ["run-1", "run-2"]
+    assert store.latest("TC001")["testStatus"] == "FAILED"
+
+
+def test_import_legacy_keeps_every_record(tmp_path):
+    legacy = tmp_path / "test_results.json"
+    legacy.write_text(
+        json.dumps(
+            [
+                dict(_record("PASSED"), created="2025-09-01T10:00:00.000Z"),
+                dict(_record("FAILED", "boom"), title="TC002-Logout", created="2025-09-01T09:30:00.000Z"),
+            ]
+        ),
+        encoding="utf-8",
+    )
+    assert import_legacy(legacy, tmp_path / "results") == 2
+    store = ResultsStore(tmp_path / "results")
+    assert store.runs() == ["testsprite-20250901T093000Z"]
+    assert store.latest("TC002", resolve=True)["testError"] == "boom"
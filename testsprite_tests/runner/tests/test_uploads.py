@@ -0,0 +1,97 @@
+import asyncio
+import base64
+import hashlib
+import re
+import struct
+
+import pytest
+
+from runner.uploads import Digest, Multipart, multipart_body
+
+BOUNDARY = b"----form-7f3a"
+# Contains CRLFs and a partial delimiter, so chunk edges land in awkward places.
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00\x00\x00\rIHDR" + struct.pack(">II", 640, 480) + b"\r\n--" + b"\r\n----form" * 40
+CHUNK_SIZES = (1, 2, 3, 7, 64, 1 << 20)
+
+
+def _part(name: str, value: bytes, *, filename: str | None = None, content_type: str | None = None) -> bytes:
+    disposition = f'Content-Disposition: form-data; name="{name}"'
+    if filename is not None:
+        disposition += f'; filename="{filename}"'
+    head = disposition + (f"\r\nContent-Type: {content_type}" if content_type else "")
+    return b"--" + BOUNDARY + b"\r\n" + head.encode("utf-8") + b"\r\n\r\n" + value + b"\r\n"
+
+
+def _body(*parts: bytes) -> bytes:
+    return b"preamble to ignore\r\n" + b"".join(parts) + b"--" + BOUNDARY + b"--\r\nepilogue"
+
+
+def _parse(body: bytes, chunk: int) -> tuple[Multipart, Digest]:
+    digest = Digest()
+    form = Multipart(BOUNDARY, digest)
+    for start in range(0, len(body), chunk):
+        form.feed(body[start : start + chunk])
+    return form, digest
+
+
+@pytest.mark.parametrize("chunk", CHUNK_SIZES)
+def test_file_part_streams_whole(chunk):
+    body = _body(
+        _part("upload_preset", b"products"),
+        _part("file", PNG, filename="cover.png", content_type="image/png"),
+        _part("tags", "상품,cover".encode("utf-8")),
+    )
+    form, digest = _parse(body, chunk)
+    assert form.complete
+    assert form.fields == {"upload_preset": "products", "tags": "상품,cover"}
+    assert (form.filename, form.content_type) == ("cover.png", "image/png")
+    assert (digest.size, digest.md5.hexdigest()) == (len(PNG), hashlib.md5(PNG).hexdigest())
+    assert digest.sniff() == ("png", 640, 480)
+
+
+@pytest.mark.parametrize("chunk", CHUNK_SIZES)
+def test_data_uri_field_is_decoded(chunk):
+    encoded = base64.encodebytes(PNG).replace(b"\n", b"\r\n")  # line-wrapped, as some clients send it
+    form, digest = _parse(_body(_part("file", b"data:image/png;base64," + encoded)), chunk)
+    assert form.complete and form.data_uri is not None
+    assert form.content_type == "image/png" and form.data_uri.url == ""
+    assert (digest.size, digest.md5.hexdigest()) == (len(PNG), hashlib.md5(PNG).hexdigest())
+
+
+@pytest.mark.parametrize("chunk", CHUNK_SIZES)
+def test_remote_url_field_is_kept(chunk):
+    form, digest = _parse(_body(_part("file", b"https://example.com/a.png")), chunk)
+    assert form.data_uri.url == "https://example.com/a.png"
+    assert digest.size == 0
+
+
+def test_incomplete_body_is_not_complete():
+    body = _body(_part("file", PNG, filename="cover.png"))
+    form, digest = _parse(body[: len(body) // 2], 1)
+    assert not form.complete
+    assert digest.size < len(PNG)
+
+
+def test_oversized_part_headers_are_rejected():
+    form = Multipart(BOUNDARY, Digest())
+    with pytest.raises(ValueError, match="headers too long"):
+        form.feed(b"--" + BOUNDARY + b"\r\nX-Padding: " + b"a" * (1 << 15))
+
+
+def test_multipart_body_round_trips(tmp_path):
+    path = tmp_path / "cover.png"
+    path.write_bytes(PNG)
+    headers, chunks = multipart_body(path, "image/png", {"upload_preset": "products"})
+
+    async def collect() -> bytes:
+        return b"".join([chunk async for chunk in chunks])
+
+    body = asyncio.run(collect())
+    assert int(headers["Content-Length"]) == len(body)
+    boundary = re.search(r"boundary=(\S+)", headers["Content-Type"]).group(1).encode("ascii")
+    digest = Digest()
+    form = Multipart(boundary, digest)
+    for start in range(len(body)):
+        form.feed(body[start : start + 1])
+    assert form.complete and form.fields == {"upload_preset": "products"}
+    assert form.filename == "cover.png" and digest.md5.hexdigest() == hashlib.md5(PNG).hexdigest()
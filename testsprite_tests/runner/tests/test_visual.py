@@ -0,0 +1,67 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from runner.visual import Region, diff, tile_hashes, tiles  # noqa: E402
+
+
+def _page(height: int = 96, width: int = 128) -> "np.ndarray":
+    """A deterministic, textured screenshot stand-in."""
+    rows, cols = np.mgrid[0:height, 0:width]
+    image = np.stack([(rows * 3) % 256, (cols * 5) % 256, (rows + cols) % 256], axis=-1)
+    return image.astype(np.uint8)
+
+
+def test_tiles_pad_to_whole_tiles():
+    blocks = tiles(_page(70, 50), tile=32)
+    assert blocks.shape == (3, 2, 32, 32, 3)
+    assert not blocks[2, 1, 6:].any()  # padding below the last 6 rows is zero
+
+
+def test_one_pixel_changes_only_its_tile_hash():
+    baseline = _page()
+    candidate = baseline.copy()
+    candidate[40, 70] ^= 0xFF
+    before, after = tile_hashes(baseline), tile_hashes(candidate)
+    assert before.shape == (3, 4)
+    assert (before != after).sum() == 1
+    assert before[1, 2] != after[1, 2]
+    assert np.array_equal(tile_hashes(baseline.copy()), before)
+
+
+def test_identical_screenshots_compare_no_tiles():
+    result = diff("home", _page(), _page())
+    assert not result.changed
+    assert (result.tiles, result.compared_tiles, result.changed_tiles) == (12, 0, 0)
+    assert result.regions == [] and not result.mask.any()
+
+
+def test_changed_block_is_reported_as_one_region():
+    baseline = _page()
+    candidate = baseline.copy()
+    candidate[10:50, 40:70] = (255, 0, 0)
+    result = diff("home", baseline, candidate, baseline_hashes=tile_hashes(baseline))
+    assert result.changed
+    assert result.compared_tiles == result.changed_tiles == 4
+    assert result.diff_pixels == 40 * 30
+    assert result.regions == [Region(32, 0, 64, 64)]
+    assert result.mask[10:50, 40:70].all() and result.mask.sum() == 40 * 30
+
+
+def test_noise_below_threshold_is_ignored():
+    baseline = _page()
+    candidate = baseline.copy()
+    candidate[64:96, 0:32] = np.clip(candidate[64:96, 0:32].astype(int) + 2, 0, 255).astype(np.uint8)
+    result = diff("home", baseline, candidate)
+    assert result.compared_tiles == 1
+    assert result.changed_tiles == 0 and not result.changed
+
+
+def test_size_change_counts_the_extra_area():
+    baseline = _page(96, 128)
+    candidate = _page(128, 128)
+    result = diff("home", baseline, candidate)
+    assert result.changed
+    assert (result.size, result.baseline_size) == ((128, 128), (128, 96))
+    assert result.changed_tiles == 4
+    assert result.regions == [Region(0, 96, 128, 32)]
@@ -0,0 +1,235 @@
+"""Responsive layout checks across a viewport matrix, all loaded at once.
+
+TC016 is meant to cover mobile, tablet, desktop and large screens, yet it
+reloads ``/marketplace`` a dozen times in one 1280x720 context with a three
+second sleep after each load.  :func:`check_matrix` instead opens one
+context per viewport on a single shared browser and loads every target page
+in every context concurrently, so the whole matrix costs about one page
+load.  For each page it records:
+
+* horizontal overflow (``scrollWidth`` beyond the viewport) and the visible
+  elements sticking out of it, which is what breaks on small screens;
+* bounding boxes of the landmarks (header, nav, main, footer, first heading);
+* a full-page screenshot in ``tmp/viewports/<run>/<viewport>/``, optionally
+  diffed against a baseline by :mod:`runner.visual` (a ``.diff.png`` next to
+  it highlights the changed pixels).
+
+Pages that need a session (``/dashboard``) get the cached storage state of
+``role`` from :class:`~runner.auth.SessionCache`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Sequence
+from urllib.parse import urljoin
+
+from .auth import SessionCache
+from .paths import TMP_DIR
+from .pool import BrowserPool
+from .routing import RoutingPolicy, RoutingStats
+from .store import new_run_id
+from .visual import VisualBaselines
+from .waits import WaitEngine
+
+if TYPE_CHECKING:
+    from playwright.async_api import BrowserContext
+
+logger = logging.getLogger(__name__)
+
+VIEWPORTS_DIR = TMP_DIR / "viewports"
+DEFAULT_PATHS = ("/marketplace", "/community", "/dashboard")
+MAX_OFFENDERS = 10
+
+
+@dataclass(frozen=True)
+class Viewport:
+    name: str
+    width: int
+    height: int
+    scale: float = 1
+    mobile: bool = False
+
+    def context_options(self) -> dict[str, Any]:
+        return {
+            "viewport": {"width": self.width, "height": self.height},
+            "device_scale_factor": self.scale,
+            "is_mobile": self.mobile,
+            "has_touch": self.mobile,
+        }
+
+    def __str__(self) -> str:
+        return f"{self.name} {self.width}x{self.height}"
+
+
+VIEWPORTS = {
+    viewport.name: viewport
+    for viewport in (
+        Viewport("mobile", 360, 640, 2, mobile=True),
+        Viewport("tablet", 768, 1024, 2, mobile=True),
+        Viewport("desktop", 1280, 720),
+        Viewport("large", 1920, 1080),
+    )
+}
+
+LAYOUT_JS = """
+(maxOffenders) => {
+  const width = document.documentElement.clientWidth;
+  const box = (el) => {
+    const r = el.getBoundingClientRect();
+    return {x: Math.round(r.left), y: Math.round(r.top + scrollY), width: Math.round(r.width), height: Math.round(r.height)};
+  };
+  const describe = (el) => el.tagName.toLowerCase() + (el.id ? "#" + el.id : "")
+    + Array.from(el.classList).slice(0, 3).map((name) => "." + name).join("");
+  const offenders = [];
+  for (const el of document.body.querySelectorAll("*")) {
+    const r = el.getBoundingClientRect();
+    if (r.width === 0 || r.height === 0 || (r.right <= width + 1 && r.left >= -1)) continue;
+    const style = getComputedStyle(el);
+    if (style.visibility === "hidden" || style.position === "fixed") continue;
+    // Report the outermost offender only; its children overflow with it.
+    if (offenders.some((item) => item.el.contains(el))) continue;
+    offenders.push({el, selector: describe(el), box: box(el)});
+    if (offenders.length >= maxOffenders) break;
+  }
+  const boxes = {};
+  for (const name of ["header", "nav", "main", "footer", "h1"]) {
+    const el = document.querySelector(name);
+    if (el) boxes[name] = box(el);
+  }
+  return {
+    scroll_width: document.documentElement.scrollWidth,
+    client_width: width,
+    offenders: offenders.map(({selector, box}) => ({selector, box})),
+    boxes,
+  };
+}
+"""
+
+
+@dataclass
+class PageLayout:
+    viewport: str
+    path: str
+    url: str = ""
+    load_ms: float = 0.0
+    scroll_width: int = 0
+    client_width: int = 0
+    offenders: list[dict[str, Any]] = field(default_factory=list)
+    boxes: dict[str, dict[str, int]] = field(default_factory=dict)
+    screenshot: str = ""
+    visual: str = ""
+    visual_changed: bool = False
+    error: str = ""
+
+    @property
+    def overflow(self) -> int:
+        return max(0, self.scroll_width - self.client_width)
+
+    @property
+    def ok(self) -> bool:
+        return not self.error and not self.overflow and not self.visual_changed
+
+
+async def capture(
+    context: "BrowserContext",
+    viewport: Viewport,
+    path: str,
+    base_url: str,
+    waits: WaitEngine,
+    screenshots: Path | None,
+    visual: VisualBaselines | None = None,
+) -> PageLayout:
+    """Load ``path`` in a new page of ``context`` and measure its layout."""
+    layout = PageLayout(viewport.name, path, url=urljoin(base_url + "/", path.lstrip("/")))
+    page = await context.new_page()
+    started = time.perf_counter()
+    try:
+        await page.goto(layout.url, wait_until="commit", timeout=15000)
+        await waits.after_navigation(page, 3)
+        layout.load_ms = round((time.perf_counter() - started) * 1000, 1)
+        layout.url = page.url
+        measured = await page.evaluate(LAYOUT_JS, MAX_OFFENDERS)
+        layout.scroll_width = measured["scroll_width"]
+        layout.client_width = measured["client_width"]
+        layout.offenders = measured["offenders"]
+        layout.boxes = measured["boxes"]
+        if screenshots is not None:
+            name = f"{viewport.name}/{path.strip('/').replace('/', '_') or 'index'}"
+            target = screenshots / f"{name}.png"
+            target.parent.mkdir(parents=True, exist_ok=True)
+            image = await page.screenshot(path=target, full_page=True)
+            layout.screenshot = str(target)
+            if visual is not None:
+                # Decoding and diffing are CPU work; keep the other pages loading meanwhile.
+                result = await asyncio.to_thread(visual.check, name, image, screenshots / f"{name}.diff.png")
+                layout.visual = "new baseline" if result is None else result.summary()
+                layout.visual_changed = result is not None and result.changed
+    except Exception as exc:  # noqa: BLE001 - one broken page must not hide the others
+        layout.error = f"{type(exc).__name__}: {exc}"
+    finally:
+        await page.close()
+    return layout
+
+
+async def check_matrix(
+    base_url: str,
+    viewports: Sequence[Viewport] = tuple(VIEWPORTS.values()),
+    paths: Sequence[str] = DEFAULT_PATHS,
+    *,
+    role: str | None = "buyer",
+    screenshots: bool = True,
+    visual: VisualBaselines | None = None,
+    headless: bool = True,
+    directory: Path = VIEWPORTS_DIR,
+) -> tuple[list[PageLayout], Path]:
+    """Load ``paths`` in every viewport concurrently; write and return the layouts."""
+    run_dir = directory / new_run_id()
+    stats = RoutingStats()
+    waits = WaitEngine(base_url)
+    async with BrowserPool(1, headless=headless) as pool:
+        options: dict[str, Any] = {}
+        if role:
+            try:
+                options["storage_state"] = str(await SessionCache(pool.playwright).storage_state(role))
+            except Exception as exc:  # noqa: BLE001 - logged-out pages are still worth checking
+                logger.warning("checking pages logged out: %s", exc)
+        hooks = [waits.attach, RoutingPolicy().hook("TC016", stats)]
+        async with pool.lease(context_options=options, hooks=hooks) as lease:
+            contexts = await asyncio.gather(
+                *(lease.new_context(**viewport.context_options()) for viewport in viewports)
+            )
+            layouts = await asyncio.gather(
+                *(
+                    capture(context, viewport, path, base_url, waits, run_dir if screenshots else None, visual)
+                    for viewport, context in zip(viewports, contexts)
+                    for path in paths
+                )
+            )
+    run_dir.mkdir(parents=True, exist_ok=True)
+    report = run_dir / "layout.json"
+    payload = [{**asdict(layout), "overflow": layout.overflow} for layout in layouts]
+    report.write_text(json.dumps(payload, ensure_ascii=False, indent=1) + "\n", encoding="utf-8")
+    return list(layouts), report
+
+
+def format_matrix(layouts: Sequence[PageLayout]) -> str:
+    lines = [f"{'path':24} {'viewport':9} {'load':>8} {'overflow':>9}  details"]
+    for layout in sorted(layouts, key=lambda item: item.path):
+        if layout.error:
+            details = layout.error
+        elif layout.overflow:
+            details = "wider than viewport: " + ", ".join(item["selector"] for item in layout.offenders)
+        elif layout.visual_changed:
+            details = layout.visual.split(": ", 1)[1]
+        else:
+            details = "ok"
+        lines.append(
+            f"{layout.path[:24]:24} {layout.viewport:9} {layout.load_ms:>6.0f}ms {layout.overflow:>7}px  {details}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,302 @@
+"""Screenshot diffs against stored baselines, vectorized with NumPy.
+
+Images are decoded (Pillow) to ``(height, width, 3)`` arrays and cut into
+fixed ``tile`` x ``tile`` blocks.  Every tile gets a 64-bit hash from one
+vectorized multiply-add over its bytes; tiles whose hash equals the
+baseline's are skipped, which on a typical UI change is nearly all of them.
+Only the changed tiles go through the expensive comparisons:
+
+* per pixel, the YIQ colour distance used by pixelmatch, with ``threshold``
+  on the same 0-1 scale, so anti-aliasing noise below it is ignored;
+* per tile, SSIM of the luma channel, which catches shifted or reflowed
+  content that the pixel distance alone over- or under-counts.
+
+A tile counts as changed when more than ``max_pixel_ratio`` of its pixels
+differ or its SSIM drops below ``min_ssim``.  The result carries the
+changed-pixel mask and the bounding boxes of connected changed tiles.
+
+NumPy and Pillow are optional for the rest of the runner; they are only
+imported when a diff is requested.
+"""
+
+from __future__ import annotations
+
+import functools
+import io
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from .paths import TMP_DIR
+
+if TYPE_CHECKING:
+    import numpy as np
+
+BASELINE_DIR = TMP_DIR / "visual" / "baseline"
+TILE = 32
+MAX_YIQ_DELTA = 35215.0
+
+# SSIM stabilisers for 8-bit luma.
+_C1 = (0.01 * 255) ** 2
+_C2 = (0.03 * 255) ** 2
+
+
+def _numpy() -> Any:
+    try:
+        import numpy
+    except ImportError:
+        raise RuntimeError("visual diffs need numpy and pillow: pip install numpy pillow") from None
+    return numpy
+
+
+def decode(data: bytes | Path) -> "np.ndarray":
+    """``(height, width, 3)`` uint8 RGB array of a PNG or JPEG."""
+    np = _numpy()
+    try:
+        from PIL import Image
+    except ImportError:
+        raise RuntimeError("visual diffs need numpy and pillow: pip install numpy pillow") from None
+    source = io.BytesIO(data) if isinstance(data, bytes) else data
+    with Image.open(source) as image:
+        return np.asarray(image.convert("RGB"))
+
+
+def encode(image: "np.ndarray") -> bytes:
+    from PIL import Image
+
+    buffer = io.BytesIO()
+    Image.fromarray(image).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def tiles(image: "np.ndarray", tile: int = TILE) -> "np.ndarray":
+    """``(rows, cols, tile, tile, 3)`` view of ``image``, zero padded to whole tiles."""
+    np = _numpy()
+    height, width = image.shape[:2]
+    padded_height = -(-height // tile) * tile
+    padded_width = -(-width // tile) * tile
+    if (padded_height, padded_width) != (height, width):
+        image = np.pad(image, ((0, padded_height - height), (0, padded_width - width), (0, 0)))
+    rows, cols = padded_height // tile, padded_width // tile
+    return image.reshape(rows, tile, cols, tile, 3).swapaxes(1, 2)
+
+
+def tile_hashes(image: "np.ndarray", tile: int = TILE) -> "np.ndarray":
+    """``(rows, cols)`` uint64 hash per tile."""
+    np = _numpy()
+    blocks = np.ascontiguousarray(tiles(image, tile))
+    rows, cols = blocks.shape[:2]
+    # A tile is tile * tile * 3 bytes, a multiple of 8: hash it as 64-bit words.
+    words = blocks.reshape(rows, cols, -1).view(np.uint64)
+    with np.errstate(over="ignore"):
+        return (words * _weights(words.shape[-1])).sum(axis=-1, dtype=np.uint64)
+
+
+@functools.lru_cache(maxsize=4)
+def _weights(count: int) -> "np.ndarray":
+    """Fixed random odd multipliers; uint64 arithmetic wraps, making a multiply-add hash."""
+    np = _numpy()
+    return np.random.default_rng(0x7E57).integers(1, 2**63, count, dtype=np.uint64) | np.uint64(1)
+
+
+def _yiq_delta(a: "np.ndarray", b: "np.ndarray") -> "np.ndarray":
+    """Squared perceptual colour distance per pixel (pixelmatch's YIQ metric)."""
+    np = _numpy()
+    diff = a.astype(np.float32) - b.astype(np.float32)
+    r, g, b_ = diff[..., 0], diff[..., 1], diff[..., 2]
+    y = r * 0.29889531 + g * 0.58662247 + b_ * 0.11448223
+    i = r * 0.59597799 - g * 0.27417610 - b_ * 0.32180189
+    q = r * 0.21147017 - g * 0.52261711 + b_ * 0.31114694
+    return 0.5053 * y * y + 0.299 * i * i + 0.1957 * q * q
+
+
+def _ssim(a: "np.ndarray", b: "np.ndarray") -> "np.ndarray":
+    """SSIM of the luma of each ``(n, tile, tile, 3)`` block pair; shape ``(n,)``."""
+    np = _numpy()
+    luma = np.array([0.299, 0.587, 0.114], dtype=np.float32)
+    x = (a.astype(np.float32) @ luma).reshape(len(a), -1)
+    y = (b.astype(np.float32) @ luma).reshape(len(b), -1)
+    mean_x, mean_y = x.mean(axis=1), y.mean(axis=1)
+    var_x, var_y = x.var(axis=1), y.var(axis=1)
+    cov = ((x - mean_x[:, None]) * (y - mean_y[:, None])).mean(axis=1)
+    return ((2 * mean_x * mean_y + _C1) * (2 * cov + _C2)) / (
+        (mean_x**2 + mean_y**2 + _C1) * (var_x + var_y + _C2)
+    )
+
+
+@dataclass
+class Region:
+    x: int
+    y: int
+    width: int
+    height: int
+
+
+@dataclass
+class DiffResult:
+    name: str
+    size: tuple[int, int]
+    baseline_size: tuple[int, int]
+    tiles: int
+    compared_tiles: int = 0
+    changed_tiles: int = 0
+    diff_pixels: int = 0
+    min_ssim: float = 1.0
+    regions: list[Region] = field(default_factory=list)
+    mask: Any = field(default=None, repr=False)
+    elapsed_ms: float = 0.0
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.changed_tiles) or self.size != self.baseline_size
+
+    def summary(self) -> str:
+        if not self.changed:
+            return f"{self.name}: unchanged ({self.tiles} tiles, {self.elapsed_ms:.1f}ms)"
+        resized = f", size {self.baseline_size[0]}x{self.baseline_size[1]} -> {self.size[0]}x{self.size[1]}"
+        return (
+            f"{self.name}: {self.changed_tiles}/{self.tiles} tiles changed, {self.diff_pixels} pixels, "
+            f"SSIM >= {self.min_ssim:.3f}, {len(self.regions)} regions"
+            f"{resized if self.size != self.baseline_size else ''} ({self.elapsed_ms:.1f}ms)"
+        )
+
+
+def diff(
+    name: str,
+    baseline: "np.ndarray",
+    candidate: "np.ndarray",
+    *,
+    tile: int = TILE,
+    threshold: float = 0.1,
+    max_pixel_ratio: float = 0.005,
+    min_ssim: float = 0.98,
+    baseline_hashes: "np.ndarray | None" = None,
+) -> DiffResult:
+    """Compare ``candidate`` with ``baseline``; only tiles with differing hashes are examined.
+
+    Images of different size are compared over their common area and the
+    rest of the larger one counts as changed.
+    """
+    np = _numpy()
+    started = time.perf_counter()
+    height = max(baseline.shape[0], candidate.shape[0])
+    width = max(baseline.shape[1], candidate.shape[1])
+    result = DiffResult(
+        name,
+        size=(candidate.shape[1], candidate.shape[0]),
+        baseline_size=(baseline.shape[1], baseline.shape[0]),
+        tiles=-(-height // tile) * -(-width // tile),
+    )
+    if baseline.shape != candidate.shape:
+        baseline = _fit(baseline, height, width)
+        candidate = _fit(candidate, height, width)
+        baseline_hashes = None
+    if baseline_hashes is None:
+        baseline_hashes = tile_hashes(baseline, tile)
+    candidate_hashes = tile_hashes(candidate, tile)
+    rows, cols = np.nonzero(baseline_hashes != candidate_hashes)
+    result.compared_tiles = len(rows)
+    mask = np.zeros((height, width), dtype=bool)
+    changed = np.zeros(baseline_hashes.shape, dtype=bool)
+    if len(rows):
+        base_blocks = tiles(baseline, tile)[rows, cols]
+        cand_blocks = tiles(candidate, tile)[rows, cols]
+        pixels = _yiq_delta(base_blocks, cand_blocks) > MAX_YIQ_DELTA * threshold * threshold
+        ratios = pixels.reshape(len(rows), -1).mean(axis=1)
+        ssim = _ssim(base_blocks, cand_blocks)
+        flagged = (ratios > max_pixel_ratio) | (ssim < min_ssim)
+        changed[rows[flagged], cols[flagged]] = True
+        padded = np.zeros((changed.shape[0] * tile, changed.shape[1] * tile), dtype=bool)
+        blocks = padded.reshape(changed.shape[0], tile, changed.shape[1], tile).swapaxes(1, 2)
+        blocks[rows[flagged], cols[flagged]] = pixels[flagged]
+        mask = padded[:height, :width]
+        result.changed_tiles = int(flagged.sum())
+        result.diff_pixels = int(mask.sum())
+        result.min_ssim = float(ssim.min())
+    result.mask = mask
+    result.regions = _regions(changed, tile, height, width)
+    result.elapsed_ms = (time.perf_counter() - started) * 1000
+    return result
+
+
+def _fit(image: "np.ndarray", height: int, width: int) -> "np.ndarray":
+    """Pad with magenta, so the missing area never matches real content."""
+    np = _numpy()
+    fitted = np.empty((height, width, 3), dtype=np.uint8)
+    fitted[...] = (255, 0, 255)
+    fitted[: image.shape[0], : image.shape[1]] = image
+    return fitted
+
+
+def _regions(changed: "np.ndarray", tile: int, height: int, width: int) -> list[Region]:
+    """Bounding boxes of 8-connected groups of changed tiles, in pixels."""
+    seen: set[tuple[int, int]] = set()
+    regions = []
+    rows, cols = changed.shape
+    for start in zip(*changed.nonzero()):
+        start = (int(start[0]), int(start[1]))
+        if start in seen:
+            continue
+        seen.add(start)
+        stack = [start]
+        top, left, bottom, right = start[0], start[1], start[0], start[1]
+        while stack:
+            row, col = stack.pop()
+            top, left, bottom, right = min(top, row), min(left, col), max(bottom, row), max(right, col)
+            for d_row in (-1, 0, 1):
+                for d_col in (-1, 0, 1):
+                    neighbour = (row + d_row, col + d_col)
+                    if (
+                        0 <= neighbour[0] < rows
+                        and 0 <= neighbour[1] < cols
+                        and neighbour not in seen
+                        and changed[neighbour]
+                    ):
+                        seen.add(neighbour)
+                        stack.append(neighbour)
+        x, y = left * tile, top * tile
+        regions.append(Region(x, y, min((right + 1) * tile, width) - x, min((bottom + 1) * tile, height) - y))
+    return regions
+
+
+def overlay(image: "np.ndarray", mask: "np.ndarray") -> "np.ndarray":
+    """``image`` dimmed, with the changed pixels in red."""
+    np = _numpy()
+    height, width = mask.shape
+    shown = np.zeros((height, width, 3), dtype=np.uint8)
+    shown[: image.shape[0], : image.shape[1]] = image[:height, :width] // 3 + 170
+    shown[mask] = (255, 0, 0)
+    return shown
+
+
+class VisualBaselines:
+    """Baseline PNGs under ``directory``; their tile hashes are computed once per process."""
+
+    def __init__(self, directory: Path = BASELINE_DIR, *, update: bool = False, **options: Any) -> None:
+        self.directory = directory
+        self.update = update
+        self.options = options
+        self._hashes: dict[str, tuple[Any, Any]] = {}
+
+    def path(self, name: str) -> Path:
+        return self.directory / f"{name}.png"
+
+    def check(self, name: str, screenshot: bytes, diff_path: Path | None = None) -> DiffResult | None:
+        """Diff ``screenshot`` against the baseline ``name``; ``None`` when it becomes the baseline."""
+        baseline_path = self.path(name)
+        if self.update or not baseline_path.is_file():
+            baseline_path.parent.mkdir(parents=True, exist_ok=True)
+            baseline_path.write_bytes(screenshot)
+            self._hashes.pop(name, None)
+            return None
+        if name not in self._hashes:
+            baseline = decode(baseline_path)
+            self._hashes[name] = baseline, tile_hashes(baseline, self.options.get("tile", TILE))
+        baseline, hashes = self._hashes[name]
+        candidate = decode(screenshot)
+        result = diff(name, baseline, candidate, baseline_hashes=hashes, **self.options)
+        if result.changed and diff_path is not None:
+            diff_path.parent.mkdir(parents=True, exist_ok=True)
+            diff_path.write_bytes(encode(overlay(candidate, result.mask)))
+        return result
@@ -0,0 +1,262 @@
+"""Per-navigation web vitals and optional Playwright traces.
+
+An init script in every page keeps one row per navigation of the top frame:
+
+* full document loads (``page.goto``, link clicks, reloads): Navigation
+  Timing (TTFB, DOMContentLoaded, load, transfer size), LCP, CLS and long
+  tasks (count, total and blocking time over 50 ms);
+* App Router soft navigations (``history.pushState``/``popstate``): time to
+  the first and last byte of the ``?_rsc=`` payload fetched for the new
+  route, plus the CLS and long tasks that follow it.
+
+Performance observers only update the row in the page.  It is reported
+through an exposed binding when the navigation ends (the ``load`` timing is
+in, a soft navigation starts, the page is hidden) and read once more from
+every open page before the context closes, so LCP and CLS updates that come
+late are kept without a binding round trip per observer batch.
+
+Rows of a run are written once, as columns, to ``tmp/vitals/<run>.parquet``
+when ``pyarrow`` is installed and to ``tmp/vitals/<run>.json``
+(``{"columns": {name: [values...]}}``) otherwise.  Each row carries the git
+revision, so ``python -m runner vitals`` can compare render cost across
+commits without rerunning anything.
+"""
+
+from __future__ import annotations
+
+import json
+import itertools
+import logging
+import statistics
+import subprocess
+from collections import defaultdict
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Iterable, Iterator
+from urllib.parse import urlsplit
+
+from .paths import REPO_ROOT, TMP_DIR
+from .pool import ContextHook, ContextTeardown
+from .store import new_run_id
+
+if TYPE_CHECKING:
+    from playwright.async_api import BrowserContext
+
+logger = logging.getLogger(__name__)
+
+VITALS_DIR = TMP_DIR / "vitals"
+TRACES_DIR = TMP_DIR / "traces"
+BINDING = "__testspriteVitals"
+CURRENT = "__testspriteVitalsNav"
+
+COLUMNS = (
+    "run", "revision", "case", "seq", "kind", "path", "url",
+    "ttfb", "dcl", "load", "transfer", "lcp", "cls", "long_tasks", "long_task_ms", "tbt",
+)
+METRICS = ("ttfb", "dcl", "load", "lcp", "cls", "tbt")
+
+VITALS_JS = """
+(() => {
+  if (window !== window.top || window.__testspriteVitalsInstalled) return;
+  window.__testspriteVitalsInstalled = true;
+  const doc = Math.random().toString(36).slice(2);
+  let seq = 0;
+  let nav = null;
+  const start = (kind, at) => {
+    nav = {doc, seq: seq++, kind, url: location.href, start: at, ttfb: null, dcl: null, load: null,
+           transfer: null, lcp: null, cls: 0, long_tasks: 0, long_task_ms: 0, tbt: 0};
+  };
+  const send = () => {
+    const report = window.__testspriteVitals;
+    if (typeof report === "function") report(JSON.stringify(nav)).catch(() => {});
+  };
+  window.__testspriteVitalsNav = () => JSON.stringify(nav);
+  const observe = (type, callback) => {
+    try {
+      new PerformanceObserver((list) => list.getEntries().forEach(callback))
+        .observe({type, buffered: true});
+    } catch (error) { /* entry type unsupported */ }
+  };
+  const ms = (value) => Math.round(value * 10) / 10;
+  start("navigate", 0);
+  observe("largest-contentful-paint", (entry) => {
+    if (nav.kind === "navigate") nav.lcp = ms(entry.startTime);
+  });
+  observe("layout-shift", (entry) => {
+    if (!entry.hadRecentInput) nav.cls = Math.round((nav.cls + entry.value) * 10000) / 10000;
+  });
+  observe("longtask", (entry) => {
+    if (entry.startTime < nav.start) return;
+    nav.long_tasks += 1;
+    nav.long_task_ms = ms(nav.long_task_ms + entry.duration);
+    nav.tbt = ms(nav.tbt + Math.max(0, entry.duration - 50));
+  });
+  observe("resource", (entry) => {
+    if (nav.kind !== "soft" || entry.startTime < nav.start || !entry.name.includes("_rsc=")) return;
+    const ttfb = ms(entry.responseStart - nav.start);
+    nav.ttfb = nav.ttfb === null ? ttfb : Math.min(nav.ttfb, ttfb);
+    nav.load = Math.max(nav.load || 0, ms(entry.responseEnd - nav.start));
+    nav.transfer = (nav.transfer || 0) + (entry.transferSize || 0);
+  });
+  const timing = () => {
+    const entry = performance.getEntriesByType("navigation")[0];
+    if (!entry || nav.kind !== "navigate") return;
+    Object.assign(nav, {ttfb: ms(entry.responseStart), dcl: ms(entry.domContentLoadedEventEnd),
+                        load: ms(entry.loadEventEnd), transfer: entry.transferSize});
+    send();
+  };
+  addEventListener("load", () => setTimeout(timing, 0));
+  addEventListener("pagehide", send);
+  const soft = () => {
+    send();
+    start("soft", performance.now());
+  };
+  for (const name of ["pushState", "replaceState"]) {
+    const original = history[name];
+    history[name] = function (state, title, url) {
+      const before = location.href;
+      const result = original.apply(this, arguments);
+      if (name === "pushState" || location.pathname !== new URL(before).pathname) soft();
+      return result;
+    };
+  }
+  addEventListener("popstate", soft);
+})();
+"""
+
+
+class VitalsCollector:
+    """Collects navigation rows from every context of a run."""
+
+    def __init__(self, directory: Path = VITALS_DIR, run: str | None = None) -> None:
+        self.directory = directory
+        self.run = run or new_run_id()
+        self.rows: list[dict[str, Any]] = []
+
+    def hook(self, case_id: str) -> ContextHook:
+        async def install(context: "BrowserContext") -> ContextTeardown:
+            latest: dict[tuple[str, int], dict[str, Any]] = {}
+
+            def report(source: Any, payload: str) -> None:
+                row = json.loads(payload)
+                latest[row["doc"], row["seq"]] = row
+
+            await context.expose_binding(BINDING, report)
+            await context.add_init_script(VITALS_JS)
+
+            async def flush() -> None:
+                for page in context.pages:
+                    try:
+                        report(None, await page.evaluate(f"window.{CURRENT}()"))
+                    except Exception:  # noqa: BLE001 - closed or never-initialised pages keep what was sent
+                        continue
+                for row in latest.values():
+                    self.add(case_id, row)
+
+            return flush
+
+        return install
+
+    def add(self, case_id: str, row: dict[str, Any]) -> None:
+        url = row.get("url", "")
+        self.rows.append(
+            {
+                **{column: row.get(column) for column in COLUMNS},
+                "run": self.run,
+                "case": case_id,
+                "path": urlsplit(url).path or "/",
+                "url": url,
+            }
+        )
+
+    def write(self) -> Path | None:
+        """Write this run's rows as columns; ``None`` if nothing was captured."""
+        if not self.rows:
+            return None
+        revision = git_revision()
+        self.rows.sort(key=lambda row: (row["case"], row["url"], row["seq"] or 0))
+        columns = {column: [row[column] for row in self.rows] for column in COLUMNS}
+        columns["revision"] = [revision] * len(self.rows)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            path = self.directory / f"{self.run}.json"
+            path.write_text(json.dumps({"columns": columns}, separators=(",", ":")) + "\n", encoding="utf-8")
+        else:
+            path = self.directory / f"{self.run}.parquet"
+            pq.write_table(pa.table(columns), path, compression="zstd")
+        return path
+
+
+def trace_hook(case_id: str, directory: Path = TRACES_DIR) -> ContextHook:
+    """Record a Playwright trace of every context to ``<directory>/<case>-<n>.zip``.
+
+    ``n`` counts the case's contexts from 1, so a script that opens several
+    keeps a trace of each; traces left by an earlier run of the case are removed.
+    """
+    for stale in directory.glob(f"{case_id}-*.zip"):
+        stale.unlink(missing_ok=True)
+    contexts = itertools.count(1)
+
+    async def install(context: "BrowserContext") -> ContextTeardown:
+        path = directory / f"{case_id}-{next(contexts)}.zip"
+        await context.tracing.start(screenshots=True, snapshots=True)
+
+        async def stop() -> None:
+            directory.mkdir(parents=True, exist_ok=True)
+            await context.tracing.stop(path=path)
+
+        return stop
+
+    return install
+
+
+def git_revision(root: Path = REPO_ROOT) -> str:
+    try:
+        return subprocess.run(
+            ["git", "describe", "--always", "--dirty"],
+            cwd=root, check=True, capture_output=True, text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def read_rows(directory: Path = VITALS_DIR) -> Iterator[dict[str, Any]]:
+    """Every stored row, oldest run first."""
+    for path in sorted(directory.glob("*.*")):
+        if path.suffix == ".json":
+            columns = json.loads(path.read_text(encoding="utf-8"))["columns"]
+        elif path.suffix == ".parquet":
+            try:
+                import pyarrow.parquet as pq
+            except ImportError:
+                logger.warning("skipping %s: pyarrow is not installed", path.name)
+                continue
+            columns = pq.read_table(path).to_pydict()
+        else:
+            continue
+        names = list(columns)
+        yield from (dict(zip(names, values)) for values in zip(*columns.values()))
+
+
+def summarize(rows: Iterable[dict[str, Any]], paths: Iterable[str] = ()) -> str:
+    """Median of each metric per revision and path, revisions in first-seen order."""
+    wanted = set(paths)
+    groups: dict[tuple[str, str, str], dict[str, list[float]]] = defaultdict(lambda: defaultdict(list))
+    for row in rows:
+        if wanted and row["path"] not in wanted:
+            continue
+        key = (row["revision"], row["kind"], row["path"])
+        for metric in METRICS:
+            if row.get(metric) is not None:
+                groups[key][metric].append(row[metric])
+    lines = [f"{'revision':14} {'kind':8} {'path':28} {'n':>4} " + " ".join(f"{metric:>8}" for metric in METRICS)]
+    for (revision, kind, path), metrics in groups.items():
+        count = max((len(values) for values in metrics.values()), default=0)
+        cells = []
+        for metric in METRICS:
+            values = metrics.get(metric)
+            cells.append(f"{statistics.median(values):>8.{3 if metric == 'cls' else 0}f}" if values else f"{'-':>8}")
+        lines.append(f"{revision[:14]:14} {kind:8} {path[:28]:28} {count:>4} " + " ".join(cells))
+    return "\n".join(lines)
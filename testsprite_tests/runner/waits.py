@@ -0,0 +1,297 @@
+"""Signal-driven replacements for the fixed sleeps in the generated scripts.
+
+The scripts pause ``page.wait_for_timeout(3000)`` before every action,
+``asyncio.sleep(3)`` after every ``page.goto`` and ``asyncio.sleep(5)`` at the
+end.  :class:`WaitEngine` waits on what those sleeps stand in for instead:
+
+* locator actionability (a trial click, or visible + editable for fills),
+* navigation commit followed by ``domcontentloaded``,
+* network quiescence on same-origin document/fetch/XHR traffic, ignoring
+  background pollers such as ``/api/notifications``,
+* Next.js hydration (``window.next`` set, no busy spinners).
+
+Every wait is capped at the sleep it replaces, so a test can only get faster.
+The engine keeps the baseline and actual wait time so the runner can report
+what each test saved.  Scripts can call it directly (``await waits.click(loc)``)
+or be rewritten on load by :func:`rewrite_sleeps`.
+"""
+
+from __future__ import annotations
+
+import ast
+import asyncio
+import re
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Iterable
+from urllib.parse import urlsplit
+
+if TYPE_CHECKING:
+    from playwright.async_api import BrowserContext, Locator, Page, Request
+
+HYDRATION_JS = """() => {
+  if (document.readyState === 'loading') return false;
+  const isNextPage = !!document.querySelector('script[src*="/_next/"]');
+  if (isNextPage && !window.next) return false;
+  return !document.querySelector('[aria-busy="true"], .animate-spin');
+}"""
+
+TRACKED_RESOURCE_TYPES = frozenset({"document", "fetch", "xhr"})
+DEFAULT_IGNORE = (
+    r"/api/notifications",
+    r"/socket\.io/",
+    r"/_next/webpack-hmr",
+    r"/__nextjs_original-stack-frame",
+)
+
+FILL_ACTIONS = frozenset({"fill", "type", "press_sequentially", "clear"})
+
+
+@dataclass
+class WaitStats:
+    """Fixed-sleep baseline versus time actually spent waiting, in seconds."""
+
+    baseline: float = 0.0
+    waited: float = 0.0
+    waits: int = 0
+
+    @property
+    def saved(self) -> float:
+        return max(self.baseline - self.waited, 0.0)
+
+
+class WaitEngine:
+    """Per-test wait layer; register :meth:`attach` as a context hook."""
+
+    def __init__(
+        self,
+        origin: str | None = None,
+        *,
+        idle_ms: int = 250,
+        ignore: Iterable[str] = DEFAULT_IGNORE,
+        hydration_js: str = HYDRATION_JS,
+    ) -> None:
+        self.origin = _origin(origin) if origin else None
+        self.idle = idle_ms / 1000
+        self.ignore = [re.compile(pattern) for pattern in ignore]
+        self.hydration_js = hydration_js
+        self.stats = WaitStats()
+        self._inflight: dict[int, set["Request"]] = {}
+        self._last_activity: dict[int, float] = {}
+
+    # -- network tracking -------------------------------------------------
+
+    async def attach(self, context: "BrowserContext") -> None:
+        key = id(context)
+        self._inflight[key] = set()
+        self._last_activity[key] = time.monotonic()
+        context.on("request", lambda request: self._started(key, request))
+        context.on("requestfinished", lambda request: self._settled(key, request))
+        context.on("requestfailed", lambda request: self._settled(key, request))
+
+    def _tracked(self, request: "Request") -> bool:
+        if request.resource_type not in TRACKED_RESOURCE_TYPES:
+            return False
+        if self.origin and _origin(request.url) != self.origin:
+            return False
+        return not any(pattern.search(request.url) for pattern in self.ignore)
+
+    def _started(self, key: int, request: "Request") -> None:
+        if self._tracked(request):
+            self._inflight[key].add(request)
+            self._last_activity[key] = time.monotonic()
+
+    def _settled(self, key: int, request: "Request") -> None:
+        inflight = self._inflight.get(key)
+        if inflight is not None and request in inflight:
+            inflight.discard(request)
+            self._last_activity[key] = time.monotonic()
+
+    # -- primitive signals ------------------------------------------------
+
+    async def network_quiet(self, page: "Page", timeout: float) -> bool:
+        """Wait until no tracked request has been in flight for ``idle_ms``."""
+        key = id(page.context)
+        if key not in self._inflight:
+            return True
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            now = time.monotonic()
+            if not self._inflight[key] and now - self._last_activity[key] >= self.idle:
+                return True
+            await asyncio.sleep(0.025)
+        return False
+
+    async def hydrated(self, page: "Page", timeout: float) -> bool:
+        try:
+            await page.wait_for_function(self.hydration_js, timeout=max(timeout, 0.001) * 1000)
+        except Exception:  # noqa: BLE001 - Playwright raises its own TimeoutError/Error
+            return False
+        return True
+
+    async def actionable(self, locator: "Locator", action: str, timeout: float) -> bool:
+        ms = max(timeout, 0.001) * 1000
+        try:
+            if action in FILL_ACTIONS:
+                await locator.wait_for(state="visible", timeout=ms)
+                return await locator.is_editable(timeout=ms)
+            await locator.click(trial=True, timeout=ms)
+        except Exception:  # noqa: BLE001
+            return False
+        return True
+
+    async def settled(self, page: "Page", timeout: float) -> None:
+        deadline = time.monotonic() + timeout
+        await self.hydrated(page, timeout)
+        await self.network_quiet(page, max(deadline - time.monotonic(), 0))
+
+    # -- sleep replacements -----------------------------------------------
+
+    async def before_action(
+        self,
+        page: "Page",
+        baseline_ms: float,
+        locator: "Locator | None" = None,
+        action: str = "click",
+    ) -> None:
+        """Replaces ``page.wait_for_timeout(baseline_ms)`` before an action."""
+        async with _Window(self.stats, baseline_ms / 1000) as window:
+            await self.settled(page, window.remaining())
+            if locator is not None:
+                await self.actionable(locator, action, window.remaining())
+
+    async def before_located_action(
+        self,
+        page: "Page",
+        baseline_ms: float,
+        locate: Callable[[], Awaitable["Locator"]],
+        action: str = "click",
+    ) -> "Locator":
+        """:meth:`before_action` for a locator that is only resolved once the page has settled."""
+        async with _Window(self.stats, baseline_ms / 1000) as window:
+            await self.settled(page, window.remaining())
+            locator = await locate()
+            await self.actionable(locator, action, window.remaining())
+        return locator
+
+    async def after_navigation(self, page: "Page", baseline_s: float) -> None:
+        """Replaces ``asyncio.sleep(baseline_s)`` following ``page.goto``."""
+        async with _Window(self.stats, baseline_s) as window:
+            try:
+                await page.wait_for_load_state("domcontentloaded", timeout=window.remaining() * 1000 or 1)
+            except Exception:  # noqa: BLE001
+                return
+            await self.settled(page, window.remaining())
+
+    async def settle(self, page: "Page", baseline_s: float) -> None:
+        """Replaces any other ``asyncio.sleep``: waits for hydration and network quiet instead."""
+        async with _Window(self.stats, baseline_s) as window:
+            await self.settled(page, window.remaining())
+
+    # -- direct step API --------------------------------------------------
+
+    async def goto(self, page: "Page", url: str, **options: Any) -> None:
+        options.setdefault("wait_until", "commit")
+        await page.goto(url, **options)
+        await self.after_navigation(page, 3)
+
+    async def click(self, locator: "Locator", **options: Any) -> None:
+        await self.before_action(locator.page, 3000, locator, "click")
+        await locator.click(**options)
+
+    async def fill(self, locator: "Locator", value: str, **options: Any) -> None:
+        await self.before_action(locator.page, 3000, locator, "fill")
+        await locator.fill(value, **options)
+
+
+class _Window:
+    """Times one replaced sleep and books it against ``WaitStats``."""
+
+    def __init__(self, stats: WaitStats, baseline: float) -> None:
+        self.stats = stats
+        self.baseline = float(baseline)
+        self.started = time.monotonic()
+
+    def remaining(self) -> float:
+        return max(self.baseline - (time.monotonic() - self.started), 0.0)
+
+    async def __aenter__(self) -> "_Window":
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        self.stats.baseline += self.baseline
+        self.stats.waited += time.monotonic() - self.started
+        self.stats.waits += 1
+
+
+def _origin(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+# -- script rewriting -----------------------------------------------------
+
+WAITS_NAME = "__waits__"
+
+
+def rewrite_sleeps(tree: ast.Module) -> ast.Module:
+    """Route the fixed sleeps in a generated script through ``__waits__``.
+
+    * ``await page.wait_for_timeout(N); await elem.<action>(...)`` becomes
+      ``await __waits__.before_action(page, N, elem, "<action>")``
+    * ``await asyncio.sleep(N)`` right after ``await page.goto(...)`` becomes
+      ``await __waits__.after_navigation(page, N)``
+    * any other ``await asyncio.sleep(N)`` becomes ``__waits__.settle``
+    """
+    for node in list(ast.walk(tree)):
+        for field_name in ("body", "orelse", "finalbody"):
+            statements = getattr(node, field_name, None)
+            if isinstance(statements, list) and statements and isinstance(statements[0], ast.stmt):
+                setattr(node, field_name, _rewrite_block(statements))
+    return ast.fix_missing_locations(tree)
+
+
+def _rewrite_block(statements: list[ast.stmt]) -> list[ast.stmt]:
+    rewritten: list[ast.stmt] = []
+    for index, statement in enumerate(statements):
+        call = _awaited_call(statement)
+        following = statements[index + 1] if index + 1 < len(statements) else None
+        previous = statements[index - 1] if index else None
+        if call is not None and _is_method(call, "page", "wait_for_timeout"):
+            args = [ast.Name("page", ast.Load()), *call.args]
+            target = _awaited_call(following) if following is not None else None
+            if target is not None and isinstance(target.func, ast.Attribute) and isinstance(target.func.value, ast.Name):
+                args += [ast.Name(target.func.value.id, ast.Load()), ast.Constant(target.func.attr)]
+            rewritten.append(_waits_call(statement, "before_action", args))
+        elif call is not None and _is_method(call, "asyncio", "sleep"):
+            previous_call = _awaited_call(previous) if previous is not None else None
+            helper = "after_navigation" if previous_call is not None and _is_method(previous_call, "page", "goto") else "settle"
+            rewritten.append(_waits_call(statement, helper, [ast.Name("page", ast.Load()), *call.args]))
+        else:
+            rewritten.append(statement)
+    return rewritten
+
+
+def _awaited_call(statement: ast.stmt) -> ast.Call | None:
+    if (
+        isinstance(statement, ast.Expr)
+        and isinstance(statement.value, ast.Await)
+        and isinstance(statement.value.value, ast.Call)
+    ):
+        return statement.value.value
+    return None
+
+
+def _is_method(call: ast.Call, owner: str, name: str) -> bool:
+    func = call.func
+    return (
+        isinstance(func, ast.Attribute)
+        and func.attr == name
+        and isinstance(func.value, ast.Name)
+        and func.value.id == owner
+    )
+
+
+def _waits_call(original: ast.stmt, method: str, args: list[ast.expr]) -> ast.stmt:
+    call = ast.Call(ast.Attribute(ast.Name(WAITS_NAME, ast.Load()), method, ast.Load()), args, [])
+    return ast.copy_location(ast.Expr(ast.Await(call)), original)